@@ -0,0 +1,246 @@
+"""
+Benchmark Harness
+
+This module measures the scan engines, banner grabbers and the DNS resolver against the loopback stand-in services of 'benchmarks.services', so performance regressions can be caught offline. Every case runs one engine at one concurrency or rate setting and scans the stand-in port set 'rounds' times, one scan after another (engines such as UDP match replies by destination, so a port is never probed twice within one scan). It reports:
+
+- probes per second;
+- p50/p99 probe latency from the result RTTs (answered probes only);
+- process CPU seconds and utilisation (the stand-in services run in the same process and are included);
+- peak RSS of the process and, with 'trace_memory', the peak of Python allocations during the case;
+- status counts and the number of results that disagree with the services' expected status.
+
+The 'tcp-sharded' engine runs the TCP engine in 'setting' worker processes (SHARD_CONCURRENCY connections each); its numbers include starting the processes.
+
+The 'dns' engine resolves the stub DNS server's synthetic names with an empty cache in every round, at the given resolver concurrency; the server holds every answer back for DNS_LATENCY seconds like a remote resolver would.
+
+Results are JSON. Comparing them with a saved baseline fails when a case got slower than the tolerance allows.
+
+Functions:
+- run_case: Run one engine at one setting and return its measurements.
+- run_suite: Run every requested case against one set of stand-in services.
+- compare: Compare results with a baseline and return the regressions.
+- main: Command line entry point ('python -m benchmarks').
+
+Usage:
+    python -m benchmarks > bench_output.txt
+    python -m benchmarks --engines tcp,banner-tcp --settings 100,1000 --rounds 20 -o bench.json
+    python -m benchmarks --baseline bench.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tracemalloc
+from modules.port_scanner import PortScannerFactory
+from modules.banner_grabber import BannerGrabberFactory
+from utils.rate_limiter import ProbeScheduler
+from utils.resolver import Resolver
+from benchmarks.services import LoopbackServices
+
+DEFAULT_SETTINGS = {"tcp": (100, 1000), "syn": (10000, 50000), "udp": (5000, 50000), "banner-tcp": (100, 500), "dns": (1, 256), "tcp-sharded": (1, 2, 4)}
+SHARD_CONCURRENCY = 1000
+DNS_NAMES_PER_PORT = 10
+DNS_LATENCY = 0.005
+DEFAULT_ENGINES = ("tcp", "udp", "banner-tcp")
+PRIVILEGED_ENGINES = ("syn",)
+DEFAULT_ROUNDS = 10
+DEFAULT_TOLERANCE = 0.2
+
+def percentile(values, fraction):
+    """Return the value at a fraction (0..1) of the sorted values, or None if there are none."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def _engine(engine, setting, timeout):
+    """Create the engine of a case with the rate limits switched off."""
+    scheduler = ProbeScheduler()
+    if engine == "tcp":
+        return PortScannerFactory.generate_port_scanner("tcp", concurrency=setting, timeout=timeout, scheduler=scheduler)
+    if engine in ("syn", "udp"):
+        return PortScannerFactory.generate_port_scanner(engine, rate=setting, timeout=timeout, scheduler=scheduler)
+    if engine == "banner-tcp":
+        return BannerGrabberFactory.generate_banner_grabber("tcp", concurrency=setting, timeout=timeout, probes=False, scheduler=scheduler)
+    if engine == "tcp-sharded":
+        return PortScannerFactory.generate_port_scanner("tcp", shards=setting, concurrency=SHARD_CONCURRENCY, timeout=timeout, scheduler=scheduler)
+    if engine == "dns":
+        return None
+    raise ValueError(f"Unknown benchmark engine '{engine}'.")
+
+def run_case(engine, setting, services, rounds=DEFAULT_ROUNDS, timeout=0.5, trace_memory=False):
+    """Run one engine at one concurrency/rate setting and measure it.
+
+    Args:
+        engine (str): "tcp", "syn", "udp", "banner-tcp", "dns" or "tcp-sharded".
+        setting (int): Concurrency (tcp, banner-tcp, dns), packets per second (syn, udp) or worker processes (tcp-sharded).
+        services (LoopbackServices): The running stand-in services.
+        rounds (int): Scans of the stand-in port set.
+        timeout (float): Probe timeout of the engine.
+        trace_memory (bool): Also measure the peak of Python allocations (slows the case down).
+
+    Returns:
+        dict: The case's measurements.
+    """
+    proto = "udp" if engine == "udp" else "tcp"
+    expected = services.expected[proto]
+    if engine == "banner-tcp":
+        ports = [port for port, status in expected.items() if status == "open"]
+    else:
+        ports = list(expected)
+    probes = [("127.0.0.1", port) for port in ports]
+    if engine == "dns":
+        probes = services.dns.synthetic_names()
+    runner = _engine(engine, setting, timeout)
+
+    latencies = []
+    statuses = {}
+    mismatches = 0
+    if trace_memory:
+        tracemalloc.start()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if engine == "dns":
+            resolver = Resolver([services.dns.nameserver], timeout=timeout, concurrency=setting, hosts_file=None)
+            for resolution in resolver.resolve_many(probes, ("A",)).values():
+                status = "resolved" if resolution.ipv4 else "unresolved"
+                statuses[status] = statuses.get(status, 0) + 1
+                mismatches += not resolution.ipv4
+        elif engine == "banner-tcp":
+            for result in runner.grab_iter(probes):
+                status = "banner" if result.banner is not None else "none"
+                statuses[status] = statuses.get(status, 0) + 1
+                mismatches += result.banner is None
+        else:
+            for result in runner.scan_iter(probes):
+                statuses[result.status] = statuses.get(result.status, 0) + 1
+                mismatches += expected.get(result.port) != result.status
+                if result.rtt is not None:
+                    latencies.append(result.rtt)
+    duration = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    python_peak = None
+    if trace_memory:
+        python_peak = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    return {
+        "engine": engine,
+        "setting": setting,
+        "probes": len(probes) * rounds,
+        "results": sum(statuses.values()),
+        "duration_s": round(duration, 4),
+        "probes_per_sec": round(len(probes) * rounds / duration, 1) if duration else None,
+        "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 3) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "cpu_s": round(cpu, 4),
+        "cpu_percent": round(100 * cpu / duration, 1) if duration else None,
+        "rss_peak_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "python_peak_kb": python_peak,
+        "statuses": statuses,
+        "mismatches": mismatches,
+    }
+
+def run_suite(engines=DEFAULT_ENGINES, settings=None, rounds=DEFAULT_ROUNDS, timeout=0.5, trace_memory=False, ports=100):
+    """Run every engine at every setting against one set of stand-in services.
+
+    Args:
+        engines (iterable): Engine names (see run_case).
+        settings (iterable): Settings used for every engine; each engine's defaults if not given.
+        rounds (int): Scans of the stand-in port set per case.
+        timeout (float): Probe timeout of the engines.
+        trace_memory (bool): Also measure the peak of Python allocations.
+        ports (int): Open and closed ports per protocol (plus a few filtered ones); the stub DNS server serves DNS_NAMES_PER_PORT times as many names.
+
+    Returns:
+        dict: Environment metadata and a list of case measurements under "cases".
+    """
+    cases = []
+    dns_names = ports * DNS_NAMES_PER_PORT if "dns" in engines else 0
+    with LoopbackServices(tcp_open=ports, tcp_closed=ports, udp_open=ports, udp_closed=ports, dns_names=dns_names, dns_latency=DNS_LATENCY) as services:
+        for engine in engines:
+            for setting in settings or DEFAULT_SETTINGS.get(engine, ()):
+                cases.append(run_case(engine, setting, services, rounds, timeout, trace_memory))
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "rounds": rounds,
+        "ports": ports,
+        "cases": cases,
+    }
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compare results with a baseline run.
+
+    Args:
+        results (dict): The output of run_suite.
+        baseline (dict): A saved output of run_suite.
+        tolerance (float): Allowed drop in probes per second (0.2 = 20% slower).
+
+    Returns:
+        list: A message per case that got slower than allowed or returned wrong statuses.
+    """
+    previous = {(case["engine"], case["setting"]): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        key = (case["engine"], case["setting"])
+        if case["mismatches"]:
+            regressions.append(f"{key[0]}@{key[1]}: {case['mismatches']} results disagree with the stand-in services")
+        before = previous.get(key)
+        if before is None or not before.get("probes_per_sec") or not case["probes_per_sec"]:
+            continue
+        if case["probes_per_sec"] < before["probes_per_sec"] * (1 - tolerance):
+            change = 100 * (1 - case["probes_per_sec"] / before["probes_per_sec"])
+            regressions.append(f"{key[0]}@{key[1]}: {case['probes_per_sec']} probes/s, {change:.0f}% slower than {before['probes_per_sec']}")
+    return regressions
+
+def main(argv=None):
+    """Run the benchmarks from the command line.
+
+    Returns:
+        int: 0, or 1 if a baseline was given and a case regressed.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark Eater's scan engines against loopback stand-in services.")
+    available = sorted(set(DEFAULT_SETTINGS))
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES),
+                        help=f"Comma-separated engines ({', '.join(available)}; default: {','.join(DEFAULT_ENGINES)}). 'syn' needs root.")
+    parser.add_argument("--settings", help="Comma-separated concurrency/rate settings for every engine (default: per-engine defaults).")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help=f"Scans of the port set per case (default: {DEFAULT_ROUNDS}).")
+    parser.add_argument("--ports", type=int, default=100, help="Open and closed stand-in ports per protocol (default: 100).")
+    parser.add_argument("--timeout", type=float, default=0.5, help="Probe timeout in seconds (default: 0.5).")
+    parser.add_argument("--trace-memory", action="store_true", help="Measure the peak of Python allocations (slower).")
+    parser.add_argument("-o", "--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--baseline", help="Compare with a saved JSON result and exit with 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help=f"Allowed probes/s drop against the baseline (default: {DEFAULT_TOLERANCE}).")
+    args = parser.parse_args(argv)
+
+    engines = [engine.strip().lower() for engine in args.engines.split(",") if engine.strip()]
+    unknown = [engine for engine in engines if engine not in DEFAULT_SETTINGS]
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(unknown)}")
+    if os.geteuid() != 0 and any(engine in PRIVILEGED_ENGINES for engine in engines):
+        parser.error("the syn engine needs root or CAP_NET_RAW")
+    settings = [int(setting) for setting in args.settings.split(",")] if args.settings else None
+
+    results = run_suite(engines, settings, args.rounds, args.timeout, args.trace_memory, args.ports)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
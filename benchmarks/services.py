@@ -0,0 +1,298 @@
+"""
+Loopback Stand-in Services
+
+This module starts the local services the benchmarks scan, inside the benchmark process and without network access or privileges:
+
+- TCP listeners that send a short banner and close every accepted connection ("open");
+- bound TCP sockets that do not listen, so the kernel answers with a RST ("closed");
+- TCP black holes: listeners with a full accept queue that are never accepted from, so further SYNs are silently dropped and probes time out ("filtered");
+- UDP echo responders ("open");
+- UDP black holes: bound sockets that are never read, so datagrams get neither a reply nor an ICMP unreachable ("open|filtered");
+- UDP ports with nothing bound, answered by the kernel with an ICMP port unreachable ("closed"). They are picked below the ephemeral port range, so the scanner's own socket cannot end up on one of them.
+
+A stub DNS server answers A/AAAA queries from a zone dictionary and for any number of synthetic names ("host<n>.bench.test"), with NXDOMAIN and an SOA negative TTL for everything else.
+
+Classes:
+- StubDNSServer: Context manager running an authoritative-looking DNS server on a loopback UDP port.
+- LoopbackServices: Context manager running the stand-in services and describing the expected status of every port.
+
+Usage:
+1. 'with LoopbackServices(tcp_open=100, ...) as services:'
+2. Scan 'services.tcp_probes()' or 'services.udp_probes()' and compare results with 'services.expected'.
+"""
+
+import time
+import socket
+import struct
+import selectors
+import threading
+from collections import deque
+from utils.resolver import RECORD_TYPES, read_name
+
+LOOPBACK = "127.0.0.1"
+BANNER = b"SSH-2.0-OpenSSH_9.6 eater-benchmark\r\n"
+SYNTHETIC_DOMAIN = "bench.test"
+EPHEMERAL_RANGE = "/proc/sys/net/ipv4/ip_local_port_range"
+UNBOUND_PORT_BASE = 20000
+
+def unbound_udp_ports(count):
+    """Return UDP ports on loopback that nothing is bound to, below the ephemeral range."""
+    try:
+        with open(EPHEMERAL_RANGE) as port_range:
+            ceiling = int(port_range.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        ceiling = 32768
+    ports = []
+    for port in range(min(UNBOUND_PORT_BASE, ceiling - count * 2), ceiling):
+        if len(ports) == count:
+            break
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            probe.bind((LOOPBACK, port))
+        except OSError:
+            continue
+        finally:
+            probe.close()
+        ports.append(port)
+    return ports
+
+class StubDNSServer:
+    """
+    DNS server on a loopback UDP port answering from a zone, served by its own thread.
+    """
+
+    def __init__(self, zone=None, synthetic=0, ttl=300, negative_ttl=30, latency=0.0):
+        """
+        Args:
+            zone (dict): {name: {"A": [addresses], "AAAA": [addresses]}}.
+            synthetic (int): Names "host0.bench.test" .. "host<synthetic-1>.bench.test" resolving to 127.x.y.z.
+            ttl (int): TTL of every answer.
+            negative_ttl (int): SOA minimum TTL sent with NXDOMAIN and empty answers.
+            latency (float): Seconds every response is held back, standing in for a remote resolver.
+        """
+        self.zone = {name.lower(): records for name, records in (zone or {}).items()}
+        self.synthetic = synthetic
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.latency = latency
+        self.queries = 0
+        self.sock = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def nameserver(self):
+        """The server as a Resolver nameserver ("127.0.0.1:<port>")."""
+        return f"{LOOPBACK}:{self.sock.getsockname()[1]}"
+
+    def synthetic_names(self):
+        """Return the synthetic names the server answers."""
+        return [f"host{index}.{SYNTHETIC_DOMAIN}" for index in range(self.synthetic)]
+
+    def records(self, name):
+        """Return the records of a name, or None if it does not exist."""
+        records = self.zone.get(name)
+        if records is None and name.endswith("." + SYNTHETIC_DOMAIN) and name.startswith("host"):
+            index = name[4:-len(SYNTHETIC_DOMAIN) - 1]
+            if index.isdigit() and int(index) < self.synthetic:
+                index = int(index) + 1
+                records = {"A": [f"127.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"]}
+        return records
+
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 21)
+        self.sock.bind((LOOPBACK, 0))
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.sock is not None:
+            self.sock.close()
+
+    def _serve(self):
+        delayed = deque()
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, response, address = delayed.popleft()
+                self.sock.sendto(response, address)
+            self.sock.settimeout(min(0.05, max(0.0001, delayed[0][0] - now)) if delayed else 0.05)
+            try:
+                query, address = self.sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            response = self.answer(query)
+            if response is None:
+                continue
+            if self.latency:
+                delayed.append((time.monotonic() + self.latency, response, address))
+            else:
+                self.sock.sendto(response, address)
+
+    def answer(self, query):
+        """Build the response to a query, or None if it cannot be parsed."""
+        try:
+            query_id, _, questions, _, _, _ = struct.unpack_from("!HHHHHH", query)
+            name, end = read_name(query, 12)
+            record_type, _ = struct.unpack_from("!HH", query, end)
+        except (struct.error, ValueError):
+            return None
+        self.queries += 1
+        question = query[12:end + 4]
+        records = self.records(name)
+        type_name = next((key for key, value in RECORD_TYPES.items() if value == record_type), None)
+        addresses = records.get(type_name, []) if records is not None and type_name else []
+        family = socket.AF_INET if type_name == "A" else socket.AF_INET6
+        answers = b"".join(b"\xc0\x0c" + struct.pack("!HHIH", record_type, 1, self.ttl, 4 if family == socket.AF_INET else 16)
+                           + socket.inet_pton(family, address) for address in addresses)
+        authority = b""
+        if not addresses:
+            soa = b"\x02ns\x00\x0ahostmaster\x00" + struct.pack("!IIIII", 1, 3600, 600, 86400, self.negative_ttl)
+            authority = b"\x00" + struct.pack("!HHIH", 6, 1, self.negative_ttl, len(soa)) + soa
+        rcode = 3 if records is None else 0
+        header = struct.pack("!HHHHHH", query_id, 0x8180 | rcode, 1, len(addresses), 1 if authority else 0, 0)
+        return header + question + answers + authority
+
+class LoopbackServices:
+    """
+    Stand-in TCP and UDP services on 127.0.0.1, served by one selector thread.
+    """
+
+    def __init__(self, tcp_open=100, tcp_closed=100, tcp_filtered=4, udp_open=100, udp_closed=100, udp_filtered=4, banner=BANNER, dns_names=0, dns_latency=0.0):
+        """
+        Args:
+            tcp_open (int): TCP listeners sending a banner.
+            tcp_closed (int): TCP ports answering with a RST.
+            tcp_filtered (int): TCP ports dropping SYNs.
+            udp_open (int): UDP echo responders.
+            udp_closed (int): UDP ports answering with an ICMP port unreachable.
+            udp_filtered (int): UDP ports swallowing datagrams.
+            banner (bytes): Sent on every accepted TCP connection.
+            dns_names (int): Synthetic names served by a StubDNSServer ('dns'); no DNS server for 0.
+            dns_latency (float): Seconds the DNS server holds back every response.
+        """
+        self.counts = {"tcp_open": tcp_open, "tcp_closed": tcp_closed, "tcp_filtered": tcp_filtered,
+                       "udp_open": udp_open, "udp_closed": udp_closed, "udp_filtered": udp_filtered}
+        self.banner = banner
+        self.expected = {"tcp": {}, "udp": {}}
+        self.sockets = []
+        self.selector = None
+        self.thread = None
+        self.stopped = threading.Event()
+        self.dns = StubDNSServer(synthetic=dns_names, latency=dns_latency) if dns_names else None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _bind(self, kind):
+        """Bind a socket to a free loopback port and keep it until the services stop."""
+        bound = socket.socket(socket.AF_INET, kind)
+        bound.bind((LOOPBACK, 0))
+        self.sockets.append(bound)
+        return bound
+
+    def start(self):
+        """Bind every port and start serving."""
+        self.selector = selectors.DefaultSelector()
+        for _ in range(self.counts["tcp_open"]):
+            listener = self._bind(socket.SOCK_STREAM)
+            listener.listen(1024)
+            listener.setblocking(False)
+            self.selector.register(listener, selectors.EVENT_READ, self._accept)
+            self.expected["tcp"][listener.getsockname()[1]] = "open"
+        for _ in range(self.counts["tcp_closed"]):
+            self.expected["tcp"][self._bind(socket.SOCK_STREAM).getsockname()[1]] = "closed"
+        for _ in range(self.counts["tcp_filtered"]):
+            black_hole = self._bind(socket.SOCK_STREAM)
+            black_hole.listen(0)
+            port = black_hole.getsockname()[1]
+            for _ in range(2):
+                filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                filler.setblocking(False)
+                filler.connect_ex((LOOPBACK, port))
+                self.sockets.append(filler)
+            self.expected["tcp"][port] = "filtered"
+
+        for _ in range(self.counts["udp_open"]):
+            responder = self._bind(socket.SOCK_DGRAM)
+            responder.setblocking(False)
+            self.selector.register(responder, selectors.EVENT_READ, self._echo)
+            self.expected["udp"][responder.getsockname()[1]] = "open"
+        for _ in range(self.counts["udp_filtered"]):
+            self.expected["udp"][self._bind(socket.SOCK_DGRAM).getsockname()[1]] = "open|filtered"
+        for port in unbound_udp_ports(self.counts["udp_closed"]):
+            self.expected["udp"][port] = "closed"
+
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+        if self.dns is not None:
+            self.dns.start()
+
+    def stop(self):
+        """Stop serving and close every socket."""
+        if self.dns is not None:
+            self.dns.stop()
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.selector is not None:
+            self.selector.close()
+        for bound in self.sockets:
+            bound.close()
+        self.sockets = []
+
+    def _serve(self):
+        """Dispatch ready sockets to their handlers until stopped."""
+        while not self.stopped.is_set():
+            for key, _ in self.selector.select(0.05):
+                key.data(key.fileobj)
+
+    def _accept(self, listener):
+        """Accept every pending connection, send the banner and close it."""
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                connection.send(self.banner)
+            except OSError:
+                pass
+            connection.close()
+
+    def _echo(self, responder):
+        """Echo every pending datagram back to its sender."""
+        while True:
+            try:
+                data, address = responder.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                responder.sendto(data or b"\0", address)
+            except OSError:
+                pass
+
+    def tcp_probes(self):
+        """Return a (host, port) probe for every stand-in TCP port."""
+        return [(LOOPBACK, port) for port in self.expected["tcp"]]
+
+    def udp_probes(self):
+        """Return a (host, port) probe for every stand-in UDP port."""
+        return [(LOOPBACK, port) for port in self.expected["udp"]]
@@ -0,0 +1,249 @@
+"""
+Results Store
+
+This module persists scan and banner results in SQLite so they outlive the CLI session and can be queried later. The database runs in WAL mode and results are written with batched 'executemany' inserts inside one transaction per batch, so persistence keeps up with the scan stream instead of throttling it.
+
+Classes:
+- StoredResult: A row returned by 'ResultsStore.query'.
+- ResultsStore: SQLite-backed store for scans, port results and banners.
+
+Usage:
+1. Open a 'ResultsStore' on a database file and register a scan with 'start_scan'.
+2. Feed the scanner's result stream to 'ingest' (or wrap it with 'tee' to keep consuming it).
+3. Attach banners with 'record_banners' and close the scan with 'finish_scan'.
+4. Query with 'query', e.g. query(port=22, status="open", product="OpenSSH", version_below="8").
+"""
+
+import re
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from functools import lru_cache
+
+StoredResult = namedtuple("StoredResult", ["scan_id", "host", "port", "proto", "status", "rtt", "banner", "scanned_at"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    scan_type TEXT NOT NULL,
+    targets TEXT,
+    ports TEXT,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    scan_id INTEGER NOT NULL REFERENCES scans (id),
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    proto TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rtt REAL,
+    banner TEXT,
+    scanned_at REAL NOT NULL,
+    PRIMARY KEY (scan_id, host, port, proto)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_host_port_proto ON results (host, port, proto);
+CREATE INDEX IF NOT EXISTS results_scanned_at ON results (scanned_at);
+"""
+
+INSERT_RESULT = """
+INSERT INTO results (scan_id, host, port, proto, status, rtt, scanned_at) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (scan_id, host, port, proto) DO UPDATE SET status = excluded.status, rtt = excluded.rtt, scanned_at = excluded.scanned_at
+"""
+
+UPSERT_BANNER = """
+INSERT INTO results (scan_id, host, port, proto, status, banner, scanned_at) VALUES (?, ?, ?, ?, 'open', ?, ?)
+ON CONFLICT (scan_id, host, port, proto) DO UPDATE SET banner = excluded.banner
+"""
+
+@lru_cache(maxsize=256)
+def _compile(pattern):
+    """Compile and cache a regular expression used from SQL."""
+    return re.compile(pattern)
+
+def _regexp(pattern, value):
+    """SQL REGEXP operator: whether `value` matches `pattern` anywhere."""
+    return value is not None and _compile(pattern).search(value) is not None
+
+@lru_cache(maxsize=256)
+def _version_pattern(product):
+    """Compile the pattern extracting a product's version number from a banner."""
+    return re.compile(re.escape(product) + r"[\s_/-]*v?(\d+(?:\.\d+)*)", re.IGNORECASE)
+
+def _version_tuple(version):
+    """Turn "7.4.1" into (7, 4, 1)."""
+    return tuple(int(part) for part in version.split(".") if part.isdigit())
+
+def _version_below(banner, product, version):
+    """SQL function: whether the banner names `product` with a version lower than `version`."""
+    if banner is None:
+        return False
+    match = _version_pattern(product).search(banner)
+    return match is not None and _version_tuple(match.group(1)) < _version_tuple(version)
+
+class ResultsStore:
+    """
+    SQLite-backed store for scans, port results and banners.
+
+    A store may be shared between threads (e.g. a scan stream persisted with 'tee' in one thread
+    while banners are recorded in another); every use of its single connection, reads included, is
+    serialized with a lock.
+    """
+
+    def __init__(self, path, batch_size=10000):
+        """
+        Args:
+            path (str): The SQLite database file (":memory:" for a throwaway store).
+            batch_size (int): Number of results written per transaction during ingestion.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+        self.connection.create_function("REGEXP", 2, _regexp, deterministic=True)
+        self.connection.create_function("version_below", 3, _version_below, deterministic=True)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def start_scan(self, scan_type, targets=None, ports=None):
+        """Register a new scan.
+
+        Args:
+            scan_type (str): The scanner used (e.g. "tcp", "syn", "udp").
+            targets (str): The target specification, for reference.
+            ports (str): The port specification, for reference.
+
+        Returns:
+            int: The id of the new scan.
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO scans (scan_type, targets, ports, started_at) VALUES (?, ?, ?, ?)",
+                (scan_type, None if targets is None else str(targets), None if ports is None else str(ports), time.time()))
+        return cursor.lastrowid
+
+    def finish_scan(self, scan_id):
+        """Mark a scan as finished."""
+        with self.lock, self.connection:
+            self.connection.execute("UPDATE scans SET finished_at = ? WHERE id = ?", (time.time(), scan_id))
+
+    def _write_batch(self, scan_id, batch):
+        """Write a batch of ScanResult records in one transaction."""
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(INSERT_RESULT, [(scan_id, host, port, proto, status, rtt, now) for host, port, proto, status, rtt in batch])
+
+    def tee(self, scan_id, results, statuses=None):
+        """Persist a result stream in batches while passing every result through.
+
+        Args:
+            scan_id (int): The scan the results belong to.
+            results (iterable): ScanResult records, e.g. from a scanner's scan_iter.
+            statuses (set): Only persist results with these statuses (e.g. {"open"}). All are persisted if not given.
+
+        Yields:
+            ScanResult: Each input result, unchanged.
+        """
+        batch = []
+        try:
+            for result in results:
+                if statuses is None or result.status in statuses:
+                    batch.append(result)
+                    if len(batch) >= self.batch_size:
+                        self._write_batch(scan_id, batch)
+                        batch = []
+                yield result
+        finally:
+            if batch:
+                self._write_batch(scan_id, batch)
+
+    def ingest(self, scan_id, results, statuses=None):
+        """Persist a whole result stream in batches.
+
+        Args:
+            scan_id (int): The scan the results belong to.
+            results (iterable): ScanResult records, e.g. from a scanner's scan_iter.
+            statuses (set): Only persist results with these statuses. All are persisted if not given.
+
+        Returns:
+            int: The number of results consumed.
+        """
+        count = 0
+        for _ in self.tee(scan_id, results, statuses):
+            count += 1
+        return count
+
+    def record_banners(self, scan_id, banners):
+        """Attach banners to results, creating open-port rows where none exist yet.
+
+        Args:
+            scan_id (int): The scan the banners belong to.
+            banners (iterable): (host, port, proto, banner) tuples or BannerResult records.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(UPSERT_BANNER, [(scan_id, host, port, proto, banner, now) for host, port, proto, banner, *_ in banners])
+
+    def query(self, host=None, port=None, proto=None, status=None, scan_id=None, since=None,
+              banner_regex=None, product=None, version_below=None, limit=None):
+        """Query stored results. Every given criterion must match.
+
+        Args:
+            host (str): Only results for this host.
+            port (int): Only results for this port.
+            proto (str): Only results for this protocol.
+            status (str): Only results with this status (e.g. "open").
+            scan_id (int): Only results of this scan.
+            since (float): Only results recorded at or after this UNIX timestamp.
+            banner_regex (str): Only results whose banner matches this regular expression.
+            product (str): With version_below, the product name to look for in the banner (e.g. "OpenSSH").
+            version_below (str): Only banners naming `product` with a lower version (e.g. "8").
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list: StoredResult rows, newest first.
+        """
+        clauses, params = [], []
+        for column, value in (("host", host), ("port", port), ("proto", proto), ("status", status), ("scan_id", scan_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("scanned_at >= ?")
+            params.append(since)
+        if banner_regex is not None:
+            clauses.append("banner REGEXP ?")
+            params.append(banner_regex)
+        if version_below is not None:
+            if product is None:
+                raise ValueError("version_below requires a product name.")
+            clauses.append("version_below(banner, ?, ?)")
+            params.extend((product, version_below))
+
+        sql = "SELECT scan_id, host, port, proto, status, rtt, banner, scanned_at FROM results"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY scanned_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            return [StoredResult(*row) for row in self.connection.execute(sql, params)]
+
+    def scans(self):
+        """Return (id, scan_type, targets, ports, started_at, finished_at) for every scan, newest first."""
+        with self.lock:
+            return self.connection.execute("SELECT id, scan_type, targets, ports, started_at, finished_at FROM scans ORDER BY id DESC").fetchall()
@@ -5,7 +5,8 @@ A command-line interface (CLI) for the Eater Network Utility Tool. The Eater CLI
 
 Commands:
 - 'use <module_name>': Activate a specific module.
-- 'show [modules | help]': Display available modules or get help for a specific module.
+- 'show [modules | scans | help]': Display available modules, saved scans or get help for a specific module.
+- 'resume <scan_id>': Resume an interrupted port scan.
 - 'quit': Exit the Eater CLI.
 
 Usage:
@@ -14,26 +15,58 @@ Usage:
 3. Use the 'show' command to list available modules or get help (e.g., 'show modules' or 'show help').
 4. Exit the Eater CLI using the 'quit' command.
 
+Given arguments, Eater runs non-interactively instead (e.g. 'python eater.py scan 10.0.0.0/24 1-1024' or 'python eater.py jobs jobs.ini'); see utils/batch_runner.py.
+
 The Eater CLI is an interactive tool for network utility tasks, providing access to various modules. Unauthorized use may violate laws and regulations.
 """
 
+import os
 import cmd
 import sys
+from functools import lru_cache
 from colorama import init
 init(strip=not sys.stdout.isatty())
 from termcolor import cprint 
-from pyfiglet import figlet_format
-from utils.module_generator import ModuleFactory
+from utils.module_generator import ModuleFactory, ProtosearchModule
 from termcolor import colored
 
+BANNER_FONT = "isometric1"
+BANNER_CACHE = os.path.join(os.path.expanduser("~"), ".eater", f"banner-{BANNER_FONT}.txt")
+
+@lru_cache(maxsize=None)
+def render_banner():
+    """Return the figlet banner. It is rendered once and read from a cache file afterwards, so pyfiglet is only loaded on the first start."""
+    try:
+        with open(BANNER_CACHE) as banner_file:
+            return banner_file.read()
+    except OSError:
+        pass
+
+    from pyfiglet import figlet_format
+    ascii_art = figlet_format('EATER', font=BANNER_FONT)
+    try:
+        os.makedirs(os.path.dirname(BANNER_CACHE), exist_ok=True)
+        with open(BANNER_CACHE + ".tmp", "w") as banner_file:
+            banner_file.write(ascii_art)
+        os.replace(BANNER_CACHE + ".tmp", BANNER_CACHE)
+    except OSError:
+        pass
+    return ascii_art
+
 class EaterCLI(cmd.Cmd):
-    ascii_art = figlet_format('EATER', font="isometric1")
-    intro = cprint(ascii_art, 'green', attrs=['bold'])
-    desc_head = cprint('Introduction:', 'green', attrs=['bold'])
-    desc_cont = cprint('Welcome to Eater - The Network Utility Tool\nType `help` to see available commands.' , 'white', attrs=['bold'])
     prompt="Command: "
     activated_module = None
 
+    def preloop(self):
+        """Print the banner and introduction when the shell starts."""
+        self.print_intro()
+
+    def print_intro(self):
+        """Print the banner and introduction."""
+        cprint(render_banner(), 'green', attrs=['bold'])
+        cprint('Introduction:', 'green', attrs=['bold'])
+        cprint('Welcome to Eater - The Network Utility Tool\nType `help` to see available commands.' , 'white', attrs=['bold'])
+
     def do_use(self, module_name):
         """Use a specific module.
 
@@ -61,16 +94,25 @@ class EaterCLI(cmd.Cmd):
         else:
             print("No module activated. Use 'use <module_name>' to activate a module.")
 
+    def do_resume(self, scan_id):
+        """Resume an interrupted port scan.
+
+        Args:
+            scan_id (str): The scan id printed when the scan was started (see 'show scans').
+        """
+        scan_id = scan_id.strip()
+        if not scan_id:
+            print("Usage: resume <scan_id>. Type 'show scans' to list saved scans.")
+            return
+        ProtosearchModule().resume(scan_id)
+
     def do_cls(self, arg):
         """Clear activated module.
 
         Args:
             arg (str): Any arguments to pass to the activated module.
         """
-        ascii_art = figlet_format('EATER', font="isometric1")
-        intro = cprint(ascii_art, 'green', attrs=['bold'])
-        desc_head = cprint('Introduction:', 'green', attrs=['bold'])
-        desc_cont = cprint('Welcome to Eater - The Network Utility Tool\nType `help` to see available commands.' , 'white', attrs=['bold'])
+        self.print_intro()
         self.activated_module = None
         self.prompt = f"\nCommand: "
 
@@ -91,13 +133,19 @@ class EaterCLI(cmd.Cmd):
         print("\nYou can use modules with 'use' command.")
         if arg == "modules":
             print("Available modules:\n")
-            print("1. protosearch - Port scanning module\n")
-            print("2. bannergrabber - Banner Grabber module\n")
-            print("3. wireless-eater - Wireless Eater module\n")
-            print("4. payload - Generate Payload\n")
+            for number, spec in enumerate(ModuleFactory.registry.specs(), 1):
+                print(f"{number}. {spec.name} - {spec.description}\n")
+        elif arg == "scans":
+            from utils.checkpoint import ScanCheckpoint
+            scan_ids = ScanCheckpoint.saved_ids()
+            if not scan_ids:
+                print("No saved scans.\n")
+            for scan_id in scan_ids:
+                print(f"{scan_id}\n")
         elif arg == "help":
             print("To use a module, type 'use <module_name>'.\n")
             print("To see available modules, type 'show modules'.\n")
+            print("To resume an interrupted scan, type 'resume <scan_id>' (see 'show scans').\n")
         else:
             print("Unknown command. Type 'show modules' to see available modules or 'show help' for more information.\n")
 
@@ -107,5 +155,8 @@ class EaterCLI(cmd.Cmd):
         return True
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from utils.batch_runner import main
+        sys.exit(main(sys.argv[1:]))
     eater_cli = EaterCLI()
     eater_cli.cmdloop()
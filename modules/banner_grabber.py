@@ -3,9 +3,15 @@ Banner Grabber
 
 This module provides classes for grabbing banners from remote services running on specified target hosts using various network protocols, including TCP, UDP, ICMP (Ping), and SCTP. The BannerGrabberFactory allows the creation of specific banner grabber instances based on the selected banner type. Each banner grabber class is responsible for grabbing banners from services and provides methods for this purpose.
 
+Silent-first services (HTTP, TLS, RDP, databases) are identified by sending the probes of the service probe library likely for the port and fingerprinting the responses (see modules/service_probes.py).
+
+Banners for many (host, port) pairs are grabbed concurrently on an asyncio engine: a bounded pool of worker coroutines keeps at most `concurrency` sockets open, every connection has a read deadline and a cap on the number of bytes read, so grabbing the banners of a whole scan takes roughly one timeout instead of one timeout per port.
+
 Classes:
+- BannerResult: A single banner grab outcome (host, port, proto, banner, service fingerprint).
 - BannerGrabberFactory: Factory for creating banner grabber instances based on the banner type.
 - BannerGrabberBase: Abstract base class for banner grabbers.
+- StreamBannerGrabber: Shared implementation for connection-oriented (TCP, SCTP) grabbers.
 - TCPBannerGrabber: Banner grabber for TCP ports.
 - UDPBannerGrabber: Banner grabber for UDP ports.
 - ICMPBannerGrabber: Banner grabber for ICMP Echo Request (Ping).
@@ -13,38 +19,178 @@ Classes:
 
 Usage:
 1. Choose the type of banner grabber (e.g., "tcp", "udp", "icmp", "sctp").
-2. Specify the target hostname or IP address and the port from which to grab the banner.
+2. Specify the target hostname or IP address and the port from which to grab the banner, or pass many (host, port) pairs (e.g. a ScanPlanner or a scan's open ports) to 'grab_iter'.
 3. Execute the banner grabber to attempt to retrieve the service banner from the specified target.
 
 This module is intended for network diagnostics and information gathering. Unauthorized use may violate laws and regulations.
 """
 
+import time
 import socket
+import asyncio
+from collections import namedtuple
 from abc import ABC, abstractmethod
-        
+from modules.port_scanner import effective_concurrency, relay_to_thread, stream_from_thread
+from modules.service_probes import Probe, default_library
+from utils.rate_limiter import get_scheduler
+from utils.plugin_registry import PluginRegistry
+from utils.telemetry import ScanTelemetry
+from utils.resolver import get_resolver
+
+DEFAULT_CONCURRENCY = 500
+MAX_BANNER_BYTES = 1024
+READ_GRACE = 0.1
+
+BannerResult = namedtuple("BannerResult", ["host", "port", "proto", "banner", "service"], defaults=(None,))
+NULL_PROBE = Probe("NULL", None, b"", None, False)
+
+def decode_banner(data):
+    """Decode raw banner bytes, or return None when nothing was received."""
+    if not data:
+        return None
+    return data.decode("utf-8", errors="replace").strip()
+
+def describe_service(fingerprint):
+    """Format a Fingerprint as " [service product version]" for display, or "" when there is none."""
+    if fingerprint is None:
+        return ""
+    return " [" + " ".join(part for part in fingerprint if part) + "]"
+
+def read_banner(sock, timeout, max_bytes):
+    """Read a banner from a connected blocking socket.
+
+    Reading stops at `max_bytes`, at end of stream, at the read deadline, or once data has
+    arrived and no more follows within READ_GRACE seconds.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        timeout (float): Seconds until the read deadline.
+        max_bytes (int): Maximum number of bytes to read.
+
+    Returns:
+        bytes: The data received.
+    """
+    deadline = time.monotonic() + timeout
+    data = b""
+    while len(data) < max_bytes:
+        remaining = deadline - time.monotonic()
+        if data:
+            remaining = min(remaining, READ_GRACE)
+        if remaining <= 0:
+            break
+        sock.settimeout(remaining)
+        try:
+            chunk = sock.recv(max_bytes - len(data))
+        except socket.timeout:
+            break
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+async def read_banner_async(sock, timeout, max_bytes):
+    """Read a banner from a connected non-blocking socket without blocking the event loop.
+
+    Same stopping rules as 'read_banner'.
+
+    Args:
+        sock (socket.socket): The connected non-blocking socket.
+        timeout (float): Seconds until the read deadline.
+        max_bytes (int): Maximum number of bytes to read.
+
+    Returns:
+        bytes: The data received.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    data = b""
+    while len(data) < max_bytes:
+        remaining = deadline - loop.time()
+        if data:
+            remaining = min(remaining, READ_GRACE)
+        if remaining <= 0:
+            break
+        try:
+            chunk = await asyncio.wait_for(loop.sock_recv(sock, max_bytes - len(data)), remaining)
+        except asyncio.TimeoutError:
+            break
+        if not chunk:
+            break
+        data += chunk
+    return data
+
 class BannerGrabberBase(ABC):
     """"
     Abstract base class for banner grabbers.
     """
+    proto = "tcp"
+
+    def __init__(self, timeout=2, max_bytes=MAX_BANNER_BYTES, concurrency=DEFAULT_CONCURRENCY, probes=True, scheduler=None, resolver=None):
+        """
+        Args:
+            timeout (float): Seconds to wait for the connection, and read deadline for the banner.
+            max_bytes (int): Maximum number of banner bytes read per connection.
+            concurrency (int): Maximum number of connections open at once when grabbing many banners.
+            probes (bool): Send the service probes likely for each port and fingerprint the responses.
+                When False, only the service's own greeting is read.
+            scheduler (ProbeScheduler): Rate limits every connection is drawn against. The shared scheduler configured in config/eater.ini if not given.
+            resolver (Resolver): Resolves hostname targets once per grab instead of on every connection. The shared resolver if not given.
+        """
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.concurrency = concurrency
+        self.probes = probes
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.resolver = resolver if resolver is not None else get_resolver()
+        self.telemetry = ScanTelemetry()
+
     @abstractmethod
-    def grab_banner(self, target, port):
+    def exchange(self, target, port, payload):
         """
-        Attempt to grab the banner from a remote service running on a specified target and port.
+        Connect to a remote service, send a payload and read the response.
 
         Args:
             target (str): The target hostname or IP address.
-            port (int): The target port on which to grab the banner.
+            port (int): The target port.
+            payload (bytes): The probe payload. Nothing is sent for an empty payload on connection-oriented protocols.
 
-        Prints the banner information to the console if successful. Handles socket-related exceptions and
-        general exceptions, providing error messages in case of issues.
+        Returns:
+            bytes: The response, empty if nothing arrived before the read deadline.
+
+        Raises:
+            OSError: If the connection fails or times out.
         """
         pass
 
-class TCPBannerGrabber(BannerGrabberBase):
-    """
-    Banner grabber for TCP ports.
-    """
-    
+    async def exchange_async(self, target, port, payload):
+        """
+        Same as 'exchange' without blocking the event loop. Grabbers without a non-blocking
+        implementation run 'exchange' in the loop's default thread pool.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.exchange, target, port, payload)
+
+    def probe_plan(self, port):
+        """Return the probes to send to a port, in order."""
+        if not self.probes:
+            return [NULL_PROBE]
+        return default_library().probes_for(port, self.proto) or [NULL_PROBE]
+
+    def identify(self, probe, response, banner, fingerprint):
+        """Fold one probe response into the grab outcome.
+
+        The first response is kept as the banner until a response is fingerprinted.
+
+        Returns:
+            tuple: The updated (banner, fingerprint).
+        """
+        if not response:
+            return banner, fingerprint
+        if self.probes:
+            fingerprint = default_library().match(response, probe)
+        if banner is None or fingerprint is not None:
+            banner = decode_banner(response)
+        return banner, fingerprint
+
     def grab_banner(self, target, port):
         """
         Attempt to grab the banner from a remote service running on a specified target and port.
@@ -55,136 +201,206 @@ class TCPBannerGrabber(BannerGrabberBase):
 
         Prints the banner information to the console if successful. Handles socket-related exceptions and
         general exceptions, providing error messages in case of issues.
+
+        Returns:
+            str: The banner, or None if none could be grabbed.
         """
+        banner = fingerprint = None
         try:
-            tcp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            tcp_sock.settimeout(2)
-            tcp_sock.connect((target,port))
-
-            banner = socket.recv(1024).decode('utf-8')
-            print(f"Banner from {target}:{port} for TCP -> {banner}")
-        
+            address = self.resolver.gethostbyname(target)
+            for probe in self.probe_plan(port):
+                self.scheduler.acquire(address)
+                banner, fingerprint = self.identify(probe, self.exchange(address, port, probe.payload), banner, fingerprint)
+                if fingerprint is not None:
+                    break
         except (socket.timeout, ConnectionRefusedError):
-            print(f"Unable to grab banner from {target}:{port}")
+            pass
         except Exception as e:
             print(f"An error occured: {e}")
-        finally:
-            tcp_sock.close()
+            return None
 
-class UDPBannerGrabber(BannerGrabberBase):
-    """
-    Banner grabber for UDP ports.
-    """
+        if banner is None:
+            print(f"Unable to grab banner from {target}:{port}")
+        else:
+            print(f"Banner from {target}:{port} for {self.proto.upper()} -> {banner}{describe_service(fingerprint)}")
+        return banner
 
-    def grab_banner(self, target, port):
+    async def grab(self, target, port):
         """
-        Attempt to grab the banner from a remote service running on a specified target and port.
+        Grab a single banner on the asyncio engine, trying the likely probes until one is fingerprinted.
 
         Args:
             target (str): The target hostname or IP address.
             port (int): The target port on which to grab the banner.
 
-        Prints the banner information to the console if successful. Handles socket-related exceptions and
-        general exceptions, providing error messages in case of issues.
+        Returns:
+            BannerResult: The outcome; banner is None if the connection failed or nothing was received.
         """
+        banner = fingerprint = None
+        outcome = "empty"
+        telemetry = self.telemetry
         try:
-            udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            udp_socket.settimeout(2)
-            udp_socket.connect((target, port))
+            address = await self.resolver.gethostbyname_async(target)
+        except (socket.gaierror, UnicodeError):
+            telemetry.incr("banners", outcome="unresolved")
+            return BannerResult(target, port, self.proto, None, None)
+        for probe in self.probe_plan(port):
+            await self.scheduler.acquire_async(address)
+            telemetry.incr("banner_probes")
+            telemetry.add_gauge("in_flight", 1, stage="banner")
+            try:
+                response = await self.exchange_async(address, port, probe.payload)
+            except (OSError, asyncio.TimeoutError):
+                outcome = "failed" if banner is None else outcome
+                break
+            finally:
+                telemetry.add_gauge("in_flight", -1, stage="banner")
+            banner, fingerprint = self.identify(probe, response, banner, fingerprint)
+            if fingerprint is not None:
+                break
+        telemetry.incr("banners", outcome="grabbed" if banner is not None else outcome)
+        return BannerResult(target, port, self.proto, banner, fingerprint)
 
-            banner = socket.recv(1024).decode('utf-8')
-            print(f"Banner from {target}:{port} for UDP -> {banner}")
-        
-        except (socket.timeout, ConnectionRefusedError):
-            print(f"Unable to connect socket {target}:{port}")
-        except Exception as e:
-            print(f"An error occured: {e}")
-        finally:
-            udp_socket.close()
+    async def grab_probes_async(self, probes, on_result):
+        """
+        Grab banners from (target, port) pairs with at most `concurrency` connections open.
 
-class ICMPBannerGrabber(BannerGrabberBase):
-    """
-    Banner grabber for ICMP Echo Request (Ping).
-    """
-    def grab_banner(self, target, port):
+        A fixed set of worker coroutines pull from one shared iterator, so the number of open
+        sockets stays bounded however many pairs the iterator yields.
+
+        Args:
+            probes (iterable): (target, port) pairs, e.g. a ScanPlanner or the open ports of a scan.
+            on_result (callable): Called with each BannerResult as soon as it is available. If it
+                returns an awaitable, the worker awaits it before taking the next pair.
         """
-        Attempt to grab the banner from a remote service running on a specified target and port.
+        probe_iter = iter(probes)
+
+        async def worker():
+            for target, port in probe_iter:
+                pending = on_result(await self.grab(target, port))
+                if pending is not None:
+                    await pending
+
+        workers = effective_concurrency(self.concurrency)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+    def grab_iter(self, probes):
+        """
+        Grab banners from (target, port) pairs concurrently and yield them as they complete.
+
+        The event loop hands results over from an executor thread, so a slow consumer does not
+        stall the grabs in progress or eat into their timeouts.
 
         Args:
-            target (str): The target hostname or IP address.
-            port (int): The target port on which to grab the banner.
+            probes (iterable): (target, port) pairs, e.g. a ScanPlanner or the open ports of a scan.
 
-        Prints the banner information to the console if successful. Handles socket-related exceptions and
-        general exceptions, providing error messages in case of issues.
+        Yields:
+            BannerResult: One record per pair, in completion order.
         """
-        try:
-            icmp_socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
-            icmp_socket.settimeout(2)
-            icmp_socket.connect((target, port))
+        def producer(emit):
+            asyncio.run(relay_to_thread(lambda put: self.grab_probes_async(probes, put), emit, effective_concurrency(self.concurrency)))
 
-            banner = icmp_socket.recv(1024).decode('utf-8')
-            print(f"Banner from {target}:{port} for ICMP -> {banner}")
-        except (socket.timeout, ConnectionRefusedError):
-            print(f"Unable to connect {target}:{port}")
-        except Exception as e:
-            print(f"An error occured {target}:{port}")
-        finally:
-            icmp_socket.close()
+        return stream_from_thread(producer, effective_concurrency(self.concurrency), self.telemetry, "banners")
 
-class SCTPBannerGrabber(BannerGrabberBase):
+class StreamBannerGrabber(BannerGrabberBase):
     """
-    Banner grabber for SCTP ports.
+    Shared implementation for connection-oriented grabbers (TCP, SCTP).
     """
-    def grab_banner(self, target, port):
-        """
-        Attempt to grab the banner from a remote service running on a specified target and port.
+    socket_proto = 0
 
-        Args:
-            target (str): The target hostname or IP address.
-            port (int): The target port on which to grab the banner.
+    def exchange(self, target, port, payload):
+        """Connect, send the payload and read the response (see BannerGrabberBase.exchange)."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM, self.socket_proto) as stream_sock:
+            stream_sock.settimeout(self.timeout)
+            stream_sock.connect((target, port))
+            if payload:
+                stream_sock.sendall(payload)
+            return read_banner(stream_sock, self.timeout, self.max_bytes)
 
-        Prints the banner information to the console if successful. Handles socket-related exceptions and
-        general exceptions, providing error messages in case of issues.
-        """
-        try:
-            sctp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_SCTP)
-            sctp_socket.settimeout(1024)
-            sctp_socket.connect((target,socket))
+    async def exchange_async(self, target, port, payload):
+        """Connect, send the payload and read the response with non-blocking socket operations."""
+        loop = asyncio.get_running_loop()
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM, self.socket_proto) as stream_sock:
+            stream_sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(stream_sock, (target, port)), self.timeout)
+            if payload:
+                await loop.sock_sendall(stream_sock, payload)
+            return await read_banner_async(stream_sock, self.timeout, self.max_bytes)
+
+class TCPBannerGrabber(StreamBannerGrabber):
+    """
+    Banner grabber for TCP ports.
+    """
+    proto = "tcp"
+
+class UDPBannerGrabber(BannerGrabberBase):
+    """
+    Banner grabber for UDP ports.
+
+    UDP services only answer datagrams, so the probe payload (an empty datagram for ports without a
+    protocol-specific probe) is always sent.
+    """
+    proto = "udp"
+
+    def exchange(self, target, port, payload):
+        """Send the payload as one datagram and read the reply (see BannerGrabberBase.exchange)."""
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp_socket:
+            udp_socket.settimeout(self.timeout)
+            udp_socket.connect((target, port))
+            udp_socket.send(payload)
+            return read_banner(udp_socket, self.timeout, self.max_bytes)
+
+    async def exchange_async(self, target, port, payload):
+        """Send the payload as one datagram and read the reply with non-blocking socket operations."""
+        loop = asyncio.get_running_loop()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp_socket:
+            udp_socket.setblocking(False)
+            await loop.sock_connect(udp_socket, (target, port))
+            await loop.sock_sendall(udp_socket, payload)
+            return await read_banner_async(udp_socket, self.timeout, self.max_bytes)
+
+class ICMPBannerGrabber(BannerGrabberBase):
+    """
+    Banner grabber for ICMP Echo Request (Ping).
+    """
+    proto = "icmp"
+
+    def exchange(self, target, port, payload):
+        """Read an ICMP packet from the target (see BannerGrabberBase.exchange)."""
+        with socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP) as icmp_socket:
+            icmp_socket.settimeout(self.timeout)
+            icmp_socket.connect((target, port))
+            return read_banner(icmp_socket, self.timeout, self.max_bytes)
+
+class SCTPBannerGrabber(StreamBannerGrabber):
+    """
+    Banner grabber for SCTP ports.
+    """
+    proto = "sctp"
+    socket_proto = getattr(socket, "IPPROTO_SCTP", 132)
 
-            banner = sctp_socket.recv(1024).decode('utf-8')
-            print(f"Banner from {target}:{port} -> {banner}")
-        except (socket.timeout, ConnectionRefusedError):
-            print(f"Unable to connect  {target}:{port}")
-        except Exception as e:
-            print(f"An error occured {target}:{port}")
-        finally:
-            sctp_socket.close()
-            
 class BannerGrabberFactory:
     """ Banner Grabber Factory Class"""
-    banner_classes = {
-            "tcp": TCPBannerGrabber(),
-            "udp": UDPBannerGrabber(),
-            "icmp": ICMPBannerGrabber(),
-            "sctp": SCTPBannerGrabber()
-        }
+    registry = PluginRegistry("banner_grabbers")
+    registry.register("tcp", "modules.banner_grabber:TCPBannerGrabber", "TCP banners and service probes")
+    registry.register("udp", "modules.banner_grabber:UDPBannerGrabber", "UDP service probes")
+    registry.register("icmp", "modules.banner_grabber:ICMPBannerGrabber", "ICMP echo replies")
+    registry.register("sctp", "modules.banner_grabber:SCTPBannerGrabber", "SCTP banners and service probes")
 
     @staticmethod
-    def generate_banner_grabber(banner_type):
+    def generate_banner_grabber(banner_type, **options):
         """
         Factory method to generate an instance of a banner grabber.
 
         Args:
             banner_type (str): Type of the banner grabber (e.g., "tcp", "udp", "icmp", "sctp").
+            **options: Keyword arguments passed to the banner grabber constructor (e.g. timeout).
 
         Returns:
             BannerGrabberBase: An instance of the specified banner grabber class.
+
+        Raises:
+            ValueError: If the banner type is unknown or its plugin cannot be loaded.
         """
-        banner_type = banner_type.lower()
-        banner_class = BannerGrabberFactory.banner_classes.get(banner_type)
-        if banner_class:
-            scanner_instance = banner_class()
-            return scanner_instance
-        else:
-            raise ValueError(f"Cracker type '{banner_type}' is not recognized.")
+        return BannerGrabberFactory.registry.create(banner_type, **options)
             
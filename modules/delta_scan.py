@@ -0,0 +1,131 @@
+"""
+Delta Scan
+
+This module rescans an estate incrementally, starting from the results of the previous scan of the same targets and ports stored in a ResultsStore. A delta scan probes, in this order:
+
+1. every port that was open in the previous scan (re-verified first, so closures are reported early);
+2. a rotating slice of the rest of the probe space: with a sample of 0.1, the n-th delta scan of a job sweeps the probes at planner positions p with p % 10 == n % 10. The planner's seed is derived from the scan type, targets and ports, so the slices of ten consecutive runs cover the whole space exactly once.
+
+Results are classified against the previous scan into a change feed: ports newly opened, ports closed (no longer answering as open), and banners changed. Banners are compared by their first line (e.g. an SSH version string or an HTTP status line), so headers such as an HTTP Date do not count as changes. Every delta scan is stored as a regular scan holding the full set of open ports known after it, so it is the baseline of the next one. Without a previous scan the first run sweeps the whole space and reports no changes.
+
+Classes:
+- Change: One entry of the change feed.
+- DeltaScan: The probe order and change classification of one delta scan.
+
+Functions:
+- scan_seed: The planner seed of a scan type, target and port specification.
+- find_baseline: The latest finished scan of a specification in a results store, and how many there are.
+
+Usage:
+1. 'delta = DeltaScan(results_store, "tcp", "10.0.0.0/16", "1-1024", sample=0.1)'
+2. Scan 'delta.probes()' with any scanner, persisting results under 'results_store.start_scan(...)'.
+3. Pass every ScanResult and BannerResult to 'delta.classify(record)', which returns a Change or None.
+4. Once the scan ends, store 'delta.carried_banners()' (banners of still-open ports that were not grabbed again), so the next baseline keeps them.
+
+This module is intended for network diagnostics and security testing purposes. Unauthorized use may violate laws and regulations.
+"""
+
+import hashlib
+from collections import namedtuple
+from modules.scan_planner import ScanPlanner
+
+DEFAULT_SAMPLE = 0.1
+
+Change = namedtuple("Change", ["kind", "host", "port", "proto", "old", "new"])
+
+def scan_seed(scan_type, targets, ports):
+    """Return the planner seed of a scan specification, the same for every run of it."""
+    return int.from_bytes(hashlib.sha256(f"{scan_type.lower()}|{targets}|{ports}".encode()).digest()[:8], "big")
+
+def find_baseline(results_store, scan_type, targets, ports):
+    """Find the latest finished scan of a specification.
+
+    Args:
+        results_store (ResultsStore): The store holding previous scans.
+        scan_type (str): The scan type.
+        targets (str): The target specification, as stored.
+        ports (str): The port specification, as stored.
+
+    Returns:
+        tuple: (scan id or None, number of finished scans of the specification).
+    """
+    matching = [scan_id for scan_id, stored_type, stored_targets, stored_ports, _, finished_at in results_store.scans()
+                if finished_at is not None and stored_type.lower() == scan_type.lower()
+                and stored_targets == str(targets) and stored_ports == str(ports)]
+    return (matching[0] if matching else None), len(matching)
+
+def banner_key(banner):
+    """Return the part of a banner compared between scans: its first non-empty line."""
+    return next((line.strip() for line in banner.splitlines() if line.strip()), "")
+
+class DeltaScan:
+    """
+    Orders the probes of an incremental rescan and classifies its results against the previous scan.
+    """
+
+    def __init__(self, results_store, scan_type, targets, ports, sample=DEFAULT_SAMPLE, baseline=None, epoch=None):
+        """
+        Args:
+            results_store (ResultsStore): The store holding previous scans of the specification.
+            scan_type (str): The scan type.
+            targets (str): The target specification.
+            ports (str): The port specification.
+            sample (float): Fraction of the remaining probe space swept per run (0 < sample <= 1).
+            baseline (int): The scan compared against. The latest finished scan of the specification if not given.
+            epoch (int): Selects the swept slice. The number of finished scans of the specification if not given.
+
+        Raises:
+            ValueError: If the sample is out of range or the targets or ports are invalid.
+        """
+        if not 0 < sample <= 1:
+            raise ValueError(f"The sample must be above 0 and at most 1, not {sample}.")
+        found, runs = find_baseline(results_store, scan_type, targets, ports)
+        self.baseline = baseline if baseline is not None else found
+        self.epoch = epoch if epoch is not None else runs
+        self.planner = ScanPlanner(targets, ports, scan_seed(scan_type, targets, ports))
+        self.slices = 1 if self.baseline is None else max(1, min(round(1 / sample), len(self.planner)))
+        self.slice = self.epoch % self.slices
+        rows = results_store.query(scan_id=self.baseline, status="open") if self.baseline is not None else []
+        self.known = {(row.host, row.port): (row.proto, row.banner) for row in rows}
+        self.still_open = set()
+        self.grabbed = set()
+
+    def __len__(self):
+        """The number of probes of the scan (known-open ports and the swept slice, which may overlap)."""
+        sweep = len(self.planner) // self.slices + (self.slice < len(self.planner) % self.slices)
+        return len(self.known) + sweep
+
+    def probes(self):
+        """Yield the (host, port) probes: known-open ports first, then the swept slice without them."""
+        yield from sorted(self.known)
+        for probe in self.planner.iter_shard(self.slice, self.slices):
+            if probe not in self.known:
+                yield probe
+
+    def classify(self, record):
+        """Compare a ScanResult or BannerResult with the previous scan.
+
+        Returns:
+            Change: The change the record shows, or None.
+        """
+        key = (record.host, record.port)
+        known = self.known.get(key)
+        if hasattr(record, "banner"):
+            if record.banner is not None:
+                self.grabbed.add(key)
+            if known is None or known[1] is None or record.banner is None or banner_key(record.banner) == banner_key(known[1]):
+                return None
+            return Change("banner_changed", record.host, record.port, record.proto, known[1], record.banner)
+        if known is not None:
+            if record.status == "open":
+                self.still_open.add(key)
+                return None
+            return Change("closed", record.host, record.port, record.proto, "open", record.status)
+        if record.status == "open" and self.baseline is not None:
+            return Change("opened", record.host, record.port, record.proto, None, "open")
+        return None
+
+    def carried_banners(self):
+        """Return (host, port, proto, banner) of the previous scan for ports still open whose banner was not grabbed again."""
+        return [(host, port, self.known[(host, port)][0], self.known[(host, port)][1])
+                for host, port in self.still_open - self.grabbed if self.known[(host, port)][1] is not None]
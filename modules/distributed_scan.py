@@ -0,0 +1,435 @@
+"""
+Distributed Scan
+
+This module spreads one scan over several machines. A coordinator plans the scan, cuts the probe walk into shards (probe position p belongs to shard p % shards, see 'ScanPlanner.iter_shard') and leases the shards to workers over TCP. Workers scan their leased shard with a local engine and stream the results back in batches; the coordinator merges them into the results store as they arrive. A lease is renewed by every result batch and by heartbeats. A lease that is not renewed within the lease timeout, because its worker died or lost the network, goes back to the queue and is leased to the next worker that asks. The coordinator remembers which (host, port) results each unfinished shard has merged and drops repeats, so a shard scanned again after a re-lease is neither counted nor reported twice. Results are written to the results store on a separate thread, in arrival order, so a slow write does not hold up the other workers' connections.
+
+Workers receive the coordinator's resolved address ranges, port ranges and permutation seed, so every worker walks exactly the same probe order. Adding a worker adds its scan capacity; no worker needs to know about the others.
+
+Protocol: one JSON object per line in each direction, request then response, on a persistent TCP connection. Requests carry an "op" ("lease", "results", "heartbeat", "complete") and, if the coordinator was given one, the shared "token".
+
+Classes:
+- Coordinator: Plans a scan, leases its shards to workers and merges their results.
+- ScanWorker: Leases shards from a coordinator and scans them.
+
+Usage:
+1. On one box: 'python eater.py coordinate 10.0.0.0/16 1-1024 --listen 0.0.0.0:7878 --database results.db --token <secret>'.
+2. On every scan box: 'python eater.py work coordinator-host:7878 --token <secret>'.
+3. The coordinator exits once every shard has been scanned; workers exit when the coordinator reports the scan done.
+
+This module is intended for network diagnostics and security testing purposes. Unauthorized use may violate laws and regulations.
+"""
+
+import os
+import json
+import hmac
+import time
+import socket
+import asyncio
+import secrets
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from modules.port_scanner import PortScannerFactory, ScanResult
+from modules.scan_planner import ScanPlanner
+from utils.telemetry import ScanTelemetry
+
+DEFAULT_PORT = 7878
+DEFAULT_SHARDS = 64
+DEFAULT_LEASE_TIMEOUT = 30.0
+RESULT_BATCH = 512
+FLUSH_INTERVAL = 0.5
+MAX_MESSAGE = 16 * 1024 * 1024
+IDLE_WAIT = 1.0
+
+def parse_address(address, default_host="0.0.0.0"):
+    """Parse "host:port", ":port" or "host" into a (host, port) pair."""
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host.strip("[]") or default_host, int(port) if port else DEFAULT_PORT
+
+def _ip(address):
+    return socket.inet_ntoa(address.to_bytes(4, "big"))
+
+class Coordinator:
+    """
+    Leases the shards of a planned scan to workers and merges the results they send back.
+    """
+
+    def __init__(self, scan_type, targets, ports, shards=DEFAULT_SHARDS, seed=None, options=None, results_store=None,
+                 database=None, lease_timeout=DEFAULT_LEASE_TIMEOUT, token=None, on_result=None):
+        """
+        Args:
+            scan_type (str): The engine workers scan with (e.g. "tcp", "syn", "udp").
+            targets (str): The target specification; hostnames are resolved here, once.
+            ports (str): The port specification.
+            shards (int): Number of leases the probe walk is cut into; more shards than workers balances uneven workers.
+            seed (int): Key for the probe order. Random if not given.
+            options (dict): Engine options sent to every worker (e.g. {"concurrency": 2000, "timeout": 1}).
+            results_store (ResultsStore): An open store the results are merged into.
+            database (str): A results database opened (and closed) by the coordinator, if no store is given.
+            lease_timeout (float): Seconds a lease stays valid without results or heartbeats.
+            token (str): Shared secret workers must present. Any worker is accepted if not given.
+            on_result (callable): Called once with every ScanResult as it is merged, on the coordinator's event loop.
+
+        Raises:
+            ValueError: If the scan type is unknown or the targets or ports are invalid.
+        """
+        self.scan_type = scan_type.lower()
+        self.proto = PortScannerFactory.registry.load(self.scan_type).proto
+        self.planner = ScanPlanner(targets, ports, seed)
+        self.shards = max(1, min(shards, len(self.planner.permutation)))
+        self.lease_timeout = lease_timeout
+        self.token = token
+        self.on_result = on_result
+        self.own_store = results_store is None and database is not None
+        if self.own_store:
+            from database.results_store import ResultsStore
+            results_store = ResultsStore(database)
+        self.results_store = results_store
+        self.database_scan_id = results_store.start_scan(self.scan_type, targets, ports) if results_store is not None else None
+        self.job = {
+            "id": secrets.token_hex(8),
+            "scan_type": self.scan_type,
+            "targets": [f"{_ip(hosts.start)}-{_ip(hosts.stop - 1)}" for hosts in self.planner.host_ranges],
+            "ports": ",".join(f"{ports.start}-{ports.stop - 1}" for ports in self.planner.port_ranges),
+            "seed": self.planner.seed,
+            "shards": self.shards,
+            "options": dict(options or {}),
+            "lease_timeout": lease_timeout,
+        }
+        self.pending = deque(range(self.shards))
+        self.leases = {}
+        self.merged = {}
+        self.done = set()
+        self.store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eater-coordinator-store") if results_store is not None else None
+        self.counts = {"open": 0, "closed": 0, "filtered": 0, "open|filtered": 0}
+        self.telemetry = ScanTelemetry(len(self.planner))
+        self.finished = threading.Event()
+        self.loop = None
+        self.server = None
+        self.connections = set()
+        self.thread = None
+        self.address = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start serving leases in a background thread.
+
+        Returns:
+            tuple: The (host, port) the coordinator listens on (useful with port 0).
+        """
+        started = threading.Event()
+        errors = []
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.server = self.loop.run_until_complete(asyncio.start_server(self._handle, host, port, limit=MAX_MESSAGE))
+                self.address = self.server.sockets[0].getsockname()[:2]
+            except OSError as e:
+                errors.append(e)
+                return
+            finally:
+                started.set()
+            self.loop.run_forever()
+            # Closing the connections tells workers still waiting for a lease that the coordinator is gone.
+            self.server.close()
+            for writer in list(self.connections):
+                writer.close()
+            self.loop.run_until_complete(self.server.wait_closed())
+            handlers = asyncio.all_tasks(self.loop)
+            for handler in handlers:
+                handler.cancel()
+            self.loop.run_until_complete(asyncio.gather(*handlers, return_exceptions=True))
+            self.loop.close()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self.address
+
+    def wait(self, timeout=None):
+        """Wait until every shard has been scanned. Returns whether the scan finished."""
+        return self.finished.wait(timeout)
+
+    def stop(self):
+        """Stop serving and close the coordinator's own results store."""
+        if self.loop is not None and self.thread is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        if self.store_writer is not None:
+            self.store_writer.shutdown()
+        if self.own_store and self.results_store is not None:
+            self.results_store.close()
+            self.results_store = None
+
+    def run(self, host="0.0.0.0", port=DEFAULT_PORT):
+        """Serve until every shard has been scanned, then stop.
+
+        Returns:
+            dict: The number of results per status.
+        """
+        self.start(host, port)
+        try:
+            while not self.wait(0.5):
+                pass
+        finally:
+            self.stop()
+        return self.counts
+
+    async def _handle(self, reader, writer):
+        """Answer the requests of one worker connection."""
+        self.connections.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                try:
+                    response = self.dispatch(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"error": f"Bad request: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    def dispatch(self, request):
+        """Answer one request.
+
+        Args:
+            request (dict): The decoded request.
+
+        Returns:
+            dict: The response.
+        """
+        if self.token is not None and not hmac.compare_digest(str(request.get("token", "")), self.token):
+            return {"error": "Unauthorized."}
+        operation = request["op"]
+        if operation == "lease":
+            return self._lease(str(request.get("worker", "?")))
+        lease_id = request["lease"]
+        shard = self._valid_lease(lease_id)
+        if shard is None:
+            return {"ok": False, "reason": "Lease expired or unknown."}
+        if operation == "results":
+            self._merge(shard, request["results"])
+        elif operation == "complete":
+            del self.leases[shard]
+            del self.merged[shard]
+            self.done.add(shard)
+            if len(self.done) == self.shards:
+                self._finish()
+            return {"ok": True}
+        elif operation != "heartbeat":
+            return {"error": f"Unknown op '{operation}'."}
+        _, worker, _ = self.leases[shard]
+        self.leases[shard] = (lease_id, worker, time.monotonic() + self.lease_timeout)
+        return {"ok": True}
+
+    def _expire(self):
+        """Put the shards of expired leases back in the queue."""
+        now = time.monotonic()
+        for shard, (_, worker, deadline) in list(self.leases.items()):
+            if deadline <= now:
+                del self.leases[shard]
+                self.pending.appendleft(shard)
+                self.telemetry.incr("leases_expired")
+                print(f"Lease of shard {shard} held by {worker} expired; it will be leased again.")
+
+    def _lease(self, worker):
+        self._expire()
+        if len(self.done) == self.shards:
+            return {"done": True}
+        if not self.pending:
+            earliest = min(deadline for _, _, deadline in self.leases.values())
+            return {"wait": max(0.05, min(IDLE_WAIT, earliest - time.monotonic()))}
+        shard = self.pending.popleft()
+        lease_id = secrets.token_hex(8)
+        self.leases[shard] = (lease_id, worker, time.monotonic() + self.lease_timeout)
+        self.merged.setdefault(shard, set())
+        self.telemetry.incr("leases")
+        return {"lease": lease_id, "shard": shard, "job": self.job}
+
+    def _valid_lease(self, lease_id):
+        """Return the shard of a current lease, or None if the lease expired or was never granted."""
+        for shard, (current, _, deadline) in self.leases.items():
+            if current == lease_id:
+                return shard if deadline > time.monotonic() else None
+        return None
+
+    def _merge(self, shard, rows):
+        """Merge a batch of [host, port, status, rtt] rows of a shard into the counts, callback and results store.
+
+        Rows the shard already merged under an earlier, expired lease are skipped.
+        """
+        merged = self.merged[shard]
+        results = []
+        for host, port, status, rtt in rows:
+            key = (host, int(port))
+            if key in merged:
+                self.telemetry.incr("results_repeated")
+                continue
+            merged.add(key)
+            result = ScanResult(host, int(port), self.proto, status, rtt)
+            results.append(result)
+            self.counts[result.status] = self.counts.get(result.status, 0) + 1
+            self.telemetry.incr("results", status=result.status)
+            if self.on_result is not None:
+                self.on_result(result)
+        if self.results_store is not None and results:
+            self._store(self.results_store.ingest, self.database_scan_id, results)
+
+    def _store(self, write, *args):
+        """Run a results store write on the store thread; writes run one at a time, in submission order."""
+        future = self.store_writer.submit(write, *args)
+        future.add_done_callback(self._stored)
+        return future
+
+    @staticmethod
+    def _stored(future):
+        if future.exception() is not None:
+            print(f"Error: Could not save results: {future.exception()}")
+
+    def _finish(self):
+        if self.results_store is None:
+            self.finished.set()
+            return
+        # Runs after every earlier write on the store thread, so the scan is only finished once all of its results are saved.
+        self._store(self.results_store.finish_scan, self.database_scan_id).add_done_callback(lambda _: self.finished.set())
+
+class ScanWorker:
+    """
+    Leases shards from a coordinator and scans them with a local engine until the scan is done.
+    """
+
+    def __init__(self, address, worker_id=None, token=None, options=None, batch_size=RESULT_BATCH):
+        """
+        Args:
+            address (tuple): The coordinator's (host, port).
+            worker_id (str): Name reported to the coordinator. The hostname and process id if not given.
+            token (str): The coordinator's shared secret.
+            options (dict): Local engine options overriding the coordinator's (e.g. {"shards": 0} to use every core).
+            batch_size (int): Results sent per message.
+        """
+        self.address = address
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.token = token
+        self.options = dict(options or {})
+        self.batch_size = batch_size
+        self.stream = None
+        self.lock = threading.Lock()
+        self.planners = {}
+
+    def request(self, message):
+        """Send one request and return the coordinator's response.
+
+        Raises:
+            ConnectionError: If the coordinator closed the connection or rejected the request.
+        """
+        if self.token is not None:
+            message["token"] = self.token
+        with self.lock:
+            self.stream.write(json.dumps(message).encode() + b"\n")
+            self.stream.flush()
+            line = self.stream.readline()
+        if not line:
+            raise ConnectionError("The coordinator closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            raise ConnectionError(f"Coordinator error: {response['error']}")
+        return response
+
+    def run(self, stopped=None):
+        """Lease and scan shards until the coordinator reports the scan done.
+
+        Args:
+            stopped (threading.Event): Stops the worker once set; its current shard is abandoned and re-leased after the timeout.
+
+        Returns:
+            int: The number of shards this worker completed.
+
+        Raises:
+            OSError: If the coordinator cannot be reached.
+        """
+        completed = 0
+        with socket.create_connection(self.address) as connection:
+            self.stream = connection.makefile("rwb")
+            try:
+                while stopped is None or not stopped.is_set():
+                    try:
+                        reply = self.request({"op": "lease", "worker": self.worker_id})
+                    except ConnectionError:
+                        break
+                    if reply.get("done"):
+                        break
+                    if "wait" in reply:
+                        time.sleep(reply["wait"])
+                        continue
+                    if self.scan_shard(reply, stopped):
+                        completed += 1
+            finally:
+                self.stream.close()
+        return completed
+
+    def planner(self, job):
+        """Rebuild the coordinator's planner for a job (cached per job)."""
+        planner = self.planners.get(job["id"])
+        if planner is None:
+            planner = self.planners[job["id"]] = ScanPlanner(job["targets"], job["ports"], job["seed"])
+        return planner
+
+    def scan_shard(self, lease, stopped=None):
+        """Scan a leased shard and stream its results to the coordinator.
+
+        Returns:
+            bool: Whether the shard was completed; False if the lease was lost or the worker was stopped.
+        """
+        job = lease["job"]
+        scanner = PortScannerFactory.generate_port_scanner(job["scan_type"], **dict(job["options"], **self.options))
+        results = scanner.scan_iter(self.planner(job).iter_shard(lease["shard"], job["shards"]))
+        lost = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lease, lost), daemon=True)
+        heartbeat.start()
+        batch = []
+        sent = time.monotonic()
+        try:
+            for result in results:
+                if lost.is_set() or (stopped is not None and stopped.is_set()):
+                    return False
+                batch.append([result.host, result.port, result.status, result.rtt])
+                if len(batch) >= self.batch_size or time.monotonic() - sent >= FLUSH_INTERVAL:
+                    if not self.request({"op": "results", "lease": lease["lease"], "results": batch}).get("ok"):
+                        return False
+                    batch = []
+                    sent = time.monotonic()
+            if batch and not self.request({"op": "results", "lease": lease["lease"], "results": batch}).get("ok"):
+                return False
+            return bool(self.request({"op": "complete", "lease": lease["lease"]}).get("ok"))
+        finally:
+            lost.set()
+            results.close()
+            heartbeat.join()
+
+    def _heartbeat(self, lease, lost):
+        """Renew a lease every third of the lease timeout until the shard ends or the lease is lost."""
+        interval = lease["job"].get("lease_timeout", DEFAULT_LEASE_TIMEOUT) / 3
+        while not lost.wait(interval):
+            try:
+                if not self.request({"op": "heartbeat", "lease": lease["lease"]}).get("ok"):
+                    lost.set()
+            except (ConnectionError, OSError, ValueError):
+                lost.set()
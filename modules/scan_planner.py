@@ -0,0 +1,292 @@
+"""
+Scan Planner
+
+This module expands target and port specifications into a stream of (host, port) probes for the port scanners. Targets may be hostnames, IPv4 addresses, CIDR blocks, address ranges or files of targets. The planner never materializes the host × port cross product: hosts and ports are kept as ranges, and each probe is computed from its index on demand.
+
+Probes are emitted in a shuffled order. The planner walks a keyed permutation of the probe index space, so consecutive probes land on different hosts and no single host is hammered, while the walk position doubles as a compact, resumable cursor.
+
+Classes:
+- ProbePermutation: Keyed bijection over the probe index space.
+- ScanPlanner: Lazily expands targets and ports into a shuffled (host, port) work stream.
+
+Functions:
+- expand_targets: Expand target specifications into IPv4 address ranges.
+- collapse_hosts: Collapse IPv4 addresses into compact range specifications.
+- discover_live_hosts: Sweep targets with host discovery and return the live hosts as specifications.
+
+Usage:
+1. Create a 'ScanPlanner' with target specifications (e.g. "10.0.0.0/24", "10.0.1.5-20", "@hosts.txt") and ports (e.g. "1-1024").
+2. Iterate the planner to get (host, port) probes, or pass it to a scanner's 'scan_plan' method.
+3. To skip dead hosts, plan over 'discover_live_hosts(targets, ICMPScanner())' instead of the raw targets.
+
+This module is intended for network diagnostics and security testing purposes. Unauthorized use may violate laws and regulations.
+"""
+
+import os
+import socket
+import bisect
+import ipaddress
+from modules.port_scanner import parse_ports
+from utils.resolver import get_resolver
+
+def _ipv4_range(first, last):
+    """Return a range of integer IPv4 addresses from `first` to `last` inclusive."""
+    first = int(ipaddress.IPv4Address(first))
+    last = int(ipaddress.IPv4Address(last))
+    if last < first:
+        raise ValueError(f"Address range '{ipaddress.IPv4Address(first)}-{ipaddress.IPv4Address(last)}' is reversed.")
+    return range(first, last + 1)
+
+def _target_specs(targets):
+    """Yield the individual specifications of targets, reading '@file' lists."""
+    if isinstance(targets, str):
+        targets = targets.replace(",", " ").split()
+
+    for spec in targets:
+        spec = spec.strip()
+        if not spec or spec.startswith("#"):
+            continue
+        if spec.startswith("@"):
+            with open(os.path.expanduser(spec[1:])) as target_file:
+                lines = (line.split("#", 1)[0] for line in target_file)
+                yield from _target_specs([part for line in lines for part in line.replace(",", " ").split()])
+        else:
+            yield spec
+
+def _is_hostname(spec):
+    """Return whether a specification is a hostname rather than an address, block or range."""
+    if "/" in spec or ("-" in spec and spec.split("-", 1)[0].count(".") == 3):
+        return False
+    try:
+        ipaddress.IPv4Address(spec)
+    except ipaddress.AddressValueError:
+        return True
+    return False
+
+def expand_targets(targets, resolve=None):
+    """Expand target specifications into IPv4 address ranges.
+
+    Supported forms are IPv4 addresses, CIDR blocks ("10.0.0.0/8"), full ranges ("10.0.0.1-10.0.0.50"),
+    last-octet ranges ("10.0.0.1-50"), hostnames, and files of targets given as "@path" (one specification
+    per line, '#' starts a comment). A string may hold several comma or whitespace separated specifications.
+
+    Hostnames are resolved to their first IPv4 address. With the shared resolver, all hostnames of the
+    targets are resolved concurrently before the first range is yielded.
+
+    Args:
+        targets (str | iterable): A target specification or an iterable of them.
+        resolve (callable): Function resolving a hostname to an IPv4 address. The shared Resolver if not given.
+
+    Yields:
+        range: Integer IPv4 addresses covered by each specification.
+    """
+    specs = list(_target_specs(targets))
+    if resolve is None:
+        resolver = get_resolver()
+        hostnames = [spec for spec in specs if _is_hostname(spec)]
+        if hostnames:
+            resolver.resolve_many(hostnames, ("A",))
+        resolve = resolver.gethostbyname
+
+    for spec in specs:
+        if "/" in spec:
+            network = ipaddress.IPv4Network(spec, strict=False)
+            yield range(int(network.network_address), int(network.broadcast_address) + 1)
+        elif "-" in spec and spec.split("-", 1)[0].count(".") == 3:
+            first, last = spec.split("-", 1)
+            if "." not in last:
+                last = first.rsplit(".", 1)[0] + "." + last
+            yield _ipv4_range(first, last)
+        else:
+            try:
+                address = ipaddress.IPv4Address(spec)
+            except ipaddress.AddressValueError:
+                try:
+                    address = ipaddress.IPv4Address(resolve(spec))
+                except (socket.gaierror, socket.herror, UnicodeError):
+                    print(f"Error: Could not resolve {spec}")
+                    continue
+            yield range(int(address), int(address) + 1)
+
+class ProbePermutation:
+    """
+    Keyed bijection over [0, size) used to shuffle the probe order.
+
+    The index space is padded to the next power of two, where an LCG step followed by xorshift
+    mixing is a bijection. Walking positions 0, 1, 2, ... and skipping values outside [0, size)
+    ("cycle walking") visits every index exactly once. Any position can be mapped directly, so a
+    walk can be resumed or split into shards without replaying it.
+    """
+
+    def __init__(self, size, seed=0):
+        """
+        Args:
+            size (int): Number of indexes to permute.
+            seed (int): Key selecting the permutation.
+        """
+        self.size = size
+        self.bits = max(1, (size - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.shift = max(1, self.bits // 2)
+        seed = (seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        self.multiplier = (seed | 1) << 2 | 1
+        self.increment = (seed >> 32) | 1
+        self.mixer = ((seed >> 16) | 1) & self.mask
+
+    def __len__(self):
+        """Number of positions in the walk (the padded power of two)."""
+        return self.mask + 1
+
+    def value_at(self, position):
+        """Map a walk position to an index.
+
+        Args:
+            position (int): A position in [0, len(self)).
+
+        Returns:
+            int: The index at that position, or -1 if the position falls in the padding.
+        """
+        value = (position * self.multiplier + self.increment) & self.mask
+        value ^= value >> self.shift
+        value = (value * self.mixer) & self.mask
+        value ^= value >> self.shift
+        return value if value < self.size else -1
+
+class ScanPlanner:
+    """
+    Lazily expands targets and ports into a shuffled (host, port) work stream.
+    """
+
+    def __init__(self, targets, ports, seed=None, resolve=None):
+        """
+        Args:
+            targets (str | iterable): Target specifications, see 'expand_targets'.
+            ports (str | iterable): Port specification such as "1-1024,8080" or an iterable of ports.
+            seed (int): Key for the probe order. Random if not given.
+            resolve (callable): Function resolving a hostname to an IPv4 address. The shared Resolver if not given.
+        """
+        self.host_ranges = [hosts for hosts in expand_targets(targets, resolve) if len(hosts)]
+        self.host_offsets = self._offsets(self.host_ranges)
+        self.port_ranges = self._port_ranges(ports)
+        self.port_offsets = self._offsets(self.port_ranges)
+        self.host_count = self.host_offsets[-1]
+        self.port_count = self.port_offsets[-1]
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(8), "big")
+        self.permutation = ProbePermutation(len(self), self.seed)
+
+    @staticmethod
+    def _offsets(ranges):
+        """Return cumulative start offsets of the ranges, followed by their total length."""
+        offsets = [0]
+        for item in ranges:
+            offsets.append(offsets[-1] + len(item))
+        return offsets
+
+    @staticmethod
+    def _port_ranges(ports):
+        """Collapse a port specification into a list of contiguous ranges."""
+        ranges = []
+        for port in parse_ports(ports):
+            if ranges and ranges[-1].stop == port:
+                ranges[-1] = range(ranges[-1].start, port + 1)
+            else:
+                ranges.append(range(port, port + 1))
+        return ranges
+
+    @staticmethod
+    def _lookup(ranges, offsets, index):
+        """Return the element at a flat index across a list of ranges."""
+        slot = bisect.bisect_right(offsets, index) - 1
+        return ranges[slot][index - offsets[slot]]
+
+    def __len__(self):
+        """Total number of probes (hosts × ports)."""
+        return self.host_count * self.port_count
+
+    def host_at(self, index):
+        """Return the dotted-quad host at a flat host index."""
+        return socket.inet_ntoa(self._lookup(self.host_ranges, self.host_offsets, index).to_bytes(4, "big"))
+
+    def port_at(self, index):
+        """Return the port at a flat port index."""
+        return self._lookup(self.port_ranges, self.port_offsets, index)
+
+    def probe_at(self, index):
+        """Return the (host, port) probe for a probe index.
+
+        Hosts vary fastest, so neighbouring indexes target different hosts.
+        """
+        port_index, host_index = divmod(index, self.host_count)
+        return self.host_at(host_index), self.port_at(port_index)
+
+    def iter_indexed(self, start=0):
+        """Walk the shuffled probe stream.
+
+        Args:
+            start (int): Walk position to resume from.
+
+        Yields:
+            tuple: (position, host, port) for each probe, where position is the cursor of the walk.
+        """
+        if not len(self):
+            return
+        value_at = self.permutation.value_at
+        for position in range(start, len(self.permutation)):
+            index = value_at(position)
+            if index >= 0:
+                host, port = self.probe_at(index)
+                yield position, host, port
+
+    def iter_shard(self, shard, shards):
+        """Yield the probes of one shard of the walk: the positions p with p % shards == shard.
+
+        Shards are disjoint and together cover every probe, so each of `shards` workers can walk
+        its own share of the same planner without coordination.
+        """
+        value_at = self.permutation.value_at
+        for position in range(shard, len(self.permutation) if len(self) else 0, shards):
+            index = value_at(position)
+            if index >= 0:
+                yield self.probe_at(index)
+
+    def __iter__(self):
+        """Yield every (host, port) probe exactly once, in shuffled order."""
+        for _, host, port in self.iter_indexed():
+            yield host, port
+
+def collapse_hosts(hosts):
+    """Collapse IPv4 addresses into compact range specifications.
+
+    Args:
+        hosts (iterable): IPv4 address strings, in any order.
+
+    Returns:
+        list: Specifications such as "10.0.0.1-10.0.0.7" or "10.0.0.9", accepted by 'expand_targets'.
+    """
+    specs = []
+    addresses = sorted({int(ipaddress.IPv4Address(host)) for host in hosts})
+    start = 0
+    for position in range(1, len(addresses) + 1):
+        if position < len(addresses) and addresses[position] == addresses[position - 1] + 1:
+            continue
+        first, last = ipaddress.IPv4Address(addresses[start]), ipaddress.IPv4Address(addresses[position - 1])
+        specs.append(str(first) if first == last else f"{first}-{last}")
+        start = position
+    return specs
+
+def discover_live_hosts(targets, discovery, resolve=None):
+    """Sweep targets with host discovery and return the hosts that answered.
+
+    The sweep visits hosts in shuffled order, like the port scan itself, and the result plugs
+    straight into a ScanPlanner so dead hosts are never port-scanned.
+
+    Args:
+        targets (str | iterable): Target specifications, see 'expand_targets'.
+        discovery (ICMPScanner): The scanner whose 'sweep' pings the hosts.
+        resolve (callable): Function resolving a hostname to an IPv4 address. The shared Resolver if not given.
+
+    Returns:
+        list: Specifications of the live hosts (see 'collapse_hosts').
+    """
+    hosts = (host for host, _ in ScanPlanner(targets, [1], resolve=resolve))
+    return collapse_hosts(discovery.sweep(hosts))
@@ -0,0 +1,315 @@
+"""
+Service Probes
+
+This module provides a probe/match database for identifying services, modelled on nmap's service-probes. A probe is a payload sent to a port (the NULL probe sends nothing and waits for the service to speak first); a match is a pattern recognising a service, and optionally its product and version, in the response.
+
+Only the probes likely for a port are tried: each probe lists the ports it targets, and probes marked as fallbacks are only used for ports no probe targets. Responses are matched through an index of literal prefixes: the fixed leading bytes of every anchored pattern are extracted when the library is built, so a response only runs the regexes whose prefix it starts with, plus the few patterns without a usable prefix.
+
+Classes:
+- Probe: A payload sent to solicit a response, and the ports it is likely to identify.
+- Fingerprint: The service, product and version recognised in a response.
+- ServiceMatch: A compiled response pattern.
+- ProbeLibrary: Indexed set of probes and matches.
+
+Functions:
+- literal_prefix: Extract the fixed leading bytes of an anchored pattern.
+- default_library: The library built from the probes and matches defined in this module.
+
+Usage:
+1. Get the library with 'default_library()'.
+2. Send each payload of 'library.probes_for(port, proto)' in order.
+3. Pass every response to 'library.match(response, probe)' and stop at the first Fingerprint.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+Probe = namedtuple("Probe", ["name", "proto", "payload", "ports", "fallback"])
+Fingerprint = namedtuple("Fingerprint", ["service", "product", "version"])
+
+REGEX_META = b".^$*+?{}[]|()"
+OPTIONAL_QUANTIFIERS = b"*?{"
+ESCAPES = {b"r": b"\r", b"n": b"\n", b"t": b"\t", b"0": b"\x00"}
+
+def literal_prefix(pattern):
+    """Extract the bytes every match of a pattern must start with.
+
+    Only patterns anchored with '^' and without top-level alternation have a prefix. Reading stops
+    at the first construct that is not a plain or escaped literal byte.
+
+    Args:
+        pattern (bytes): The regular expression source.
+
+    Returns:
+        bytes: The literal prefix, empty if the pattern has none.
+    """
+    if not pattern.startswith(b"^") or _has_top_level_alternation(pattern):
+        return b""
+
+    prefix = bytearray()
+    position = 1
+    while position < len(pattern):
+        char = pattern[position:position + 1]
+        if char == b"\\":
+            escaped = pattern[position + 1:position + 2]
+            if escaped == b"x":
+                literal = bytes([int(pattern[position + 2:position + 4], 16)])
+                step = 4
+            elif escaped in ESCAPES:
+                literal = ESCAPES[escaped]
+                step = 2
+            elif escaped.isalnum() or not escaped:
+                break
+            else:
+                literal = escaped
+                step = 2
+        elif char in REGEX_META:
+            break
+        else:
+            literal = char
+            step = 1
+
+        following = pattern[position + step:position + step + 1]
+        if following and following in OPTIONAL_QUANTIFIERS:
+            break
+        prefix += literal
+        position += step
+        if following == b"+":
+            break
+    return bytes(prefix)
+
+def _has_top_level_alternation(pattern):
+    """Whether a pattern contains a '|' outside of groups and character classes."""
+    depth = 0
+    in_class = False
+    position = 0
+    while position < len(pattern):
+        char = pattern[position:position + 1]
+        if char == b"\\":
+            position += 2
+            continue
+        if in_class:
+            in_class = char != b"]"
+        elif char == b"[":
+            in_class = True
+        elif char == b"(":
+            depth += 1
+        elif char == b")":
+            depth -= 1
+        elif char == b"|" and depth == 0:
+            return True
+        position += 1
+    return False
+
+class ServiceMatch:
+    """
+    A compiled response pattern identifying a service.
+    """
+    __slots__ = ("service", "regex", "prefix", "product", "probes", "order")
+
+    def __init__(self, service, pattern, product=None, probes=None, flags=0):
+        """
+        Args:
+            service (str): The service name (e.g. "ssh", "http").
+            pattern (bytes): Regular expression matched against the raw response. Named groups
+                'product' and 'version' are extracted when present.
+            product (str): Fixed product name, used when the pattern has no 'product' group.
+            probes (iterable): Names of the probes whose responses this pattern applies to. All probes if not given.
+            flags (int): Regular expression flags. Case-insensitive patterns are never prefix-indexed.
+        """
+        self.service = service
+        self.regex = re.compile(pattern, flags | re.DOTALL)
+        self.prefix = b"" if flags & re.IGNORECASE else literal_prefix(pattern)
+        self.product = product
+        self.probes = frozenset(probes) if probes is not None else None
+        self.order = 0
+
+    def fingerprint(self, response):
+        """Return the Fingerprint for a response, or None if the pattern does not match."""
+        match = self.regex.match(response)
+        if match is None:
+            return None
+        groups = match.groupdict()
+        product = groups.get("product") or self.product
+        version = groups.get("version")
+        return Fingerprint(
+            self.service,
+            product.decode("utf-8", errors="replace").strip() if isinstance(product, bytes) else product,
+            version.decode("utf-8", errors="replace") if version else None)
+
+class _PrefixIndex:
+    """Matches grouped by literal prefix, plus the matches without one."""
+
+    def __init__(self, matches):
+        self.tables = {}
+        self.unprefixed = []
+        for service_match in matches:
+            if service_match.prefix:
+                table = self.tables.setdefault(len(service_match.prefix), {})
+                table.setdefault(service_match.prefix, []).append(service_match)
+            else:
+                self.unprefixed.append(service_match)
+        self.lengths = sorted(self.tables)
+
+    def candidates(self, response):
+        """Return the matches whose prefix the response starts with, in declaration order."""
+        found = []
+        for length in self.lengths:
+            if length > len(response):
+                break
+            found.extend(self.tables[length].get(response[:length], ()))
+        found.sort(key=lambda service_match: service_match.order)
+        return found
+
+class ProbeLibrary:
+    """
+    Indexed set of probes and matches.
+    """
+
+    def __init__(self, probes, matches):
+        """
+        Args:
+            probes (iterable): Probe definitions, in the order they should be tried.
+            matches (iterable): ServiceMatch patterns, most specific first.
+        """
+        self.probes = list(probes)
+        self.matches = list(matches)
+        for order, service_match in enumerate(self.matches):
+            service_match.order = order
+
+        self.null_probes = {}
+        self.port_probes = {}
+        self.fallback_probes = {}
+        for probe in self.probes:
+            if not probe.payload and probe.ports is None:
+                self.null_probes.setdefault(probe.proto, []).append(probe)
+                continue
+            if probe.fallback:
+                self.fallback_probes.setdefault(probe.proto, []).append(probe)
+            for port in probe.ports or ():
+                self.port_probes.setdefault((probe.proto, port), []).append(probe)
+
+        self.indexes = {probe.name: _PrefixIndex(m for m in self.matches if m.probes is None or probe.name in m.probes)
+                        for probe in self.probes}
+        self.generic_index = _PrefixIndex(m for m in self.matches if m.probes is None)
+
+    def probes_for(self, port, proto="tcp"):
+        """Return the probes to try on a port, in order.
+
+        The NULL probe comes first, then the probes targeting the port. Fallback probes are only
+        returned for ports no probe targets.
+
+        Args:
+            port (int): The port number.
+            proto (str): The transport protocol ("tcp" or "udp").
+
+        Returns:
+            list: Probe records.
+        """
+        likely = self.port_probes.get((proto, port))
+        return self.null_probes.get(proto, []) + (likely or self.fallback_probes.get(proto, []))
+
+    def match(self, response, probe=None):
+        """Identify the service behind a response.
+
+        Args:
+            response (bytes): The raw bytes received.
+            probe (Probe): The probe that produced the response. Patterns restricted to other probes are skipped.
+
+        Returns:
+            Fingerprint: The first matching fingerprint, or None.
+        """
+        if not response:
+            return None
+        index = self.indexes.get(probe.name, self.generic_index) if probe is not None else self.generic_index
+        for service_match in index.candidates(response):
+            fingerprint = service_match.fingerprint(response)
+            if fingerprint is not None:
+                return fingerprint
+        for service_match in index.unprefixed:
+            fingerprint = service_match.fingerprint(response)
+            if fingerprint is not None:
+                return fingerprint
+        return None
+
+def _ber(tag, body):
+    """Encode one BER element with a short-form length."""
+    return bytes([tag, len(body)]) + body
+
+SNMP_GET_SYSDESCR = _ber(0x30, _ber(0x02, b"\x00") + _ber(0x04, b"public") + _ber(0xa0,
+    _ber(0x02, b"\x45\x41\x54\x52") + _ber(0x02, b"\x00") + _ber(0x02, b"\x00") +
+    _ber(0x30, _ber(0x30, _ber(0x06, b"\x2b\x06\x01\x02\x01\x01\x01\x00") + _ber(0x05, b"")))))
+
+def _tls_client_hello():
+    """Build a TLS 1.2 ClientHello offering common ECDHE/RSA suites, enough for any TLS server to answer."""
+    suites = b"\xc0\x2f\xc0\x30\xc0\x2b\xc0\x2c\x00\x9c\x00\x9d\x00\x2f\x00\x35"
+    extensions = (
+        b"\x00\x0a" + (6).to_bytes(2, "big") + b"\x00\x04\x00\x1d\x00\x17" +
+        b"\x00\x0b" + (2).to_bytes(2, "big") + b"\x01\x00" +
+        b"\x00\x0d" + (10).to_bytes(2, "big") + b"\x00\x08\x04\x01\x04\x03\x05\x01\x02\x01")
+    hello = (b"\x03\x03" + bytes(range(32)) + b"\x00" + len(suites).to_bytes(2, "big") + suites + b"\x01\x00" +
+             len(extensions).to_bytes(2, "big") + extensions)
+    handshake = b"\x01" + len(hello).to_bytes(3, "big") + hello
+    return b"\x16\x03\x01" + len(handshake).to_bytes(2, "big") + handshake
+
+TLS_CLIENT_HELLO = _tls_client_hello()
+
+NTP_MODE_SERVER = b"[" + b"".join(re.escape(bytes([first])) for first in range(4, 256, 8)) + b"]"
+
+PROBES = [
+    Probe("NULL", "tcp", b"", None, False),
+    Probe("GetRequest", "tcp", b"GET / HTTP/1.0\r\n\r\n",
+          frozenset({80, 81, 591, 3000, 5000, 8000, 8008, 8080, 8081, 8088, 8888, 9000, 9200}), True),
+    Probe("TLSSessionReq", "tcp", TLS_CLIENT_HELLO,
+          frozenset({443, 465, 636, 853, 989, 990, 992, 993, 994, 995, 5061, 5986, 8443, 9443}), False),
+    Probe("TerminalServer", "tcp", b"\x03\x00\x00\x0b\x06\xe0\x00\x00\x00\x00\x00", frozenset({3389}), False),
+    Probe("PostgreSQLSSLRequest", "tcp", b"\x00\x00\x00\x08\x04\xd2\x16\x2f", frozenset({5432}), False),
+    Probe("RedisInfo", "tcp", b"*2\r\n$4\r\nINFO\r\n$6\r\nserver\r\n", frozenset({6379}), False),
+    Probe("MemcachedVersion", "tcp", b"version\r\n", frozenset({11211}), False),
+    Probe("GenericLines", "tcp", b"\r\n\r\n", None, True),
+    Probe("DNSVersionBindReq", "udp", b"\x00\x06\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x07version\x04bind\x00\x00\x10\x00\x03",
+          frozenset({53, 5353}), False),
+    Probe("SNMPv1GetRequest", "udp", SNMP_GET_SYSDESCR, frozenset({161}), False),
+    Probe("NTPRequest", "udp", b"\xe3\x00\x04\xfa\x00\x01\x00\x00\x00\x01" + b"\x00" * 38, frozenset({123}), False),
+    Probe("SSDPSearch", "udp",
+          b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\nMAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n",
+          frozenset({1900}), False),
+    Probe("NBTStat", "udp", b"\x80\xf0\x00\x10\x00\x01\x00\x00\x00\x00\x00\x00\x20CKAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\x00\x00\x21\x00\x01",
+          frozenset({137}), False),
+    Probe("UDPEmpty", "udp", b"", frozenset(), True),
+]
+
+MATCHES = [
+    ServiceMatch("ssh", rb"^SSH-[\d.]+-(?P<product>OpenSSH|dropbear|libssh|Cisco)[_-](?P<version>[\w.]+)"),
+    ServiceMatch("ssh", rb"^SSH-[\d.]+-(?P<product>[^\r\n ]+)"),
+    ServiceMatch("ftp", rb"^220[ -][^\r\n]*?(?P<product>vsFTPd|ProFTPD|Pure-FTPd|FileZilla Server)[ v]*(?P<version>\d[\w.]*)?"),
+    ServiceMatch("smtp", rb"^220[ -][^\r\n]*?(?P<product>Postfix|Exim|Sendmail|Microsoft ESMTP)[ v]*(?P<version>\d[\w.]*)?"),
+    ServiceMatch("smtp", rb"^220[ -][^\r\n]*SMTP"),
+    ServiceMatch("ftp", rb"^220[ -][^\r\n]*FTP"),
+    ServiceMatch("pop3", rb"^\+OK[^\r\n]*"),
+    ServiceMatch("imap", rb"^\* OK[^\r\n]*"),
+    ServiceMatch("http", rb"^HTTP/1\.[01] \d\d\d[^\r\n]*\r\n(?:[^\r\n]+\r\n)*?[Ss]erver: *(?P<product>[^/\r\n ]+)(?:/(?P<version>[\w.]+))?"),
+    ServiceMatch("http", rb"^HTTP/1\.[01] \d\d\d"),
+    ServiceMatch("ssl", rb"^\x16\x03[\x00-\x04]"),
+    ServiceMatch("ssl", rb"^\x15\x03[\x00-\x04]"),
+    ServiceMatch("ms-wbt-server", rb"^\x03\x00\x00\x13\x0e\xd0", product="Microsoft Terminal Services"),
+    ServiceMatch("ms-wbt-server", rb"^\x03\x00\x00", probes=["TerminalServer"]),
+    ServiceMatch("mysql", rb"^.\x00\x00\x00\x0a(?P<version>[\d.]+[^\x00]*)\x00", product="MySQL"),
+    ServiceMatch("postgresql", rb"^[SN]$", product="PostgreSQL", probes=["PostgreSQLSSLRequest"]),
+    ServiceMatch("redis", rb"^\$\d+\r\n# Server\r\nredis_version:(?P<version>[\d.]+)", product="Redis"),
+    ServiceMatch("redis", rb"^-(?:NOAUTH|DENIED)", product="Redis"),
+    ServiceMatch("memcached", rb"^VERSION (?P<version>[\d.]+)", product="Memcached"),
+    ServiceMatch("vnc", rb"^RFB (?P<version>\d{3}\.\d{3})\n"),
+    ServiceMatch("telnet", rb"^\xff[\xfb-\xfe]"),
+    ServiceMatch("domain", rb"^\x00\x06[\x80-\xff]", probes=["DNSVersionBindReq"]),
+    ServiceMatch("snmp", rb"^\x30.{1,3}\x02\x01[\x00\x01]\x04", probes=["SNMPv1GetRequest"]),
+    ServiceMatch("ntp", rb"^" + NTP_MODE_SERVER + rb".{47}", probes=["NTPRequest"]),
+    ServiceMatch("upnp", rb"^HTTP/1\.1 200 OK\r\n(?:[^\r\n]+\r\n)*?[Ss][Ee][Rr][Vv][Ee][Rr]: *(?P<product>[^\r\n]+)", probes=["SSDPSearch"]),
+    ServiceMatch("netbios-ns", rb"^\x80\xf0\x84\x00", probes=["NBTStat"]),
+]
+
+@lru_cache(maxsize=None)
+def default_library():
+    """Return the ProbeLibrary built from PROBES and MATCHES (built on first use)."""
+    return ProbeLibrary(PROBES, MATCHES)
@@ -0,0 +1,245 @@
+"""
+Sharded Scanner
+
+This module spreads one scan over several processes so it can use every CPU core. The probe space is split deterministically: probe number i belongs to shard i % shards. Each shard runs in its own process with its own instance of the chosen scanner engine (and so its own event loop, sockets and rate limiter share), and sends its results back to the parent in compact binary batches over a pipe. No per-probe objects or closures are pickled.
+
+When the probes come from a ScanPlanner, every worker walks its own share of the planner (see 'ScanPlanner.iter_shard') and the parent only receives results. Any other probe stream (e.g. a resumable scan's cursor) is read by the parent and dealt out to the workers in batches, with a bounded number of probes outstanding per worker.
+
+Classes:
+- ShardedScanner: Runs a scanner engine in one worker process per shard.
+
+Usage:
+1. Create a scanner with 'PortScannerFactory.generate_port_scanner("tcp", shards=0)' (0 = one shard per CPU core), or 'ShardedScanner("tcp", shards=4, concurrency=2000)'.
+2. Use it like any other scanner: 'scan_iter', 'scan_plan', 'scan_store' or 'scan_target'.
+
+Engine options apply to every shard: a concurrency of 1000 with 4 shards keeps up to 4000 probes in flight. A rate (packets per second) and the rate limits are divided between the shards.
+
+This module is intended for network diagnostics and security testing purposes. Unauthorized use may violate laws and regulations.
+"""
+
+import os
+import math
+import time
+import pickle
+import signal
+import socket
+import struct
+import multiprocessing
+from multiprocessing.connection import wait
+from modules.port_scanner import PortScannerBase, PortScannerFactory, ScanResult
+
+STATUSES = ("open", "closed", "filtered", "open|filtered")
+RECORD = struct.Struct("!4sHBf")
+RESULT_BATCH = 1024
+PROBE_BATCH = 1024
+PROBE_WINDOW = 4 * PROBE_BATCH
+FLUSH_INTERVAL = 0.05
+PROBE_RECORD = struct.Struct("!4sH")
+MESSAGE_RESULTS = b"R"
+MESSAGE_DONE = b"D"
+MESSAGE_ERROR = b"E"
+
+def default_shards():
+    """Return the number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def pack_probes(probes):
+    """Pack (IPv4 address, port) probes into 6 bytes each."""
+    return b"".join(PROBE_RECORD.pack(socket.inet_aton(host), port) for host, port in probes)
+
+def unpack_probes(data):
+    """Yield the (IPv4 address, port) probes of a packed batch."""
+    for address, port in PROBE_RECORD.iter_unpack(data):
+        yield socket.inet_ntoa(address), port
+
+def pack_result(result):
+    """Pack a ScanResult (without its protocol) into 11 bytes."""
+    return RECORD.pack(socket.inet_aton(result.host), result.port, STATUSES.index(result.status),
+                       result.rtt if result.rtt is not None else math.nan)
+
+def unpack_results(data, proto):
+    """Yield the ScanResults of a packed batch."""
+    for address, port, status, rtt in RECORD.iter_unpack(data):
+        yield ScanResult(socket.inet_ntoa(address), port, proto, STATUSES[status], None if math.isnan(rtt) else rtt)
+
+def _received_probes(connection):
+    """Yield the probes the parent sends until it sends an empty batch."""
+    while True:
+        data = connection.recv_bytes()
+        if not data:
+            return
+        yield from unpack_probes(data)
+
+def _shard_main(scan_type, options, shard, shards, planner, probe_reader, result_writer):
+    """Run one shard of a scan in a worker process.
+
+    Results are sent in batches of RESULT_BATCH records, or sooner when FLUSH_INTERVAL has passed.
+    The last message carries the shard's telemetry counters, or the exception that stopped it.
+    """
+    # The parent decides when to stop; Ctrl-C in the terminal must not kill shards mid-batch.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        scanner = PortScannerFactory.generate_port_scanner(scan_type, **options)
+        probes = planner.iter_shard(shard, shards) if planner is not None else _received_probes(probe_reader)
+        batch = bytearray()
+        flushed = time.monotonic()
+        for result in scanner.scan_iter(probes):
+            batch += pack_result(result)
+            if len(batch) >= RESULT_BATCH * RECORD.size or time.monotonic() - flushed >= FLUSH_INTERVAL:
+                result_writer.send_bytes(MESSAGE_RESULTS + batch)
+                batch.clear()
+                flushed = time.monotonic()
+        if batch:
+            result_writer.send_bytes(MESSAGE_RESULTS + batch)
+        telemetry = scanner.telemetry
+        counters = {key: value for key, value in telemetry.counters.items() if key[0] != "results"}
+        result_writer.send_bytes(MESSAGE_DONE + pickle.dumps((counters, telemetry.histograms)))
+    except (BrokenPipeError, EOFError):
+        pass
+    except Exception as e:
+        try:
+            error = pickle.dumps(e)
+        except Exception:
+            error = pickle.dumps(RuntimeError(f"{type(e).__name__}: {e}"))
+        try:
+            result_writer.send_bytes(MESSAGE_ERROR + error)
+        except OSError:
+            pass
+    finally:
+        result_writer.close()
+        if probe_reader is not None:
+            probe_reader.close()
+
+class ShardedScanner(PortScannerBase):
+    """
+    Runs a scanner engine in one worker process per shard and merges their results.
+    """
+
+    def __init__(self, scan_type="tcp", shards=0, **options):
+        """
+        Args:
+            scan_type (str): The engine every shard runs (e.g. "tcp", "syn", "udp").
+            shards (int): Number of worker processes; 0 for one per CPU core.
+            **options: Engine options (e.g. concurrency, rate, timeout, scheduler).
+
+        Raises:
+            ValueError: If the scan type is unknown.
+        """
+        self.engine = PortScannerFactory.generate_port_scanner(scan_type, **options)
+        super().__init__(self.engine.timeout, self.engine.scheduler)
+        self.scan_type = scan_type
+        self.shards = shards if shards > 0 else default_shards()
+        self.options = {name: value for name, value in options.items() if name != "scheduler"}
+        self.proto = self.engine.proto
+
+    def scan_port(self, target_ip, port, result):
+        """Scan a single port in this process with the engine (see PortScannerBase.scan_port)."""
+        self.engine.scan_port(target_ip, port, result)
+
+    def shard_options(self):
+        """Return the engine options of one shard, with the rate and rate limits divided between the shards."""
+        options = dict(self.options, scheduler=self.scheduler.split(self.shards))
+        rate = getattr(self.engine, "rate", None)
+        if rate:
+            options["rate"] = rate / self.shards
+        return options
+
+    def scan_iter(self, probes):
+        """Scan (target_ip, port) probes in the shard processes and yield results as batches arrive.
+
+        With a single shard the engine runs in this process instead.
+
+        Args:
+            probes (iterable): (target_ip, port) pairs; a ScanPlanner is walked by the shards themselves.
+
+        Yields:
+            ScanResult: One record per probe, in arrival order.
+        """
+        if self.shards == 1:
+            self.engine.telemetry = self.telemetry
+            return self.engine.scan_iter(probes)
+        return self._scan_sharded(probes)
+
+    def _scan_sharded(self, probes):
+        from modules.scan_planner import ScanPlanner
+
+        context = multiprocessing.get_context("spawn")
+        planner = probes if isinstance(probes, ScanPlanner) else None
+        options = self.shard_options()
+        processes = []
+        probe_writers = []
+        result_readers = {}
+        try:
+            for shard in range(self.shards):
+                probe_reader, probe_writer = context.Pipe(duplex=False) if planner is None else (None, None)
+                result_reader, result_writer = context.Pipe(duplex=False)
+                process = context.Process(target=_shard_main, daemon=True, name=f"eater-shard-{shard}",
+                                          args=(self.scan_type, options, shard, self.shards, planner, probe_reader, result_writer))
+                process.start()
+                result_writer.close()
+                if probe_reader is not None:
+                    probe_reader.close()
+                processes.append(process)
+                probe_writers.append(probe_writer)
+                result_readers[result_reader] = shard
+
+            probe_iter = iter(probes) if planner is None else None
+            outstanding = [0] * self.shards
+            while result_readers:
+                if probe_iter is not None and max(outstanding) < PROBE_WINDOW:
+                    probe_iter = self._deal(probe_iter, probe_writers, outstanding)
+                    continue
+                for reader in wait(list(result_readers)):
+                    shard = result_readers[reader]
+                    try:
+                        message = reader.recv_bytes()
+                    except EOFError:
+                        raise RuntimeError(f"Scan shard {shard} exited unexpectedly (exit code {processes[shard].exitcode}).")
+                    kind, payload = message[:1], message[1:]
+                    if kind == MESSAGE_RESULTS:
+                        outstanding[shard] -= len(payload) // RECORD.size
+                        for result in unpack_results(payload, self.proto):
+                            self.telemetry.incr("results", status=result.status)
+                            yield result
+                    elif kind == MESSAGE_DONE:
+                        self.telemetry.merge(*pickle.loads(payload))
+                        del result_readers[reader]
+                        reader.close()
+                    elif kind == MESSAGE_ERROR:
+                        raise pickle.loads(payload)
+        finally:
+            for writer in probe_writers:
+                if writer is not None:
+                    writer.close()
+            for reader in result_readers:
+                reader.close()
+            for process in processes:
+                process.join(0.5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+
+    def _deal(self, probe_iter, probe_writers, outstanding):
+        """Send the next shards × PROBE_BATCH probes, probe i to shard i % shards.
+
+        Returns:
+            iterator: The probe iterator, or None once it is exhausted and every shard was told so.
+        """
+        batches = [[] for _ in range(self.shards)]
+        count = 0
+        for count, probe in enumerate(probe_iter, 1):
+            batches[(count - 1) % self.shards].append(probe)
+            if count == self.shards * PROBE_BATCH:
+                break
+        for shard, batch in enumerate(batches):
+            if batch:
+                probe_writers[shard].send_bytes(pack_probes(batch))
+                outstanding[shard] += len(batch)
+        if count < self.shards * PROBE_BATCH:
+            for writer in probe_writers:
+                writer.send_bytes(b"")
+            return None
+        return probe_iter
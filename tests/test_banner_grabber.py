@@ -0,0 +1,76 @@
+import time
+import socket
+import threading
+from modules.banner_grabber import BannerGrabberFactory
+
+def serve(listener, banner):
+    while True:
+        try:
+            client, _ = listener.accept()
+        except OSError:
+            return
+        if banner:
+            try:
+                client.sendall(banner)
+            except OSError:
+                pass
+        threading.Timer(2, client.close).start()
+
+def listen(banner):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    threading.Thread(target=serve, args=(listener, banner), daemon=True).start()
+    return listener
+
+def test_concurrent_grab_with_deadlines_and_cap():
+    talkers = [listen(b"SSH-2.0-OpenSSH_7.4\r\n") for _ in range(5)]
+    silent = [listen(b"") for _ in range(5)]
+    chatty = listen(b"x" * 4096)
+    probes = [("127.0.0.1", listener.getsockname()[1]) for listener in talkers + silent + [chatty]]
+
+    grabber = BannerGrabberFactory.generate_banner_grabber("tcp", timeout=0.5, max_bytes=64, probes=False)
+    started = time.monotonic()
+    results = {result.port: result.banner for result in grabber.grab_iter(probes)}
+    elapsed = time.monotonic() - started
+
+    for listener in talkers + silent + [chatty]:
+        listener.close()
+
+    assert elapsed < 1.5
+    assert [results[port] for _, port in probes[:5]] == ["SSH-2.0-OpenSSH_7.4"] * 5
+    assert [results[port] for _, port in probes[5:10]] == [None] * 5
+    assert results[probes[10][1]] == "x" * 64
+
+def test_grab_banner_single_port():
+    listener = listen(b"220 ftp ready\r\n")
+    grabber = BannerGrabberFactory.generate_banner_grabber("TCP", timeout=0.5)
+    assert grabber.grab_banner("127.0.0.1", listener.getsockname()[1]) == "220 ftp ready"
+    listener.close()
+
+def test_silent_service_is_fingerprinted_with_probes():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(4)
+
+    def http():
+        while True:
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                return
+            client.settimeout(1)
+            try:
+                if client.recv(1024).startswith(b"GET "):
+                    client.sendall(b"HTTP/1.1 200 OK\r\nServer: nginx/1.18.0\r\n\r\n")
+            except OSError:
+                pass
+            client.close()
+
+    threading.Thread(target=http, daemon=True).start()
+    grabber = BannerGrabberFactory.generate_banner_grabber("tcp", timeout=0.3)
+    [result] = grabber.grab_iter([("127.0.0.1", listener.getsockname()[1])])
+    listener.close()
+
+    assert result.banner.startswith("HTTP/1.1 200 OK")
+    assert tuple(result.service) == ("http", "nginx", "1.18.0")
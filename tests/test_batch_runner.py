@@ -0,0 +1,61 @@
+import os
+import sys
+import socket
+import subprocess
+import pytest
+from database.results_store import ResultsStore
+from utils.batch_runner import load_jobs, main, run_jobs
+
+def test_load_ini_and_yaml_jobs(tmp_path):
+    ini = tmp_path / "jobs.ini"
+    ini.write_text("[DEFAULT]\nports = 1-1024\n\n[web]\ntargets = 10.0.0.0/24\nports = 80,443\nbanners = yes\n\n"
+                   "[mail]\ntargets = mail.example.com\nmodule = bannergrabber\n")
+    web, mail = load_jobs(str(ini))
+    assert (web.name, web.targets, web.ports, web.scan_type, web.grab_banners) == ("web", "10.0.0.0/24", "80,443", "TCP", True)
+    assert (mail.module, mail.ports, mail.grab_banners) == ("bannergrabber", "1-1024", False)
+
+    pytest.importorskip("yaml")
+    document = tmp_path / "jobs.yaml"
+    document.write_text("defaults: {ports: 22, scan_type: syn}\njobs:\n  - {name: ssh, targets: 10.0.0.1}\n  - {targets: 10.0.0.2, discover: true}\n")
+    ssh, second = load_jobs(str(document))
+    assert (ssh.name, ssh.ports, ssh.scan_type) == ("ssh", "22", "SYN")
+    assert (second.name, second.discover) == ("job2", True)
+
+    bad = tmp_path / "bad.ini"
+    bad.write_text("[broken]\ntargets = 10.0.0.1\n")
+    with pytest.raises(ValueError):
+        load_jobs(str(bad))
+
+def test_jobs_run_concurrently_into_one_database(tmp_path):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+    database = str(tmp_path / "results.db")
+    jobs_file = tmp_path / "jobs.ini"
+    jobs_file.write_text("".join(f"[job{number}]\ntargets = 127.0.0.1\nports = {open_port - number}-{open_port}\ndatabase = {database}\n\n"
+                                 for number in range(1, 6)))
+
+    assert run_jobs(load_jobs(str(jobs_file)), parallel=5, checkpoint_dir=str(tmp_path / "checkpoints")) == [True] * 5
+    listener.close()
+
+    with ResultsStore(database) as store:
+        assert len(store.scans()) == 5
+        assert {result.scan_id for result in store.query(port=open_port, status="open")} == {scan[0] for scan in store.scans()}
+
+def test_main_rejects_invalid_job_file(tmp_path, capsys):
+    bad = tmp_path / "bad.ini"
+    bad.write_text("[broken]\nports = 80\n")
+    assert main(["jobs", str(bad)]) == 2
+    assert "missing targets" in capsys.readouterr().out
+    assert main(["resume", "no-such-scan"]) == 1
+    assert "Could not load scan 'no-such-scan'" in capsys.readouterr().out
+
+def test_cli_startup_defers_module_imports():
+    check = ("import sys, eater\n"
+             "heavy = ('pathos', 'requests', 'pyfiglet', 'asyncio', 'modules.port_scanner', 'payloads.reverse_http_shell')\n"
+             "assert not [name for name in heavy if name in sys.modules], [name for name in heavy if name in sys.modules]\n"
+             "eater.ModuleFactory.generate_module('protosearch')\n"
+             "assert 'modules.port_scanner' in sys.modules and 'pathos' not in sys.modules\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", check], cwd=root, check=True)
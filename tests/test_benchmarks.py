@@ -0,0 +1,16 @@
+from benchmarks.harness import compare, run_suite
+
+def test_suite_measures_engines_against_stand_in_services():
+    results = run_suite(engines=("tcp", "udp", "banner-tcp"), settings=(50,), rounds=1, timeout=0.3, ports=10)
+    cases = {case["engine"]: case for case in results["cases"]}
+    assert set(cases) == {"tcp", "udp", "banner-tcp"}
+    assert cases["tcp"]["statuses"] == {"open": 10, "closed": 10, "filtered": 4}
+    assert cases["udp"]["statuses"] == {"open": 10, "closed": 10, "open|filtered": 4}
+    assert cases["banner-tcp"]["statuses"] == {"banner": 10}
+    for case in cases.values():
+        assert case["mismatches"] == 0 and case["probes_per_sec"] > 0
+    assert cases["tcp"]["latency_p50_ms"] <= cases["tcp"]["latency_p99_ms"]
+
+    slower = {"cases": [dict(case, probes_per_sec=case["probes_per_sec"] * 2) for case in results["cases"]]}
+    assert compare(results, results) == []
+    assert len(compare(results, slower, tolerance=0.2)) == 3
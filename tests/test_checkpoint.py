@@ -0,0 +1,50 @@
+import json
+import socket
+import pytest
+from modules.port_scanner import TCPScanner
+from utils.checkpoint import ScanCheckpoint, resumable_scan
+
+def test_interrupted_scan_resumes_without_repeats(tmp_path):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+    ports = f"{open_port - 100}-{open_port}"
+
+    checkpoint = ScanCheckpoint.create("tcp", "127.0.0.1", ports, directory=str(tmp_path), seed=7)
+    first = []
+    results = resumable_scan(TCPScanner(concurrency=8, timeout=0.5), checkpoint)
+    for result in results:
+        first.append(result.port)
+        if len(first) == 40:
+            break
+    results.close()
+
+    resumed = ScanCheckpoint.load(checkpoint.scan_id, directory=str(tmp_path))
+    assert not resumed.finished
+    assert checkpoint.scan_id in ScanCheckpoint.saved_ids(str(tmp_path))
+    second = [result.port for result in resumable_scan(TCPScanner(concurrency=8, timeout=0.5), resumed)]
+    listener.close()
+
+    finished = ScanCheckpoint.load(checkpoint.scan_id, directory=str(tmp_path))
+    assert finished.finished and finished.probes_done == 101
+    assert list(finished.store.host_map("127.0.0.1").ports("open")) == [open_port]
+    assert set(first) | set(second) == set(range(open_port - 100, open_port + 1))
+    assert len(set(first) & set(second)) <= 8
+
+def test_remaining_counts_probes_not_walk_positions(tmp_path):
+    checkpoint = ScanCheckpoint.create("tcp", "127.0.0.1", "1-5", directory=str(tmp_path), seed=3)
+    planner = checkpoint.planner()
+    positions = [position for position, _, _ in planner.iter_indexed()]
+    assert len(planner) == 5 and len(planner.permutation) == 8
+
+    checkpoint.cursor = positions[-1]
+    checkpoint.probes_done = 4
+    checkpoint.save()
+    assert ScanCheckpoint.load(checkpoint.scan_id, directory=str(tmp_path)).remaining(planner) == 1
+
+    state = json.loads((tmp_path / f"{checkpoint.scan_id}.json").read_text())
+    del state["probes_done"]
+    (tmp_path / f"{checkpoint.scan_id}.json").write_text(json.dumps(dict(state, extra=1)))
+    with pytest.raises(ValueError, match="missing probes_done; unknown extra"):
+        ScanCheckpoint.load(checkpoint.scan_id, directory=str(tmp_path))
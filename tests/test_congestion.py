@@ -0,0 +1,44 @@
+from utils.congestion import RTTEstimator, CongestionWindow, PathTracker
+
+def test_rtt_estimator_converges_to_samples():
+    estimator = RTTEstimator(initial_rto=1.0, min_rto=0.01, max_rto=10.0)
+    for _ in range(50):
+        estimator.update(0.02)
+
+    assert abs(estimator.srtt - 0.02) < 1e-6
+    assert estimator.rto < 0.05
+
+def test_rtt_estimator_clamps_timeout():
+    estimator = RTTEstimator(min_rto=0.1, max_rto=2.0)
+    estimator.update(0.0001)
+    assert estimator.rto == 0.1
+
+    estimator.update(30.0)
+    assert estimator.rto == 2.0
+
+def test_congestion_window_grows_and_halves():
+    window = CongestionWindow(initial=10, maximum=100)
+    for _ in range(20):
+        window.on_success()
+    assert window.cwnd == 30
+
+    window.on_loss()
+    assert window.cwnd == 15
+    window.on_success()
+    assert 15 < window.cwnd < 16
+
+def test_path_timeouts_do_not_grow_the_window():
+    tracker = PathTracker(initial_window=10)
+    path = tracker.get("10.0.0.1")
+    for _ in range(20):
+        path.on_timeout()
+    assert path.window.cwnd == 10
+
+    path.on_reply(0.01)
+    assert path.window.cwnd == 11
+
+def test_path_tracker_falls_back_to_shared_estimate():
+    tracker = PathTracker(initial_rto=1.0, min_rto=0.05)
+    tracker.get("10.0.0.1").on_reply(0.01)
+
+    assert tracker.get("10.0.0.2").timeout() == tracker.shared.rto < 1.0
@@ -0,0 +1,51 @@
+import json
+from benchmarks.services import LoopbackServices, BANNER
+from database.results_store import ResultsStore
+from modules.banner_grabber import BannerResult
+from modules.delta_scan import Change, DeltaScan
+from modules.port_scanner import ScanResult
+from utils.module_generator import ProtosearchModule
+
+def _baseline(store, ports, results, banners=()):
+    scan_id = store.start_scan("tcp", "127.0.0.1", ports)
+    store.ingest(scan_id, results)
+    store.record_banners(scan_id, banners)
+    store.finish_scan(scan_id)
+    return scan_id
+
+def test_known_ports_first_and_slices_rotate_over_the_space():
+    with ResultsStore(":memory:") as store:
+        _baseline(store, "1-100", [ScanResult("127.0.0.1", 7, "tcp", "open", 0.01)], [("127.0.0.1", 7, "tcp", "SSH-2.0-A\r\nx")])
+        sweeps = []
+        for epoch in range(4):
+            delta = DeltaScan(store, "tcp", "127.0.0.1", "1-100", sample=0.25, epoch=epoch)
+            probes = list(delta.probes())
+            assert probes[0] == ("127.0.0.1", 7) and probes.count(("127.0.0.1", 7)) == 1
+            sweeps.extend(probes[1:])
+        assert sorted(sweeps) == sorted(("127.0.0.1", port) for port in range(1, 101) if port != 7)
+
+        assert delta.classify(ScanResult("127.0.0.1", 7, "tcp", "closed", 0.01)) == Change("closed", "127.0.0.1", 7, "tcp", "open", "closed")
+        assert delta.classify(ScanResult("127.0.0.1", 8, "tcp", "open", 0.01)).kind == "opened"
+        assert delta.classify(BannerResult("127.0.0.1", 7, "tcp", "SSH-2.0-A\r\ny")) is None
+        assert delta.classify(BannerResult("127.0.0.1", 7, "tcp", "SSH-2.0-B")).kind == "banner_changed"
+
+def test_delta_scan_reports_changes_against_the_stored_baseline(tmp_path):
+    with LoopbackServices(tcp_open=3, tcp_closed=2, tcp_filtered=0, udp_open=0, udp_closed=0, udp_filtered=0) as services:
+        opened, changed, unchanged = [port for port, status in services.expected["tcp"].items() if status == "open"]
+        gone = next(port for port, status in services.expected["tcp"].items() if status == "closed")
+        ports = ",".join(map(str, services.expected["tcp"]))
+        feed_path = tmp_path / "changes.jsonl"
+        with ResultsStore(str(tmp_path / "estate.db")) as store, open(feed_path, "w") as feed:
+            _baseline(store, ports, [ScanResult("127.0.0.1", port, "tcp", "open", 0.01) for port in (gone, changed, unchanged)],
+                      [("127.0.0.1", changed, "tcp", "SSH-2.0-OpenSSH_7.4"), ("127.0.0.1", unchanged, "tcp", BANNER.decode())])
+
+            changes = ProtosearchModule().delta("TCP", "127.0.0.1", ports, store, sample=1.0, grab_banners=True, feed=feed)
+
+            assert changes == {"opened": 1, "closed": 1, "banner_changed": 1}
+            latest, scan_type = store.scans()[0][:2]
+            assert scan_type == "tcp"
+            assert sorted(row.port for row in store.query(scan_id=latest, status="open")) == sorted((opened, changed, unchanged))
+            assert all(row.banner for row in store.query(scan_id=latest, status="open"))
+    with open(feed_path) as feed:
+        assert sorted((change["kind"], change["port"]) for change in map(json.loads, feed)) == \
+            sorted([("opened", opened), ("closed", gone), ("banner_changed", changed)])
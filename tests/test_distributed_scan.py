@@ -0,0 +1,72 @@
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+from benchmarks.services import LoopbackServices
+from database.results_store import ResultsStore
+from modules.distributed_scan import Coordinator
+
+def test_expired_leases_are_leased_again():
+    coordinator = Coordinator("tcp", "10.0.0.0/30", "1-10", shards=2, seed=5, lease_timeout=0.2, token="secret")
+    assert "error" in coordinator.dispatch({"op": "lease"})
+
+    first = coordinator.dispatch({"op": "lease", "worker": "a", "token": "secret"})
+    second = coordinator.dispatch({"op": "lease", "worker": "b", "token": "secret"})
+    assert {first["shard"], second["shard"]} == {0, 1}
+    assert "wait" in coordinator.dispatch({"op": "lease", "token": "secret"})
+
+    time.sleep(0.3)
+    again = coordinator.dispatch({"op": "lease", "worker": "c", "token": "secret"})
+    assert again["shard"] in (0, 1) and again["lease"] not in (first["lease"], second["lease"])
+    assert coordinator.dispatch({"op": "complete", "lease": first["lease"], "token": "secret"})["ok"] is False
+
+    rows = [["10.0.0.1", 22, "open", 0.01]]
+    assert coordinator.dispatch({"op": "results", "lease": again["lease"], "results": rows, "token": "secret"})["ok"]
+    assert coordinator.dispatch({"op": "complete", "lease": again["lease"], "token": "secret"})["ok"]
+    assert coordinator.counts["open"] == 1 and not coordinator.finished.is_set()
+
+def test_results_sent_before_a_re_lease_are_merged_once():
+    reported = []
+    coordinator = Coordinator("tcp", "10.0.0.1", "22", shards=1, seed=5, lease_timeout=0.2, on_result=reported.append)
+    rows = [["10.0.0.1", 22, "open", 0.01]]
+    first = coordinator.dispatch({"op": "lease"})
+    assert coordinator.dispatch({"op": "results", "lease": first["lease"], "results": rows})["ok"]
+
+    time.sleep(0.3)
+    again = coordinator.dispatch({"op": "lease"})
+    assert again["shard"] == first["shard"]
+    assert coordinator.dispatch({"op": "results", "lease": again["lease"], "results": rows})["ok"]
+    assert coordinator.dispatch({"op": "complete", "lease": again["lease"]})["ok"]
+
+    assert coordinator.counts["open"] == 1 and len(reported) == 1
+    assert coordinator.telemetry.count("results_repeated") == 1 and coordinator.finished.is_set()
+
+def test_worker_processes_scan_every_shard(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    database = str(tmp_path / "results.db")
+    with LoopbackServices(tcp_open=20, tcp_closed=20, tcp_filtered=0, udp_open=0, udp_closed=0, udp_filtered=0) as services:
+        expected = services.expected["tcp"]
+        with Coordinator("tcp", "127.0.0.1", ",".join(map(str, expected)), shards=8, options={"timeout": 0.5},
+                         database=database, lease_timeout=1.0, token="secret") as coordinator:
+            host, port = coordinator.start("127.0.0.1", 0)
+
+            # A worker that leases a shard and dies: its shard must be leased again after the timeout.
+            with socket.create_connection((host, port)) as dead:
+                dead.sendall(json.dumps({"op": "lease", "worker": "dead", "token": "secret"}).encode() + b"\n")
+                assert "lease" in json.loads(dead.makefile().readline())
+
+            workers = [subprocess.Popen([sys.executable, "eater.py", "work", f"{host}:{port}", "--token", "secret"], cwd=root,
+                                        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True) for _ in range(3)]
+            try:
+                assert coordinator.wait(60)
+            finally:
+                for worker in workers:
+                    worker.communicate(timeout=30)
+            assert coordinator.telemetry.count("leases_expired") == 1
+            assert all(worker.returncode == 0 for worker in workers)
+
+    with ResultsStore(database) as store:
+        assert {row.port: row.status for row in store.query()} == expected
+        assert store.scans()[0][5] is not None
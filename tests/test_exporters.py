@@ -0,0 +1,61 @@
+import csv
+import gzip
+import json
+import xml.etree.ElementTree as ElementTree
+import pytest
+from modules.banner_grabber import BannerResult
+from modules.port_scanner import ScanResult
+from modules.service_probes import Fingerprint
+from utils.exporters import create_exporter, NmapXMLExporter
+
+RECORDS = [
+    ScanResult("10.0.0.1", 22, "tcp", "open", 0.012),
+    ScanResult("10.0.0.1", 23, "tcp", "closed", 0.003),
+    ScanResult("10.0.0.2", 80, "tcp", "filtered", None),
+    BannerResult("10.0.0.1", 22, "tcp", "SSH-2.0-OpenSSH_9.6\x00\r\n", Fingerprint("ssh", "OpenSSH", "9.6")),
+    BannerResult("10.0.0.2", 21, "tcp", None),
+]
+
+def test_jsonl_and_csv_export_every_record(tmp_path):
+    with create_exporter(str(tmp_path / "scan.jsonl.gz")) as exporter:
+        assert list(exporter.tee(RECORDS)) == RECORDS
+    with gzip.open(tmp_path / "scan.jsonl.gz", "rt") as exported:
+        lines = [json.loads(line) for line in exported]
+    assert [line.get("status") for line in lines] == ["open", "closed", "filtered", None]
+    assert lines[3]["product"] == "OpenSSH" and lines[3]["banner"].startswith("SSH-2.0")
+
+    with create_exporter(str(tmp_path / "scan.csv"), statuses={"open"}) as exporter:
+        for record in RECORDS:
+            exporter.write(record)
+    with open(tmp_path / "scan.csv", newline="") as exported:
+        rows = list(csv.DictReader(exported))
+    assert [(row["port"], row["status"], row["version"]) for row in rows] == [("22", "open", ""), ("22", "open", "9.6")]
+
+def test_xml_is_nmap_compatible(tmp_path):
+    path = str(tmp_path / "scan.xml")
+    with create_exporter(path, scan_type="syn", ports="1-1024", args="scan 10.0.0.0/30 1-1024") as exporter:
+        assert isinstance(exporter, NmapXMLExporter)
+        for record in RECORDS:
+            exporter.write(record)
+    root = ElementTree.parse(path).getroot()
+    assert root.tag == "nmaprun" and root.find("scaninfo").get("type") == "syn"
+    ports = [(host.find("address").get("addr"), host.find("ports/port")) for host in root.iter("host")]
+    assert [(addr, port.get("portid"), port.find("state").get("state")) for addr, port in ports] == [("10.0.0.1", "22", "open")] * 2
+    service = ports[1][1].find("service")
+    assert (service.get("name"), service.get("product"), service.get("version")) == ("ssh", "OpenSSH", "9.6")
+    assert ports[1][1].find("script").get("output").startswith("SSH-2.0-OpenSSH_9.6\\x00")
+    assert root.find("runstats/hosts").get("up") == "2"
+
+def test_grepable_lines_and_format_errors(tmp_path):
+    path = str(tmp_path / "scan.gnmap")
+    with create_exporter(path) as exporter:
+        for record in RECORDS:
+            exporter.write(record)
+    with open(path) as exported:
+        lines = [line for line in exported.read().splitlines() if not line.startswith("#")]
+    assert lines == ["Host: 10.0.0.1 ()\tPorts: 22/open/tcp/////", "Host: 10.0.0.1 ()\tPorts: 22/open/tcp//ssh//OpenSSH 9.6/"]
+
+    with pytest.raises(ValueError):
+        create_exporter(str(tmp_path / "scan.bin"))
+    with pytest.raises(ValueError):
+        create_exporter(str(tmp_path / "scan.csv"), compression="lz4")
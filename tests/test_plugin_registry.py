@@ -0,0 +1,33 @@
+import sys
+import pytest
+from modules.port_scanner import PortScannerFactory, TCPScanner
+from utils.plugin_registry import PluginRegistry
+
+def test_plugins_directory_is_listed_without_importing(tmp_path):
+    (tmp_path / "dropin_engine.py").write_text(
+        "from modules.port_scanner import TCPScanner\n\nclass DropInScanner(TCPScanner):\n    pass\n")
+    (tmp_path / "dropin.ini").write_text(
+        "[dropin]\ngroup = port_scanners\ntarget = dropin_engine:DropInScanner\ndescription = Drop-in engine\n\n"
+        "[tcp]\ngroup = port_scanners\ntarget = dropin_engine:DropInScanner\n\n"
+        "[other]\ngroup = modules\ntarget = dropin_engine:DropInScanner\n")
+
+    registry = PluginRegistry("port_scanners", plugin_dirs=(str(tmp_path),))
+    registry.register("tcp", "modules.port_scanner:TCPScanner", "TCP connect scan")
+    specs = {spec.name: spec for spec in registry.specs()}
+    assert set(specs) == {"tcp", "dropin"}
+    assert specs["dropin"].description == "Drop-in engine" and specs["dropin"].source == "dropin.ini"
+    assert "dropin_engine" not in sys.modules
+
+    scanner = registry.create("DROPIN", concurrency=4)
+    assert type(scanner).__name__ == "DropInScanner" and scanner.concurrency == 4
+    assert registry.load("tcp") is TCPScanner
+
+def test_unknown_and_broken_plugins_raise_value_error():
+    registry = PluginRegistry("port_scanners", plugin_dirs=())
+    registry.register("broken", "no_such_module_here:Scanner")
+    with pytest.raises(ValueError):
+        registry.load("missing")
+    with pytest.raises(ValueError):
+        registry.load("broken")
+    with pytest.raises(ValueError):
+        PortScannerFactory.generate_port_scanner("no-such-scan")
@@ -0,0 +1,52 @@
+import pytest
+from modules.port_scanner import ScanResult
+from utils.port_state import PortStateMap, PortStateStore, OPEN, CLOSED, FILTERED, UNKNOWN
+
+def test_port_state_map_roundtrip():
+    port_map = PortStateMap()
+    port_map.set(0, "open")
+    port_map.set(443, "filtered")
+    port_map.set(65535, CLOSED)
+
+    assert (port_map.get(0), port_map.get(443), port_map.get(65535), port_map.get(80)) == (OPEN, FILTERED, CLOSED, UNKNOWN)
+    assert list(port_map.ports("open")) == [0]
+    assert port_map.count(UNKNOWN) == 65533
+
+def test_store_queries_and_diff():
+    before = PortStateStore()
+    after = PortStateStore()
+    for host in ("10.0.0.1", "10.0.0.2"):
+        before.record(ScanResult(host, 443, "tcp", "open", None))
+        before.record(ScanResult(host, 22, "tcp", "closed", None))
+    after.record(ScanResult("10.0.0.1", 443, "tcp", "open", None))
+    after.record(ScanResult("10.0.0.2", 443, "tcp", "closed", None))
+
+    assert sorted(before.hosts_with(443)) == ["10.0.0.1", "10.0.0.2"]
+    assert sorted(after.diff(before)) == [
+        ("10.0.0.1", 22, None, "closed"),
+        ("10.0.0.2", 22, None, "closed"),
+        ("10.0.0.2", 443, "closed", "open"),
+    ]
+
+    merged = before.union(after)
+    assert merged.get("10.0.0.2", 443) == "closed"
+    assert merged.get("10.0.0.2", 22) == "closed"
+
+def test_store_save_and_load(tmp_path):
+    store = PortStateStore("udp")
+    store.set("192.168.1.10", 53, "open")
+    store.set("2001:db8::1", 161, "filtered")
+    store.save(tmp_path / "scan.psm")
+
+    loaded = PortStateStore.load(tmp_path / "scan.psm")
+
+    assert loaded.proto == "udp"
+    assert loaded.get("192.168.1.10", 53) == "open"
+    assert loaded.get("2001:db8::1", 161) == "filtered"
+    assert not list(loaded.diff(store))
+
+    data = (tmp_path / "scan.psm").read_bytes()
+    for length in (10, len(data) - 1):
+        (tmp_path / "broken.psm").write_bytes(data[:length])
+        with pytest.raises(ValueError):
+            PortStateStore.load(tmp_path / "broken.psm")
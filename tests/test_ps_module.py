@@ -1,4 +1,13 @@
-from modules.port_scanner import PortScannerFactory
+import os
+import errno
+import asyncio
+import socket
+import threading
+import time
+import pytest
+from array import array
+from modules.port_scanner import PortScannerBase, PortScannerFactory
+from modules.scan_planner import discover_live_hosts
 
 def test_port_scanning():
     target = "example.com"
@@ -11,5 +20,138 @@ def test_port_scanning():
     print("Open ports:", open_ports)
     print("Closed ports:", closed_ports)
 
+def test_tcp_scanning_loopback():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+
+    closed_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed_sock.bind(("127.0.0.1", 0))
+    closed_port = closed_sock.getsockname()[1]
+
+    try:
+        port_scanner = PortScannerFactory.generate_port_scanner("TCP", concurrency=64)
+        open_ports, closed_ports = port_scanner.scan_target("127.0.0.1", [open_port, closed_port])
+    finally:
+        listener.close()
+        closed_sock.close()
+
+    assert open_ports == {open_port: "open"}
+    assert closed_ports == {closed_port: "closed"}
+
+def test_tcp_scan_iter_streams_results():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+
+    try:
+        port_scanner = PortScannerFactory.generate_port_scanner("TCP", concurrency=8)
+        results = list(port_scanner.scan_iter([("127.0.0.1", open_port)]))
+    finally:
+        listener.close()
+
+    assert len(results) == 1
+    assert results[0][:4] == ("127.0.0.1", open_port, "tcp", "open")
+    assert results[0].rtt is not None
+
+def stub_status(port):
+    return "open" if port % 5 == 0 else "closed" if port % 2 else "filtered"
+
+def test_slow_consumer_does_not_inflate_rtts():
+    closed_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed_sock.bind(("127.0.0.1", 0))
+    closed_port = closed_sock.getsockname()[1]
+    scanner = PortScannerFactory.generate_port_scanner("TCP", concurrency=4)
+    rtts = []
+    try:
+        for result in scanner.scan_iter([("127.0.0.1", closed_port)] * 24):
+            rtts.append(result.rtt)
+            time.sleep(0.05)
+    finally:
+        closed_sock.close()
+    assert len(rtts) == 24 and max(rtts) < 0.025
+
+def test_tcp_local_errors_are_not_reported_as_filtered(monkeypatch):
+    failures = {10: errno.EHOSTUNREACH, 11: errno.EADDRNOTAVAIL}
+
+    async def sock_connect(self, sock, address):
+        raise OSError(failures[address[1]], os.strerror(failures[address[1]]))
+
+    monkeypatch.setattr(asyncio.SelectorEventLoop, "sock_connect", sock_connect)
+    scanner = PortScannerFactory.generate_port_scanner("TCP", concurrency=1, retries=0)
+    assert [result.status for result in scanner.scan_iter([("127.0.0.1", 10)])] == ["filtered"]
+    with pytest.raises(OSError) as raised:
+        list(scanner.scan_iter([("127.0.0.1", 11)]))
+    assert raised.value.errno == errno.EADDRNOTAVAIL
+    assert scanner.telemetry.count("local_errors", error="EADDRNOTAVAIL") == 1
+
+class StubScanner(PortScannerBase):
+    def scan_port(self, target_ip, port, result):
+        result[port] = stub_status(port)
+
+def test_chunks_are_balanced_and_merged_per_status():
+    batch = [(f"10.0.0.{host}", port) for host in range(1, 4) for port in range(100, 150)] + [("10.0.0.9", 7)]
+    chunks = PortScannerBase.chunk_probes(batch, 8)
+    sizes = [sum(len(ports) for _, ports in chunk) for chunk in chunks]
+    assert len(chunks) == 8 and max(sizes) - min(sizes) <= 1 and sum(sizes) == len(batch)
+    assert sorted((host, port) for chunk in chunks for host, ports in chunk for port in ports) == sorted(batch)
+    assert all(isinstance(ports, array) and ports.typecode == "H" for chunk in chunks for _, ports in chunk)
+
+    scanner = StubScanner()
+    scanned = scanner.scan_chunk([("10.0.0.1", array("H", range(100, 111)))])
+    assert scanned == [("10.0.0.1", {"open": array("H", [100, 105, 110]), "filtered": array("H", [102, 104, 106, 108]),
+                                     "closed": array("H", [101, 103, 107, 109])})]
+
+    results = list(scanner.scan_iter(batch))
+    assert sorted((result.host, result.port) for result in results) == sorted(batch)
+    assert all(result.status == stub_status(result.port) for result in results)
+    open_ports, closed_ports = scanner.scan_target("127.0.0.1", "100-120")
+    assert sorted(open_ports) == [100, 105, 110, 115, 120] and len(closed_ports) == 16
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="SYN scanning needs CAP_NET_RAW")
+def test_syn_scanning_loopback():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+
+    closed_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed_sock.bind(("127.0.0.1", 0))
+    closed_port = closed_sock.getsockname()[1]
+
+    try:
+        port_scanner = PortScannerFactory.generate_port_scanner("SYN", timeout=0.5)
+        open_ports, closed_ports = port_scanner.scan_target("127.0.0.1", [open_port, closed_port])
+    finally:
+        listener.close()
+        closed_sock.close()
+
+    assert open_ports == {open_port: "open"}
+    assert closed_ports == {closed_port: "closed"}
+
+def test_udp_scan_classifies_replies_and_unreachables():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    open_port = server.getsockname()[1]
+
+    def answer():
+        data, address = server.recvfrom(2048)
+        server.sendto(b"reply", address)
+
+    threading.Thread(target=answer, daemon=True).start()
+    closed_port = open_port - 1 if open_port > 1024 else open_port + 1
+    scanner = PortScannerFactory.generate_port_scanner("udp", timeout=0.3)
+    results = {result.port: result.status for result in scanner.scan_iter([("127.0.0.1", open_port), ("127.0.0.1", closed_port)])}
+    server.close()
+
+    assert results == {open_port: "open", closed_port: "closed"}
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() != 0, reason="ICMP sweeps need CAP_NET_RAW")
+def test_icmp_sweep_feeds_planner():
+    scanner = PortScannerFactory.generate_port_scanner("icmp", timeout=0.3)
+    assert discover_live_hosts("127.0.0.1-4", scanner) == ["127.0.0.1-127.0.0.4"]
+
 if __name__ == "__main__":
     test_port_scanning()
@@ -0,0 +1,38 @@
+import time
+from modules.port_scanner import UDPScanner
+from utils.rate_limiter import ProbeScheduler, TokenBucket, load_rate_limits
+
+def test_bucket_spaces_out_reservations():
+    bucket = TokenBucket(100, burst=10)
+    now = time.monotonic()
+    waits = [bucket.reserve(now) for _ in range(50)]
+    assert waits[:10] == [0.0] * 10
+    assert abs(waits[-1] - 0.4) < 1e-6
+
+def test_per_target_and_subnet_limits():
+    scheduler = ProbeScheduler(per_target_rate=10, burst=1)
+    assert scheduler.reserve("10.0.0.1") == 0.0
+    assert scheduler.reserve("10.0.0.1") > 0.05
+    assert scheduler.reserve("10.0.0.2") == 0.0
+
+    scheduler = ProbeScheduler(per_subnet_rate=10, burst=1, subnet_prefix=24)
+    assert scheduler.reserve("10.0.0.1") == 0.0
+    assert scheduler.reserve("10.0.0.2") > 0.05
+    assert scheduler.reserve("10.0.1.1") == 0.0
+    assert ProbeScheduler().unlimited
+
+def test_split_and_config(tmp_path):
+    config = tmp_path / "eater.ini"
+    config.write_text("[rate_limit]\nglobal_pps = 1000\nper_target_pps = 0\nburst = 8\n")
+    limits = load_rate_limits(str(config))
+    assert limits == {"global_rate": 1000.0, "per_target_rate": 0.0, "burst": 8}
+
+    share = ProbeScheduler(**limits).split(4)
+    assert share.global_rate == 250 and share.per_target_rate is None and share.burst == 2
+
+def test_paced_scan_honours_global_rate():
+    scheduler = ProbeScheduler(global_rate=200, burst=1)
+    started = time.monotonic()
+    results = list(UDPScanner(rate=100000, timeout=0.2, retries=0, scheduler=scheduler).scan_iter(("127.0.0.1", port) for port in range(1, 41)))
+    assert len(results) == 40
+    assert time.monotonic() - started >= 0.19
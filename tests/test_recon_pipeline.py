@@ -0,0 +1,60 @@
+import socket
+import threading
+from benchmarks.services import LoopbackServices, BANNER
+from database.results_store import ResultsStore
+from modules.port_scanner import TCPScanner, ScanResult
+from modules.banner_grabber import BannerGrabberFactory, BannerResult
+from modules.recon_pipeline import scan_and_grab
+from utils.checkpoint import ScanCheckpoint
+from utils.module_generator import ProtosearchModule
+
+def test_open_ports_are_grabbed_during_scan():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    open_port = listener.getsockname()[1]
+
+    def greet():
+        while True:
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                return
+            try:
+                client.sendall(b"220 mail ready\r\n")
+            except OSError:
+                pass
+            client.close()
+
+    threading.Thread(target=greet, daemon=True).start()
+
+    probes = [("127.0.0.1", port) for port in range(open_port - 20, open_port + 1)]
+    grabber = BannerGrabberFactory.generate_banner_grabber("tcp", timeout=0.5)
+    items = list(scan_and_grab(TCPScanner(concurrency=8, timeout=0.5).scan_iter(probes), grabber, queue_size=2))
+    listener.close()
+
+    scans = [item for item in items if isinstance(item, ScanResult)]
+    banners = [item for item in items if isinstance(item, BannerResult)]
+    assert len(scans) == len(probes)
+    assert banners == [BannerResult("127.0.0.1", open_port, "tcp", "220 mail ready")]
+
+def test_closing_the_pipeline_stops_the_scan():
+    probes = (("127.0.0.1", port) for port in range(1, 65536))
+    grabber = BannerGrabberFactory.generate_banner_grabber("tcp", timeout=0.2)
+    items = scan_and_grab(TCPScanner(concurrency=8, timeout=0.2).scan_iter(probes), grabber)
+    assert isinstance(next(items), ScanResult)
+    items.close()
+
+def test_scan_grabs_banners_into_the_results_store(tmp_path):
+    with LoopbackServices(tcp_open=2, tcp_closed=2, tcp_filtered=0, udp_open=0, udp_closed=0, udp_filtered=0) as services:
+        ports = ",".join(map(str, services.expected["tcp"]))
+        checkpoint = ScanCheckpoint.create("TCP", "127.0.0.1", ports, directory=str(tmp_path))
+        checkpoint.database = str(tmp_path / "results.db")
+        checkpoint.grab_banners = True
+        counts = ProtosearchModule().execute(checkpoint)
+
+    assert counts["open"] == 2 and counts["closed"] == 2
+    with ResultsStore(checkpoint.database) as store:
+        rows = store.query(scan_id=checkpoint.database_scan_id, status="open")
+        assert sorted(row.port for row in rows) == sorted(port for port, status in services.expected["tcp"].items() if status == "open")
+        assert all(row.banner == BANNER.decode().strip() for row in rows)
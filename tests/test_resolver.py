@@ -0,0 +1,64 @@
+import asyncio
+import socket
+import pytest
+from benchmarks.services import StubDNSServer
+from modules.scan_planner import ScanPlanner
+from utils.resolver import DNSCache, Resolver
+
+ZONE = {"www.example.test": {"A": ["10.0.0.1", "10.0.0.2"], "AAAA": ["2001:db8::1"]},
+        "v6only.example.test": {"AAAA": ["2001:db8::2"]}}
+
+def test_resolves_many_names_and_caches_positive_and_negative_answers():
+    with StubDNSServer(ZONE, synthetic=500) as dns:
+        resolver = Resolver([dns.nameserver], timeout=0.5, hosts_file=None, search=[])
+        names = dns.synthetic_names() + ["www.example.test", "missing.example.test", "10.9.8.7"]
+        results = resolver.resolve_many(names)
+        assert results["host0.bench.test"].ipv4 == ("127.0.0.1",)
+        assert results["www.example.test"].ipv4 == ("10.0.0.1", "10.0.0.2") and results["www.example.test"].ipv6 == ("2001:db8::1",)
+        assert results["missing.example.test"].error == "NXDOMAIN"
+        assert results["10.9.8.7"].ipv4 == ("10.9.8.7",)
+        assert sum(1 for resolution in results.values() if resolution.ipv4) == 502
+
+        queries = dns.queries
+        resolver.resolve_many(names)
+        assert resolver.gethostbyname("WWW.example.test.") == "10.0.0.1"
+        with pytest.raises(socket.gaierror):
+            resolver.gethostbyname("missing.example.test")
+        with pytest.raises(socket.gaierror):
+            resolver.gethostbyname("v6only.example.test")
+        assert dns.queries == queries + 1
+
+        planner = ScanPlanner("www.example.test,missing.example.test,host7.bench.test", "80", resolve=resolver.gethostbyname)
+        assert sorted(host for host, _ in planner) == ["10.0.0.1", "127.0.0.8"]
+        assert asyncio.run(resolver.gethostbyname_async("host9.bench.test")) == "127.0.0.10"
+
+def test_short_names_are_tried_with_the_search_domains():
+    zone = dict(ZONE, **{"fileserver.corp.test": {"A": ["10.0.1.5"]}})
+    with StubDNSServer(zone) as dns:
+        resolver = Resolver([dns.nameserver], timeout=0.5, hosts_file=None, search=["corp.test", "test"], ndots=1)
+        assert resolver.gethostbyname("fileserver") == "10.0.1.5"
+        assert resolver.resolve("www.example").ipv4 == ("10.0.0.1", "10.0.0.2")
+        queries = dns.queries
+        assert resolver.gethostbyname("fileserver") == "10.0.1.5" and dns.queries == queries
+        assert resolver.resolve("fileserver.").error == "NXDOMAIN"
+
+def test_unanswered_queries_time_out_without_being_cached():
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    try:
+        resolver = Resolver([f"127.0.0.1:{silent.getsockname()[1]}"], timeout=0.05, retries=1, hosts_file=None)
+        assert resolver.resolve("www.example.test").error == "timeout"
+        assert len(resolver.cache) == 0
+    finally:
+        silent.close()
+
+def test_cache_expires_entries_and_evicts_least_recently_used():
+    now = [0.0]
+    cache = DNSCache(max_entries=2, clock=lambda: now[0])
+    cache.put("a", "A", ["10.0.0.1"], 10)
+    cache.put("b", "A", [], 100)
+    assert cache.get("a", "A") == ("10.0.0.1",) and cache.get("b", "A") == ()
+    cache.put("c", "A", ["10.0.0.3"], 100)
+    assert cache.get("a", "A") is None and cache.get("b", "A") == ()
+    now[0] = 101
+    assert cache.get("b", "A") is None and cache.get("c", "A") is None
@@ -0,0 +1,49 @@
+import threading
+from database.results_store import ResultsStore
+from modules.port_scanner import ScanResult
+
+def test_ingest_and_query():
+    with ResultsStore(":memory:", batch_size=2) as store:
+        scan_id = store.start_scan("tcp", "10.0.0.0/30", "22,80")
+        results = [
+            ScanResult("10.0.0.1", 22, "tcp", "open", 0.01),
+            ScanResult("10.0.0.2", 22, "tcp", "open", 0.02),
+            ScanResult("10.0.0.3", 22, "tcp", "closed", 0.01),
+            ScanResult("10.0.0.1", 80, "tcp", "filtered", None),
+        ]
+
+        assert store.ingest(scan_id, results) == 4
+        store.record_banners(scan_id, [
+            ("10.0.0.1", 22, "tcp", "SSH-2.0-OpenSSH_7.4"),
+            ("10.0.0.2", 22, "tcp", "SSH-2.0-OpenSSH_9.3p1 Ubuntu"),
+        ])
+        store.finish_scan(scan_id)
+
+        assert len(store.query(scan_id=scan_id)) == 4
+        assert [row.host for row in store.query(port=22, status="open", product="OpenSSH", version_below="8")] == ["10.0.0.1"]
+        assert [row.host for row in store.query(banner_regex=r"Ubuntu$")] == ["10.0.0.2"]
+        assert store.scans()[0][5] is not None
+
+def test_tee_filters_persisted_statuses():
+    with ResultsStore(":memory:") as store:
+        scan_id = store.start_scan("tcp")
+        results = [ScanResult("10.0.0.1", port, "tcp", "open" if port == 443 else "closed", None) for port in range(440, 450)]
+
+        passed = list(store.tee(scan_id, results, statuses={"open"}))
+
+        assert passed == results
+        assert [(row.host, row.port) for row in store.query()] == [("10.0.0.1", 443)]
+
+def test_queries_run_safely_while_another_thread_ingests():
+    with ResultsStore(":memory:", batch_size=50) as store:
+        scan_id = store.start_scan("tcp")
+        results = [ScanResult(f"10.0.{port >> 8}.{port & 255}", 80, "tcp", "open", None) for port in range(5000)]
+        writer = threading.Thread(target=store.ingest, args=(scan_id, results))
+        writer.start()
+        counts = []
+        while writer.is_alive():
+            counts.append(len(store.query(scan_id=scan_id, status="open")))
+            store.scans()
+        writer.join()
+        assert counts == sorted(counts) and all(count % 50 == 0 for count in counts)
+        assert len(store.query(scan_id=scan_id)) == 5000
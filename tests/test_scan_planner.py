@@ -0,0 +1,39 @@
+from modules.scan_planner import ScanPlanner, ProbePermutation, expand_targets, collapse_hosts
+
+def test_expand_targets():
+    ranges = list(expand_targets("10.0.0.0/30, 10.0.1.5-7 10.0.2.1-10.0.2.2 127.0.0.1"))
+
+    assert [len(hosts) for hosts in ranges] == [4, 3, 2, 1]
+
+def test_expand_targets_from_file(tmp_path):
+    target_file = tmp_path / "targets.txt"
+    target_file.write_text("# lab hosts\n192.168.0.0/29\n192.168.1.1 # gateway\n")
+
+    ranges = list(expand_targets(f"@{target_file}"))
+
+    assert sum(len(hosts) for hosts in ranges) == 9
+
+def test_permutation_visits_every_index_once():
+    for size in (1, 2, 7, 1000, 4097):
+        permutation = ProbePermutation(size, seed=size)
+        values = [permutation.value_at(position) for position in range(len(permutation))]
+        assert sorted(value for value in values if value >= 0) == list(range(size))
+
+def test_planner_covers_cross_product():
+    planner = ScanPlanner("10.0.0.0/28", "22,80-81", seed=7)
+    probes = list(planner)
+
+    assert len(planner) == 48
+    assert sorted(probes) == sorted((f"10.0.0.{host}", port) for host in range(16) for port in (22, 80, 81))
+
+def test_planner_resumes_from_cursor():
+    planner = ScanPlanner("10.0.0.0/24", "1-100", seed=3)
+    indexed = list(planner.iter_indexed())
+    position = indexed[1000][0]
+
+    assert list(planner.iter_indexed(position)) == indexed[1000:]
+
+def test_collapse_hosts():
+    hosts = ["10.0.0.3", "10.0.0.1", "10.0.0.2", "10.0.0.9", "10.0.0.2"]
+    assert collapse_hosts(hosts) == ["10.0.0.1-10.0.0.3", "10.0.0.9"]
+    assert sorted(host for host, _ in ScanPlanner(collapse_hosts(hosts), [1])) == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.9"]
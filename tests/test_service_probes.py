@@ -0,0 +1,21 @@
+from modules.service_probes import default_library, literal_prefix
+
+def test_literal_prefix_extraction():
+    assert literal_prefix(rb"^SSH-[\d.]+-") == b"SSH-"
+    assert literal_prefix(rb"^\x16\x03[\x00-\x04]") == b"\x16\x03"
+    assert literal_prefix(rb"^HTTP/1\.[01]") == b"HTTP/1."
+    assert literal_prefix(rb"^abc?d") == b"ab"
+    assert literal_prefix(rb"^foo|bar") == b""
+    assert literal_prefix(rb"SSH-") == b""
+
+def test_probes_for_port_and_matching():
+    library = default_library()
+    assert [probe.name for probe in library.probes_for(443)] == ["NULL", "TLSSessionReq"]
+    assert [probe.name for probe in library.probes_for(161, "udp")] == ["SNMPv1GetRequest"]
+    assert [probe.name for probe in library.probes_for(40000, "udp")] == ["UDPEmpty"]
+
+    assert tuple(library.match(b"SSH-2.0-OpenSSH_7.4\r\n")) == ("ssh", "OpenSSH", "7.4")
+    assert tuple(library.match(b"J\x00\x00\x00\x0a8.0.32\x00rest")) == ("mysql", "MySQL", "8.0.32")
+    assert library.match(b"S") is None
+    postgres = next(probe for probe in library.probes if probe.name == "PostgreSQLSSLRequest")
+    assert library.match(b"S", postgres).service == "postgresql"
@@ -0,0 +1,30 @@
+from benchmarks.services import LoopbackServices
+from modules.port_scanner import PortScannerFactory, ScanResult
+from modules.scan_planner import ScanPlanner
+from modules.sharded_scanner import ShardedScanner, pack_result, unpack_results
+from utils.rate_limiter import ProbeScheduler
+
+def test_shards_partition_the_planner_walk():
+    planner = ScanPlanner("10.0.0.0/28", "1-50", seed=7)
+    shards = [list(planner.iter_shard(shard, 3)) for shard in range(3)]
+    assert sum(len(shard) for shard in shards) == len(planner)
+    assert sorted(probe for shard in shards for probe in shard) == sorted(planner)
+
+def test_result_records_round_trip():
+    results = [ScanResult("10.0.0.1", 443, "tcp", "open", 0.25), ScanResult("10.0.0.2", 1, "tcp", "filtered", None)]
+    assert list(unpack_results(b"".join(pack_result(result) for result in results), "tcp")) == results
+
+def test_sharded_scan_matches_stand_in_services():
+    with LoopbackServices(tcp_open=20, tcp_closed=20, tcp_filtered=2, udp_open=0, udp_closed=0, udp_filtered=0) as services:
+        scanner = PortScannerFactory.generate_port_scanner("tcp", shards=2, timeout=0.5, scheduler=ProbeScheduler())
+        assert isinstance(scanner, ShardedScanner) and scanner.shards == 2
+        expected = services.expected["tcp"]
+
+        streamed = list(scanner.scan_iter(services.tcp_probes()))
+        assert sorted(result.port for result in streamed) == sorted(expected)
+        assert all(result.status == expected[result.port] for result in streamed)
+        assert scanner.telemetry.count("probes_sent") >= len(expected)
+
+        planner = ScanPlanner("127.0.0.1", ",".join(map(str, expected)), seed=3)
+        planned = list(scanner.scan_iter(planner))
+        assert {result.port: result.status for result in planned} == expected
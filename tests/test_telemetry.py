@@ -0,0 +1,50 @@
+import io
+from modules.port_scanner import PortScannerFactory
+from utils.logger import CustomLogger
+from utils.rate_limiter import ProbeScheduler
+from utils.telemetry import ProgressReporter, ScanTelemetry
+from benchmarks.services import LoopbackServices
+
+def test_counters_gauges_and_prometheus_export(tmp_path):
+    telemetry = ScanTelemetry(total=4, labels={"scan": "s1"})
+    telemetry.incr("results", status="open")
+    telemetry.incr("results", 2, status="closed")
+    telemetry.add_gauge("in_flight", 3)
+    telemetry.sample_gauge("queue_depth", lambda: 5, stage="results")
+    for rtt in (0.001, 0.002, 0.2):
+        telemetry.observe("rtt_seconds", rtt)
+
+    assert telemetry.count("results") == 3 and telemetry.count("results", status="open") == 1
+    assert telemetry.gauge("in_flight") == 3 and telemetry.gauge("queue_depth") == 5
+    done, total, rate, eta = telemetry.progress()
+    assert (done, total) == (3, 4) and rate > 0 and eta is not None
+
+    text = telemetry.prometheus()
+    assert 'eater_results_total{scan="s1",status="closed"} 2' in text
+    assert 'eater_queue_depth{scan="s1",stage="results"} 5' in text
+    assert 'eater_rtt_seconds_bucket{scan="s1",le="0.0025"} 2' in text
+    assert 'eater_rtt_seconds_count{scan="s1"} 3' in text
+
+    stream = io.StringIO()
+    with ProgressReporter(telemetry, stream=stream, metrics_file=str(tmp_path / "scan.prom")):
+        pass
+    assert "3/4" in stream.getvalue()
+    assert (tmp_path / "scan.prom").read_text().startswith("# HELP")
+
+def test_tcp_scan_reports_probes_replies_and_rtt():
+    with LoopbackServices(tcp_open=3, tcp_closed=3, tcp_filtered=0, udp_open=0, udp_closed=0, udp_filtered=0) as services:
+        scanner = PortScannerFactory.generate_port_scanner("tcp", timeout=0.5, scheduler=ProbeScheduler())
+        results = list(scanner.scan_iter(services.tcp_probes()))
+    telemetry = scanner.telemetry
+    assert len(results) == 6
+    assert telemetry.count("probes_sent") == 6 and telemetry.count("replies") == 6
+    assert telemetry.count("results", status="open") == 3
+    assert telemetry.histograms["rtt_seconds"].count == 6
+    assert telemetry.gauge("in_flight") == 0 and telemetry.gauge("queue_depth") == 0
+
+def test_custom_logger_does_not_duplicate_handlers(tmp_path):
+    log_file = str(tmp_path / "eater.log")
+    first = CustomLogger(log_file).get_logger()
+    second = CustomLogger(log_file).get_logger()
+    assert first is second and len(second.handlers) == 2 and first.name == "utils.logger"
+    assert CustomLogger(str(tmp_path / "other.log")).get_logger() is not first
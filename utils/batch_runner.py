@@ -0,0 +1,426 @@
+"""
+Batch Runner
+
+This module drives Eater without the interactive shell. Scan and banner grab jobs are given on the command line or in INI/YAML job files and run concurrently in one process, on the same factories and module code the shell uses, so hundreds of jobs cost threads instead of interpreter processes. Scan jobs are checkpointed like interactive scans and can be resumed with 'resume <scan_id>'; jobs writing to the same database share one results store.
+
+Classes:
+- ScanJob: One scan or banner grab job.
+
+Functions:
+- make_job: Build a job from a mapping of job file options.
+- load_jobs: Read jobs from an INI or YAML job file.
+- run_job: Run one job.
+- run_jobs: Run jobs concurrently.
+- coordinate: Lease the shards of a scan to workers (see modules/distributed_scan.py).
+- work: Scan shards leased from a coordinator.
+- build_parser: The argument parser of the batch command line.
+- main: Entry point of the batch command line.
+
+Job files:
+    INI files hold one job per section; options in [DEFAULT] apply to every job.
+
+        [DEFAULT]
+        ports = 1-1024
+        database = results.db
+
+        [web]
+        targets = 10.0.0.0/24
+        ports = 80,443,8080
+        banners = yes
+
+    YAML files (PyYAML required) hold a 'jobs' list, or a mapping of job names to options, and an
+    optional 'defaults' mapping.
+
+        defaults: {ports: 1-1024, database: results.db}
+        jobs:
+          - {name: web, targets: 10.0.0.0/24, ports: "80,443,8080", banners: true}
+
+    Options: targets (required), ports (required), module (protosearch or bannergrabber, default
+    protosearch), scan_type (default TCP), banners, discover, database, shards (worker processes
+    of a scan, 0 for one per CPU core; default 1), output (export file: .jsonl, .csv, .xml or
+    .gnmap, optionally compressed with .gz or .zst; see utils/exporters.py), delta (rescan
+    incrementally against the previous scan of the job in its database; see
+    modules/delta_scan.py), sample (fraction of the probe space a delta scan sweeps, default
+    0.1), changes (file the change feed of a delta scan is appended to as JSON lines).
+
+Usage:
+    python eater.py scan 10.0.0.0/24 1-1024 --scan-type syn --banners --database results.db
+    python eater.py grab example.com 21-25
+    python eater.py jobs nightly.ini weekly.yaml --parallel 32 --metrics /var/lib/node_exporter/eater.prom
+    python eater.py resume <scan_id>
+    python eater.py scan 10.0.0.0/16 1-1024 --database estate.db --delta --sample 0.1 --changes changes.jsonl
+    python eater.py coordinate 10.0.0.0/16 1-1024 --listen 0.0.0.0:7878 --database results.db --token <secret>
+    python eater.py work coordinator-host:7878 --token <secret>
+"""
+
+import os
+import argparse
+import threading
+import configparser
+from collections import namedtuple
+from utils.module_generator import ProtosearchModule, BannergrabberModule, open_exporter
+
+DEFAULT_PARALLEL_JOBS = 8
+JOB_MODULES = ("protosearch", "bannergrabber")
+TRUE_VALUES = ("1", "yes", "true", "on", "y")
+EXPORT_HELP = "Export results to FILE as they arrive (.jsonl, .csv, .xml or .gnmap, optionally .gz or .zst)."
+
+ScanJob = namedtuple("ScanJob", ["name", "targets", "ports", "module", "scan_type", "grab_banners", "discover", "database", "shards", "output",
+                                 "delta", "sample", "changes"],
+                     defaults=("protosearch", "TCP", False, False, None, 1, None, False, None, None))
+
+def _flag(value):
+    """Interpret a job file boolean ("yes", "true", 1, ...)."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+def make_job(name, options):
+    """Build a ScanJob from a mapping of job file options.
+
+    Args:
+        name (str): The job name.
+        options (dict): Job options (targets, ports, module, scan_type, banners, discover, database, shards, output, delta, sample, changes).
+
+    Returns:
+        ScanJob: The job.
+
+    Raises:
+        ValueError: If a required option is missing or the module is unknown.
+    """
+    missing = [option for option in ("targets", "ports") if not options.get(option)]
+    if missing:
+        raise ValueError(f"Job '{name}' is missing {', '.join(missing)}.")
+    module = str(options.get("module", "protosearch")).lower()
+    if module not in JOB_MODULES:
+        raise ValueError(f"Job '{name}' uses unknown module '{module}' (expected {' or '.join(JOB_MODULES)}).")
+    try:
+        shards = int(options.get("shards", 1))
+    except (TypeError, ValueError):
+        raise ValueError(f"Job '{name}' has an invalid shards value '{options.get('shards')}'.")
+    delta = _flag(options.get("delta", False))
+    try:
+        sample = float(options["sample"]) if options.get("sample") not in (None, "") else None
+    except (TypeError, ValueError):
+        raise ValueError(f"Job '{name}' has an invalid sample value '{options.get('sample')}'.")
+    if delta and (module != "protosearch" or not options.get("database")):
+        raise ValueError(f"Job '{name}' is a delta scan, which needs the protosearch module and a database.")
+    if sample is not None and not 0 < sample <= 1:
+        raise ValueError(f"Job '{name}' has a sample of {sample}; it must be above 0 and at most 1.")
+    return ScanJob(name, str(options["targets"]), str(options["ports"]), module,
+                   str(options.get("scan_type") or "TCP").upper(),
+                   _flag(options.get("banners", False)), _flag(options.get("discover", False)),
+                   options.get("database") or None, shards, options.get("output") or None,
+                   delta, sample, options.get("changes") or None)
+
+def _load_ini(path):
+    """Read the jobs of an INI job file."""
+    parser = configparser.ConfigParser()
+    with open(path) as job_file:
+        parser.read_file(job_file)
+    return [make_job(name, dict(parser[name])) for name in parser.sections()]
+
+def _load_yaml(path):
+    """Read the jobs of a YAML job file."""
+    try:
+        import yaml
+    except ImportError:
+        raise ValueError(f"Cannot read {path}: YAML job files require PyYAML (pip install pyyaml).")
+    with open(path) as job_file:
+        document = yaml.safe_load(job_file) or {}
+    if isinstance(document, list):
+        document = {"jobs": document}
+    if not isinstance(document, dict):
+        raise ValueError(f"Cannot read {path}: expected a mapping with a 'jobs' entry.")
+
+    defaults = document.get("defaults") or {}
+    entries = document.get("jobs") or []
+    if isinstance(entries, dict):
+        entries = [dict(options or {}, name=name) for name, options in entries.items()]
+    jobs = []
+    for number, options in enumerate(entries, 1):
+        options = dict(defaults, **options)
+        jobs.append(make_job(str(options.pop("name", f"job{number}")), options))
+    return jobs
+
+def load_jobs(path):
+    """Read jobs from a job file; the format is chosen by extension (.yaml/.yml, anything else is INI).
+
+    Args:
+        path (str): The job file.
+
+    Returns:
+        list: ScanJob records in file order.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file or a job in it is invalid.
+    """
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        return _load_yaml(path)
+    try:
+        return _load_ini(path)
+    except configparser.Error as e:
+        raise ValueError(f"Cannot read {path}: {e}")
+
+def run_job(job, stopped=None, results_store=None, checkpoint_dir=None, reporter=None):
+    """Run one job, printing its output prefixed with the job name.
+
+    Args:
+        job (ScanJob): The job.
+        stopped (threading.Event): Interrupts the job once set.
+        results_store (ResultsStore): An open store for the job's database, shared with other jobs.
+        checkpoint_dir (str): Directory holding the checkpoints of scan jobs. ~/.eater/checkpoints if not given.
+        reporter (ProgressReporter): A running progress reporter shared with other jobs. The job reports its own progress if not given.
+
+    Returns:
+        bool: Whether the job finished successfully.
+    """
+    from utils.checkpoint import ScanCheckpoint, DEFAULT_CHECKPOINT_DIR
+
+    prefix = f"[{job.name}] "
+    exporter = open_exporter(job.output, job.scan_type, job.ports, f"{job.module} {job.targets} {job.ports}", prefix)
+    if job.output and exporter is None:
+        return False
+    exporters = [exporter] if exporter is not None else None
+    try:
+        if job.module == "bannergrabber":
+            return BannergrabberModule().grab(job.targets, job.ports, job.scan_type, prefix, stopped, reporter, exporters) is not None
+
+        module = ProtosearchModule()
+        if job.delta:
+            return run_delta_job(module, job, prefix, stopped, results_store, reporter, exporters)
+        targets = job.targets
+        if job.discover:
+            targets = module.discover(targets, prefix)
+            if targets is None:
+                return False
+        checkpoint = ScanCheckpoint.create(job.scan_type, targets, job.ports, directory=checkpoint_dir or DEFAULT_CHECKPOINT_DIR)
+        checkpoint.database = job.database
+        checkpoint.grab_banners = job.grab_banners
+        checkpoint.shards = job.shards
+        print(f"{prefix}Scanning {targets} ports {job.ports} using {job.scan_type} (scan id {checkpoint.scan_id})...")
+        return module.execute(checkpoint, prefix, stopped, results_store, reporter, exporters) is not None
+    finally:
+        if exporter is not None:
+            exporter.close()
+
+def run_delta_job(module, job, prefix, stopped=None, results_store=None, reporter=None, exporters=None):
+    """Run a delta scan job, appending its changes to the job's change feed file.
+
+    Returns:
+        bool: Whether the delta scan finished successfully.
+    """
+    import sqlite3
+    from database.results_store import ResultsStore
+    from utils.exporters import open_output
+
+    own_store = results_store is None
+    feed = None
+    try:
+        if own_store:
+            results_store = ResultsStore(job.database)
+        if job.changes:
+            feed = open_output(job.changes, mode="a")
+        print(f"{prefix}Delta scanning {job.targets} ports {job.ports} using {job.scan_type}...")
+        return module.delta(job.scan_type, job.targets, job.ports, results_store, job.sample, job.grab_banners,
+                            prefix, stopped, reporter, exporters, feed) is not None
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"{prefix}Error: {e}")
+        return False
+    finally:
+        if feed is not None:
+            feed.close()
+        if own_store and results_store is not None:
+            results_store.close()
+
+def run_jobs(jobs, parallel=DEFAULT_PARALLEL_JOBS, checkpoint_dir=None, progress=None, metrics_file=None):
+    """Run jobs concurrently in this process, at most `parallel` at a time.
+
+    Jobs writing to the same database share one results store, and all jobs share one progress
+    line and metrics export. Ctrl-C interrupts every running job; interrupted scans keep their
+    checkpoints.
+
+    Args:
+        jobs (list): ScanJob records.
+        parallel (int): Maximum number of jobs running at once.
+        checkpoint_dir (str): Directory holding the checkpoints of scan jobs. ~/.eater/checkpoints if not given.
+        progress (bool): Show the live progress line. The [telemetry] setting of config/eater.ini if not given.
+        metrics_file (str): Export the metrics of all jobs to this file (.prom for Prometheus text, JSON otherwise).
+
+    Returns:
+        list: Whether each job finished successfully, in job order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from database.results_store import ResultsStore
+    from utils.telemetry import ScanTelemetry, ProgressReporter, load_telemetry_settings
+
+    settings = load_telemetry_settings()
+    if progress is not None:
+        settings["show"] = progress
+    if metrics_file:
+        settings["metrics_file"] = metrics_file
+    reporter = ProgressReporter(ScanTelemetry(), **settings)
+    stopped = threading.Event()
+    stores = {}
+    reporter.start()
+    try:
+        for path in {job.database for job in jobs if job.database and job.module == "protosearch"}:
+            stores[path] = ResultsStore(path)
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+            futures = [executor.submit(run_job, job, stopped, stores.get(job.database), checkpoint_dir, reporter) for job in jobs]
+            try:
+                return [future.result() for future in futures]
+            except KeyboardInterrupt:
+                stopped.set()
+                for future in futures:
+                    future.cancel()
+                return [not future.cancelled() and future.result() for future in futures]
+    finally:
+        reporter.stop()
+        for store in stores.values():
+            store.close()
+
+def build_parser():
+    """Return the argument parser of the batch command line."""
+    parser = argparse.ArgumentParser(prog="eater.py", description="Eater - The Network Utility Tool. Run without arguments for the interactive shell.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    telemetry = argparse.ArgumentParser(add_help=False)
+    telemetry.add_argument("--metrics", metavar="FILE", help="Export scan metrics to FILE while running (Prometheus text for .prom, JSON otherwise).")
+    telemetry.add_argument("--no-progress", action="store_true", help="Do not show the live progress line.")
+
+    scan = commands.add_parser("scan", parents=[telemetry], help="Scan ports on the targets.")
+    scan.add_argument("targets", help="Targets (hostname, IP, CIDR, range or @file).")
+    scan.add_argument("ports", help="Ports (e.g. 80,443 or 1-1024).")
+    scan.add_argument("-s", "--scan-type", default="TCP", help="TCP, SYN, UDP, ICMP or SCTP (default: TCP).")
+    scan.add_argument("-b", "--banners", action="store_true", help="Grab banners from open ports while scanning.")
+    scan.add_argument("-d", "--discover", action="store_true", help="Only scan hosts that answer ping.")
+    scan.add_argument("--database", help="Save results to this SQLite database.")
+    scan.add_argument("--shards", type=int, default=1, help="Run the scan in N worker processes, 0 for one per CPU core (default: 1).")
+    scan.add_argument("-o", "--output", metavar="FILE", help=EXPORT_HELP)
+    scan.add_argument("--delta", action="store_true", help="Rescan incrementally against the previous scan of the targets and ports in --database.")
+    scan.add_argument("--sample", type=float, help="Fraction of the remaining probe space a delta scan sweeps (default: 0.1).")
+    scan.add_argument("--changes", metavar="FILE", help="Append the changes found by a delta scan to FILE as JSON lines.")
+
+    grab = commands.add_parser("grab", parents=[telemetry], help="Grab banners from ports on the targets.")
+    grab.add_argument("targets", help="Targets (hostname, IP, CIDR, range or @file).")
+    grab.add_argument("ports", help="Ports (e.g. 80,443 or 1-1024).")
+    grab.add_argument("-s", "--scan-type", default="TCP", help="TCP, UDP, ICMP or SCTP (default: TCP).")
+    grab.add_argument("-o", "--output", metavar="FILE", help=EXPORT_HELP)
+
+    jobs = commands.add_parser("jobs", parents=[telemetry], help="Run the jobs of INI/YAML job files concurrently.")
+    jobs.add_argument("files", nargs="+", help="Job files (.ini, .yaml or .yml).")
+    jobs.add_argument("-j", "--parallel", type=int, default=DEFAULT_PARALLEL_JOBS,
+                      help=f"Maximum number of jobs running at once (default: {DEFAULT_PARALLEL_JOBS}).")
+
+    resume = commands.add_parser("resume", help="Resume an interrupted scan.")
+    resume.add_argument("scan_id", help="The scan id printed when the scan was started.")
+
+    coordinate = commands.add_parser("coordinate", help="Lease the shards of a scan to workers and collect their results.")
+    coordinate.add_argument("targets", help="Targets (hostname, IP, CIDR, range or @file).")
+    coordinate.add_argument("ports", help="Ports (e.g. 80,443 or 1-1024).")
+    coordinate.add_argument("-s", "--scan-type", default="TCP", help="TCP, SYN, UDP, ICMP or SCTP (default: TCP).")
+    coordinate.add_argument("--listen", default="0.0.0.0:7878", help="Address workers connect to (default: 0.0.0.0:7878).")
+    coordinate.add_argument("--database", help="Save results to this SQLite database.")
+    coordinate.add_argument("-o", "--output", metavar="FILE", help=EXPORT_HELP)
+    coordinate.add_argument("--shards", type=int, default=64, help="Number of leases the scan is cut into (default: 64).")
+    coordinate.add_argument("--lease-timeout", type=float, default=30.0, help="Seconds before a silent worker's shard is leased again (default: 30).")
+    coordinate.add_argument("--timeout", type=float, help="Probe timeout in seconds used by every worker.")
+    coordinate.add_argument("--token", help="Shared secret workers must present.")
+
+    work = commands.add_parser("work", help="Scan shards leased from a coordinator.")
+    work.add_argument("coordinator", help="The coordinator's host:port.")
+    work.add_argument("--token", help="The coordinator's shared secret.")
+    work.add_argument("--shards", type=int, default=1, help="Scan each lease in N local worker processes, 0 for one per CPU core (default: 1).")
+    return parser
+
+def coordinate(args):
+    """Run a scan coordinator until every shard has been scanned (the 'coordinate' command)."""
+    from modules.distributed_scan import Coordinator, parse_address
+
+    exporter = open_exporter(args.output, args.scan_type, args.ports, f"coordinate {args.targets} {args.ports}")
+    if args.output and exporter is None:
+        return 2
+
+    def report(result):
+        if exporter is not None:
+            exporter.write(result)
+        if result.status == "open":
+            print(f"Port {result.port} is open on {result.host}.")
+
+    options = {"timeout": args.timeout} if args.timeout else {}
+    try:
+        coordinator = Coordinator(args.scan_type, args.targets, args.ports, args.shards, options=options, database=args.database,
+                                  lease_timeout=args.lease_timeout, token=args.token, on_result=report)
+        host, port = parse_address(args.listen)
+        print(f"Leasing {coordinator.shards} shards of {len(coordinator.planner)} probes on {host}:{port}...")
+        counts = coordinator.run(host, port)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+    except KeyboardInterrupt:
+        print("Coordinator interrupted.")
+        return 1
+    finally:
+        if exporter is not None:
+            exporter.close()
+    print("Scan finished: " + ", ".join(f"{count} {status}" for status, count in counts.items()) + ".")
+    return 0
+
+def work(args):
+    """Scan leased shards until the coordinator reports the scan done (the 'work' command)."""
+    from modules.distributed_scan import ScanWorker, parse_address
+
+    worker = ScanWorker(parse_address(args.coordinator, "127.0.0.1"), token=args.token,
+                        options={"shards": args.shards} if args.shards != 1 else None)
+    try:
+        completed = worker.run()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+    except KeyboardInterrupt:
+        print("Worker interrupted; its shard will be leased again.")
+        return 1
+    print(f"Worker finished after {completed} shards.")
+    return 0
+
+def main(argv=None):
+    """Run the batch command line.
+
+    Args:
+        argv (list): Command line arguments, sys.argv[1:] if not given.
+
+    Returns:
+        int: The process exit status; 0 if every job succeeded.
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == "resume":
+        return 0 if ProtosearchModule().resume(args.scan_id) is not None else 1
+
+    if args.command == "coordinate":
+        return coordinate(args)
+    if args.command == "work":
+        return work(args)
+
+    if args.command == "jobs":
+        jobs = []
+        for path in args.files:
+            try:
+                jobs.extend(load_jobs(path))
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                return 2
+        parallel = args.parallel
+    else:
+        module = "protosearch" if args.command == "scan" else "bannergrabber"
+        try:
+            jobs = [make_job(args.command, {"targets": args.targets, "ports": args.ports, "module": module, "scan_type": args.scan_type,
+                                            "banners": getattr(args, "banners", False), "discover": getattr(args, "discover", False),
+                                            "database": getattr(args, "database", None), "shards": getattr(args, "shards", 1),
+                                            "output": getattr(args, "output", None), "delta": getattr(args, "delta", False),
+                                            "sample": getattr(args, "sample", None), "changes": getattr(args, "changes", None)})]
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 2
+        parallel = 1
+    return 0 if all(run_jobs(jobs, parallel, progress=False if args.no_progress else None, metrics_file=args.metrics)) else 1
@@ -0,0 +1,279 @@
+"""
+Scan Checkpoints
+
+This module makes long scans resumable. A checkpoint records everything needed to rebuild the scan planner (targets, ports, permutation seed) together with the probe cursor, so an interrupted scan can continue where it stopped instead of starting over.
+
+Probes complete out of order, so the cursor is a low-water mark: every walk position below it has finished. Positions at or above it that already finished are kept in a small bitmap relative to the cursor, which never grows beyond the number of probes in flight. Open ports found so far are kept in a PortStateStore next to the checkpoint file.
+
+Classes:
+- ScanCheckpoint: Persisted state of a scan (planner parameters, cursor and open-port store).
+- ProbeCursor: Walks a planner from a checkpoint cursor and tracks which probes have finished.
+
+Functions:
+- resumable_scan: Run a scan from a checkpoint, saving it periodically and when the scan stops.
+
+Usage:
+1. Create a checkpoint with 'ScanCheckpoint.create' and run it with 'resumable_scan(scanner, checkpoint)'.
+2. After an interruption, load it with 'ScanCheckpoint.load(scan_id)' and pass it to 'resumable_scan' again.
+"""
+
+import os
+import json
+import time
+import base64
+import secrets
+from collections import deque
+from utils.port_state import PortStateStore
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.expanduser("~"), ".eater", "checkpoints")
+CHECKPOINT_INTERVAL = 10
+STATE_KEYS = frozenset(("scan_id", "scan_type", "targets", "ports", "seed", "cursor", "completed", "finished", "database",
+                        "database_scan_id", "grab_banners", "created_at", "shards", "probes_done"))
+
+class ScanCheckpoint:
+    """
+    Persisted state of a scan: planner parameters, probe cursor and the open ports found so far.
+    """
+
+    def __init__(self, scan_id, scan_type, targets, ports, seed, directory=DEFAULT_CHECKPOINT_DIR,
+                 cursor=0, completed=(), finished=False, database=None, database_scan_id=None, grab_banners=False, created_at=None, shards=1,
+                 probes_done=0):
+        """
+        Args:
+            scan_id (str): Identifier of the scan, used to resume it.
+            scan_type (str): The scanner type (e.g. "tcp", "syn").
+            targets (str): The target specification given to the planner.
+            ports (str): The port specification given to the planner.
+            seed (int): The planner's permutation seed.
+            directory (str): Directory holding checkpoint files.
+            cursor (int): Walk position below which every probe has finished.
+            completed (iterable): Finished walk positions at or above the cursor.
+            finished (bool): Whether the scan ran to completion.
+            database (str): Results database the scan writes to, if any.
+            database_scan_id (int): The scan's id in that database.
+            grab_banners (bool): Whether banners are grabbed from open ports while scanning.
+            created_at (float): UNIX time the scan was created.
+            shards (int): Worker processes the scan runs in (0 for one per CPU core, see modules/sharded_scanner.py).
+            probes_done (int): Number of probes finished so far.
+        """
+        self.scan_id = scan_id
+        self.scan_type = scan_type
+        self.targets = targets
+        self.ports = ports
+        self.seed = seed
+        self.directory = directory
+        self.cursor = cursor
+        self.completed = set(completed)
+        self.finished = finished
+        self.database = database
+        self.database_scan_id = database_scan_id
+        self.grab_banners = grab_banners
+        self.created_at = created_at or time.time()
+        self.shards = shards
+        self.probes_done = probes_done
+        self.store = PortStateStore(scan_type)
+
+    @classmethod
+    def create(cls, scan_type, targets, ports, directory=DEFAULT_CHECKPOINT_DIR, seed=None):
+        """Create a checkpoint for a new scan.
+
+        Args:
+            scan_type (str): The scanner type (e.g. "tcp", "syn").
+            targets (str): The target specification.
+            ports (str): The port specification.
+            directory (str): Directory holding checkpoint files.
+            seed (int): The planner's permutation seed. Random if not given.
+
+        Returns:
+            ScanCheckpoint: The new checkpoint (not yet saved).
+        """
+        scan_id = time.strftime("%Y%m%d-%H%M%S-") + secrets.token_hex(2)
+        seed = seed if seed is not None else secrets.randbits(64)
+        return cls(scan_id, scan_type.lower(), targets, ports, seed, directory)
+
+    @classmethod
+    def load(cls, scan_id, directory=DEFAULT_CHECKPOINT_DIR):
+        """Load a saved checkpoint.
+
+        Args:
+            scan_id (str): Identifier of the scan.
+            directory (str): Directory holding checkpoint files.
+
+        Returns:
+            ScanCheckpoint: The loaded checkpoint.
+
+        Raises:
+            FileNotFoundError: If no checkpoint exists for the scan id.
+            ValueError: If the file is not a valid checkpoint.
+        """
+        path = os.path.join(directory, f"{scan_id}.json")
+        with open(path) as state_file:
+            state = json.load(state_file)
+        if not isinstance(state, dict):
+            raise ValueError(f"'{path}' is not a scan checkpoint.")
+        missing, unknown = STATE_KEYS - set(state), set(state) - STATE_KEYS
+        if missing or unknown:
+            problems = [f"{label} {', '.join(sorted(keys))}" for label, keys in (("missing", missing), ("unknown", unknown)) if keys]
+            raise ValueError(f"'{path}' is not a valid checkpoint: {'; '.join(problems)}.")
+
+        try:
+            bitmap = base64.b64decode(state.pop("completed"))
+            cursor = state["cursor"]
+            completed = [cursor + bit for bit in range(len(bitmap) * 8) if bitmap[bit >> 3] >> (bit & 7) & 1]
+        except TypeError as e:
+            raise ValueError(f"'{path}' is not a valid checkpoint: {e}")
+        checkpoint = cls(directory=directory, completed=completed, **state)
+
+        store_path = checkpoint.store_path
+        if os.path.exists(store_path):
+            checkpoint.store = PortStateStore(checkpoint.scan_type).union(PortStateStore.load(store_path))
+        return checkpoint
+
+    @staticmethod
+    def saved_ids(directory=DEFAULT_CHECKPOINT_DIR):
+        """Return the ids of every saved checkpoint, newest first."""
+        if not os.path.isdir(directory):
+            return []
+        return sorted((name[:-5] for name in os.listdir(directory) if name.endswith(".json")), reverse=True)
+
+    @property
+    def state_path(self):
+        return os.path.join(self.directory, f"{self.scan_id}.json")
+
+    @property
+    def store_path(self):
+        return os.path.join(self.directory, f"{self.scan_id}.psm")
+
+    def planner(self):
+        """Rebuild the scan planner; the seed makes the probe order identical to the original run."""
+        from modules.scan_planner import ScanPlanner
+        return ScanPlanner(self.targets, self.ports, seed=self.seed)
+
+    def remaining(self, planner):
+        """Return the number of probes of the scan that have not finished yet.
+
+        Args:
+            planner (ScanPlanner): The planner rebuilt from the checkpoint.
+        """
+        return len(planner) - self.probes_done
+
+    def save(self):
+        """Write the checkpoint atomically (write to a temporary file, then rename)."""
+        os.makedirs(self.directory, exist_ok=True)
+        span = max(self.completed) - self.cursor + 1 if self.completed else 0
+        bitmap = bytearray((span + 7) // 8)
+        for position in self.completed:
+            offset = position - self.cursor
+            bitmap[offset >> 3] |= 1 << (offset & 7)
+
+        state = {
+            "scan_id": self.scan_id,
+            "scan_type": self.scan_type,
+            "targets": self.targets,
+            "ports": self.ports,
+            "seed": self.seed,
+            "cursor": self.cursor,
+            "completed": base64.b64encode(bytes(bitmap)).decode(),
+            "finished": self.finished,
+            "database": self.database,
+            "database_scan_id": self.database_scan_id,
+            "grab_banners": self.grab_banners,
+            "created_at": self.created_at,
+            "shards": self.shards,
+            "probes_done": self.probes_done,
+        }
+
+        self.store.save(self.store_path + ".tmp")
+        os.replace(self.store_path + ".tmp", self.store_path)
+        with open(self.state_path + ".tmp", "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(self.state_path + ".tmp", self.state_path)
+
+class ProbeCursor:
+    """
+    Walks a planner from a checkpoint cursor, skipping finished probes, and tracks the low-water mark.
+
+    'probes' runs on the scan engine's side and 'complete' on the consumer's side; each only
+    performs single deque/dict/set operations, which are atomic under the GIL.
+    """
+
+    def __init__(self, planner, checkpoint):
+        """
+        Args:
+            planner (ScanPlanner): The planner rebuilt from the checkpoint.
+            checkpoint (ScanCheckpoint): Source of the starting cursor and finished positions.
+        """
+        self.planner = planner
+        self.start = checkpoint.cursor
+        self.skip = set(checkpoint.completed)
+        self.issued = deque()
+        self.positions = {}
+        self.done = set()
+        self.next_position = checkpoint.cursor
+        self.finished = 0
+
+    def probes(self):
+        """Yield the (host, port) probes that have not finished yet."""
+        for position, host, port in self.planner.iter_indexed(self.start):
+            self.next_position = position + 1
+            if position in self.skip:
+                self.skip.discard(position)
+                continue
+            self.positions[(host, port)] = position
+            self.issued.append(position)
+            yield host, port
+        self.next_position = len(self.planner.permutation)
+
+    def complete(self, result):
+        """Mark the probe of a ScanResult as finished and advance the low-water mark."""
+        position = self.positions.pop((result.host, result.port), None)
+        if position is None:
+            return
+        self.done.add(position)
+        self.finished += 1
+        while self.issued and self.issued[0] in self.done:
+            self.done.discard(self.issued.popleft())
+
+    def cursor(self):
+        """Return (low-water mark, finished positions at or above it)."""
+        cursor = self.issued[0] if self.issued else self.next_position
+        completed = self.done | self.skip.copy()
+        return cursor, {position for position in completed if position >= cursor}
+
+def resumable_scan(scanner, checkpoint, interval=CHECKPOINT_INTERVAL, planner=None):
+    """Run a scan from a checkpoint, yielding its results and saving the checkpoint as it goes.
+
+    The checkpoint is saved every `interval` seconds and whenever the scan stops, including when
+    the consumer stops early or is interrupted with Ctrl-C.
+
+    Args:
+        scanner (PortScannerBase): The scanner to run.
+        checkpoint (ScanCheckpoint): The scan to start or resume.
+        interval (float): Seconds between periodic checkpoints.
+        planner (ScanPlanner): The planner rebuilt from the checkpoint, if the caller already has it.
+
+    Yields:
+        ScanResult: Results of the probes that had not finished before.
+    """
+    planner = planner if planner is not None else checkpoint.planner()
+    done_before = checkpoint.probes_done
+    cursor = ProbeCursor(planner, checkpoint)
+    results = scanner.scan_iter(cursor.probes())
+    next_save = time.monotonic() + interval
+    try:
+        for result in results:
+            if result.status == "open":
+                checkpoint.store.record(result)
+            cursor.complete(result)
+            yield result
+            if time.monotonic() >= next_save:
+                checkpoint.cursor, checkpoint.completed = cursor.cursor()
+                checkpoint.probes_done = done_before + cursor.finished
+                checkpoint.save()
+                next_save = time.monotonic() + interval
+        checkpoint.finished = True
+    finally:
+        results.close()
+        checkpoint.cursor, checkpoint.completed = cursor.cursor()
+        checkpoint.probes_done = done_before + cursor.finished
+        checkpoint.save()
@@ -0,0 +1,241 @@
+"""
+Congestion Control
+
+This module tracks round-trip times and in-flight windows per target so scanners can derive probe timeouts from measured RTT instead of hard-coded values, and back off on paths that drop packets.
+
+Classes:
+- RTTEstimator: Smoothed RTT and RTT variance estimator (RFC 6298) producing a retransmission timeout.
+- CongestionWindow: AIMD in-flight window with slow start, as in TCP congestion control.
+- PathState: RTT estimator and congestion window for a single target.
+- PathTracker: Bounded per-target PathState table with a shared fallback estimate.
+- InFlightGate: Asyncio gate holding probes back while their target's window is full.
+
+Usage:
+1. Create a 'PathTracker' and look up the 'PathState' of a target with 'get'.
+2. Use 'PathState.timeout()' as the probe timeout and report replies and timeouts back to it.
+3. In asyncio engines, wrap each probe in 'InFlightGate.acquire' / 'InFlightGate.release'.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+
+class RTTEstimator:
+    """
+    Smoothed RTT and RTT variance estimator following RFC 6298.
+    """
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+
+    def __init__(self, initial_rto=1.0, min_rto=0.1, max_rto=10.0):
+        """
+        Args:
+            initial_rto (float): Timeout in seconds used before the first sample.
+            min_rto (float): Lower bound of the timeout in seconds.
+            max_rto (float): Upper bound of the timeout in seconds.
+        """
+        self.srtt = None
+        self.rttvar = None
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.rto = initial_rto
+
+    def update(self, sample):
+        """Fold a round-trip time sample into the estimate.
+
+        Args:
+            sample (float): Measured round-trip time in seconds. Samples from retransmitted probes must not be used (Karn's algorithm).
+        """
+        if self.srtt is None:
+            self.srtt = sample
+            self.rttvar = sample / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - sample)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * sample
+        self.rto = min(self.max_rto, max(self.min_rto, self.srtt + self.K * self.rttvar))
+
+    @property
+    def has_samples(self):
+        """Whether at least one sample has been measured."""
+        return self.srtt is not None
+
+class CongestionWindow:
+    """
+    AIMD in-flight window: slow start up to ssthresh, then additive increase; halved on loss.
+    """
+
+    def __init__(self, initial=10, minimum=1, maximum=1000):
+        """
+        Args:
+            initial (int): Initial window in probes.
+            minimum (int): Smallest window the loss response may shrink to.
+            maximum (int): Largest window, normally the engine's concurrency.
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cwnd = float(min(max(initial, minimum), maximum))
+        self.ssthresh = float(maximum)
+        self.inflight = 0
+
+    def can_send(self):
+        """Whether another probe fits in the window."""
+        return self.inflight < int(self.cwnd)
+
+    def on_success(self):
+        """Grow the window after a probe resolved without loss."""
+        if self.cwnd < self.ssthresh:
+            self.cwnd += 1
+        else:
+            self.cwnd += 1 / self.cwnd
+        self.cwnd = min(self.cwnd, self.maximum)
+
+    def on_loss(self):
+        """Halve the window after a probe was lost and had to be retransmitted."""
+        self.ssthresh = max(self.cwnd / 2, self.minimum)
+        self.cwnd = self.ssthresh
+
+class PathState:
+    """
+    RTT estimator and congestion window for a single target.
+    """
+
+    def __init__(self, tracker):
+        """
+        Args:
+            tracker (PathTracker): The tracker owning this path, used for defaults and the shared estimate.
+        """
+        self.tracker = tracker
+        self.rtt = RTTEstimator(tracker.initial_rto, tracker.min_rto, tracker.max_rto)
+        self.window = CongestionWindow(tracker.initial_window, maximum=tracker.max_window)
+
+    def timeout(self):
+        """Return the probe timeout for this target, falling back to the shared estimate before the first sample."""
+        if self.rtt.has_samples:
+            return self.rtt.rto
+        return self.tracker.shared.rto
+
+    def on_reply(self, sample, retransmitted=False):
+        """Record a probe that got a reply.
+
+        Args:
+            sample (float): Seconds between sending the probe and its reply.
+            retransmitted (bool): Whether the reply answered a retransmission, i.e. an earlier attempt was lost.
+        """
+        if retransmitted:
+            self.window.on_loss()
+            return
+        self.rtt.update(sample)
+        self.tracker.shared.update(sample)
+        self.window.on_success()
+
+    def on_timeout(self):
+        """Record a probe that got no reply after all retransmissions.
+
+        A silent port is usually filtered rather than congested, so the window is left unchanged:
+        it neither shrinks nor grows, since only answered probes prove the path has room.
+        """
+
+class PathTracker:
+    """
+    Bounded table of per-target path state.
+
+    Targets without samples use a shared estimate fed by every target, which approximates the
+    local network path until a target-specific estimate exists.
+    """
+
+    def __init__(self, initial_rto=1.0, min_rto=0.1, max_rto=10.0, initial_window=10, max_window=1000, max_paths=65536):
+        """
+        Args:
+            initial_rto (float): Timeout in seconds before any sample is measured.
+            min_rto (float): Lower bound of derived timeouts in seconds.
+            max_rto (float): Upper bound of derived timeouts in seconds.
+            initial_window (int): Initial in-flight window per target.
+            max_window (int): Largest in-flight window per target.
+            max_paths (int): Number of targets kept before the least recently used is evicted.
+        """
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.initial_window = initial_window
+        self.max_window = max_window
+        self.max_paths = max_paths
+        self.shared = RTTEstimator(initial_rto, min_rto, max_rto)
+        self.paths = OrderedDict()
+
+    def get(self, target_ip):
+        """Return the PathState of a target, creating it on first use.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+
+        Returns:
+            PathState: The state of the path to the target.
+        """
+        path = self.paths.get(target_ip)
+        if path is None:
+            path = self.paths[target_ip] = PathState(self)
+            if len(self.paths) > self.max_paths:
+                for stale_ip, stale_path in self.paths.items():
+                    if not stale_path.window.inflight:
+                        del self.paths[stale_ip]
+                        break
+        else:
+            self.paths.move_to_end(target_ip)
+        return path
+
+class InFlightGate:
+    """
+    Asyncio gate that holds probes back while their target's congestion window is full.
+
+    Waiting probes are queued per target and woken in FIFO order as earlier probes complete.
+    The gate must be created and used inside a single running event loop.
+    """
+
+    def __init__(self, tracker):
+        """
+        Args:
+            tracker (PathTracker): The tracker whose windows are enforced.
+        """
+        self.tracker = tracker
+        self.waiters = {}
+
+    async def acquire(self, target_ip):
+        """Wait until the target's window has room, then account for one more probe in flight.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+
+        Returns:
+            PathState: The path state of the target.
+        """
+        path = self.tracker.get(target_ip)
+        if path.window.can_send() and target_ip not in self.waiters:
+            path.window.inflight += 1
+            return path
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(target_ip, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                self.release(target_ip)
+            raise
+        return path
+
+    def release(self, target_ip):
+        """Account for a finished probe and hand freed window slots to waiting probes.
+
+        Args:
+            target_ip (str): The IP address of the target host.
+        """
+        path = self.tracker.get(target_ip)
+        path.window.inflight -= 1
+        queue = self.waiters.get(target_ip)
+        while queue and path.window.can_send():
+            waiter = queue.popleft()
+            if not waiter.done():
+                path.window.inflight += 1
+                waiter.set_result(None)
+        if queue is not None and not queue:
+            del self.waiters[target_ip]
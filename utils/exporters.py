@@ -0,0 +1,305 @@
+"""
+Result Exporters
+
+This module writes scan and banner results to files as they stream out of a scan. Every record is formatted and written on arrival through a large write buffer (and a gzip or zstd compressor, if asked for), so exporting tens of millions of port records takes constant memory: nothing is grouped, sorted or counted per host.
+
+Formats:
+- jsonl: One JSON object per line. Scan results have host, port, proto, status and rtt; banner records have host, port, proto, banner, service, product and version.
+- csv: One row per record with the columns host, port, proto, status, rtt, banner, service, product, version.
+- xml: nmap-compatible XML ('-oX'). Like masscan's XML output, every port is its own <host> element, because results arrive in shuffled order; banners are <service> and <script id="banner"> elements. Tools that ingest nmap XML read it as is.
+- grepable: nmap grepable output ('-oG'), one "Host: ... Ports: ..." line per port.
+
+By default jsonl and csv export every status, xml and grepable only open ports (like nmap's port lists).
+
+Classes:
+- ResultExporter: Base class of the exporters.
+- JSONLExporter, CSVExporter, NmapXMLExporter, GrepableExporter: The formats.
+
+Functions:
+- open_output: Open a buffered, optionally compressed text file for writing.
+- create_exporter: Create the exporter for a file, picking the format and compression from its name.
+
+Usage:
+1. 'with create_exporter("scan.xml.gz", scan_type="tcp", ports="1-1024") as exporter:'
+2. 'for result in exporter.tee(scanner.scan_iter(probes)): ...', or 'exporter.write(result)' per record.
+
+zstd compression requires the zstandard package (pip install zstandard).
+"""
+
+import io
+import csv
+import gzip
+import json
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+BUFFER_SIZE = 1 << 20
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+NMAP_SCAN_TYPES = {"tcp": "connect", "syn": "syn", "udp": "udp", "sctp": "sctpinit", "icmp": "ping"}
+NMAP_REASONS = {("tcp", "open"): "syn-ack", ("tcp", "closed"): "reset", ("udp", "open"): "udp-response",
+                ("udp", "closed"): "port-unreach", ("sctp", "open"): "init-ack", ("sctp", "closed"): "abort",
+                ("icmp", "open"): "echo-reply"}
+
+def open_output(path, compression=None, mode="w"):
+    """Open a text file for buffered writing.
+
+    Args:
+        path (str): The file to write.
+        compression (str): "gzip", "zstd" or None. Picked from the file name (.gz, .zst) if not given.
+        mode (str): "w" to replace the file, "a" to append to it (compressed files gain another frame).
+
+    Returns:
+        io.TextIOWrapper: The open file; closing it flushes and closes the compressor and the file.
+
+    Raises:
+        ValueError: If the compression or mode is unknown, or zstandard is not installed.
+        OSError: If the file cannot be opened.
+    """
+    if compression is None:
+        compression = next((name for suffix, name in COMPRESSIONS.items() if path.endswith(suffix)), None)
+    if mode not in ("w", "a"):
+        raise ValueError(f"Unknown mode '{mode}' (expected 'w' or 'a').")
+    if compression is None:
+        raw = open(path, mode + "b", buffering=BUFFER_SIZE)
+    elif compression == "gzip":
+        raw = io.BufferedWriter(gzip.open(path, mode + "b", compresslevel=6), BUFFER_SIZE)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd output requires the zstandard package (pip install zstandard).")
+        raw = io.BufferedWriter(zstandard.open(path, mode + "b"), BUFFER_SIZE)
+    else:
+        raise ValueError(f"Unknown compression '{compression}' (available: gzip, zstd).")
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+def _printable(text):
+    """Escape the control characters of a banner (XML 1.0 cannot hold most of them)."""
+    return "".join(char if char >= " " or char in "\t\n\r" else f"\\x{ord(char):02x}" for char in text)
+
+class ResultExporter:
+    """
+    Base class of the exporters: writes ScanResult and BannerResult records to a file as they arrive.
+    """
+    format = None
+    extensions = ()
+    statuses = None
+
+    def __init__(self, path, compression=None, statuses=None, scan_type="tcp", ports=None, args=""):
+        """
+        Args:
+            path (str): The file to write.
+            compression (str): "gzip", "zstd" or None. Picked from the file name (.gz, .zst) if not given.
+            statuses (set): Only export scan results with these statuses. The format's default if not given.
+            scan_type (str): The scan type, recorded in the file header where the format has one.
+            ports (str): The port specification, recorded in the file header where the format has one.
+            args (str): The command line or description of the scan, recorded in the file header.
+
+        Raises:
+            ValueError: If the compression is unknown or unavailable.
+            OSError: If the file cannot be opened.
+        """
+        self.path = path
+        self.statuses = set(statuses) if statuses is not None else self.statuses
+        self.scan_type = scan_type.lower()
+        self.ports = ports
+        self.args = args
+        self.records = 0
+        self.started = time.time()
+        self.stream = open_output(path, compression)
+        self.write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record):
+        """Write one ScanResult or BannerResult. Results with other statuses and empty banners are skipped."""
+        if hasattr(record, "banner"):
+            if record.banner is None:
+                return
+            self.write_banner(record)
+        elif self.statuses is not None and record.status not in self.statuses:
+            return
+        else:
+            self.write_result(record)
+        self.records += 1
+
+    def tee(self, records):
+        """Write a record stream while passing every record through.
+
+        Args:
+            records (iterable): ScanResult and BannerResult records, e.g. from a scanner's scan_iter.
+
+        Yields:
+            The input records, unchanged.
+        """
+        for record in records:
+            self.write(record)
+            yield record
+
+    def close(self):
+        """Write the format's trailer and close the file."""
+        if self.stream is None:
+            return
+        try:
+            self.write_footer()
+        finally:
+            self.stream.close()
+            self.stream = None
+
+    def write_header(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    def write_result(self, result):
+        raise NotImplementedError
+
+    def write_banner(self, banner):
+        raise NotImplementedError
+
+class JSONLExporter(ResultExporter):
+    """
+    Writes one JSON object per record.
+    """
+    format = "jsonl"
+    extensions = (".jsonl", ".json", ".ndjson")
+
+    def write_result(self, result):
+        # Addresses, protocols and statuses never need JSON escaping; formatting them directly is several times faster than json.dumps.
+        rtt = "null" if result.rtt is None else repr(result.rtt)
+        self.stream.write(f'{{"host":"{result.host}","port":{result.port},"proto":"{result.proto}","status":"{result.status}","rtt":{rtt}}}\n')
+
+    def write_banner(self, banner):
+        service, product, version = banner.service or (None, None, None)
+        self.stream.write(json.dumps({"host": banner.host, "port": banner.port, "proto": banner.proto, "banner": banner.banner,
+                                      "service": service, "product": product, "version": version}, separators=(",", ":")) + "\n")
+
+class CSVExporter(ResultExporter):
+    """
+    Writes one CSV row per record; banner rows have the status "open" and no RTT.
+    """
+    format = "csv"
+    extensions = (".csv",)
+    columns = ("host", "port", "proto", "status", "rtt", "banner", "service", "product", "version")
+
+    def write_header(self):
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(self.columns)
+
+    def write_result(self, result):
+        self.writer.writerow((result.host, result.port, result.proto, result.status, "" if result.rtt is None else f"{result.rtt:.6f}",
+                              "", "", "", ""))
+
+    def write_banner(self, banner):
+        self.writer.writerow((banner.host, banner.port, banner.proto, "open", "", banner.banner, *(banner.service or ("", "", ""))))
+
+class NmapXMLExporter(ResultExporter):
+    """
+    Writes nmap-compatible XML with one <host> element per port.
+    """
+    format = "xml"
+    extensions = (".xml",)
+    statuses = {"open", "open|filtered"}
+
+    def write_header(self):
+        start = int(self.started)
+        scan_type = NMAP_SCAN_TYPES.get(self.scan_type, self.scan_type)
+        protocol = {"udp": "udp", "sctp": "sctp", "icmp": "ip"}.get(self.scan_type, "tcp")
+        services = f" services={quoteattr(self.ports)}" if self.ports else ""
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE nmaprun>\n'
+                          f'<nmaprun scanner="eater" args={quoteattr(self.args)} start="{start}" startstr={quoteattr(time.ctime(start))} xmloutputversion="1.05">\n'
+                          f'<scaninfo type="{scan_type}" protocol="{protocol}"{services}/>\n'
+                          '<verbose level="0"/>\n<debugging level="0"/>\n')
+
+    def _host(self, host, proto, ports):
+        return (f'<host endtime="{int(time.time())}"><status state="up" reason="{NMAP_REASONS.get((proto, "open"), "user-set")}" reason_ttl="0"/>'
+                f'<address addr="{escape(host)}" addrtype="{"ipv6" if ":" in host else "ipv4"}"/>{ports}</host>\n')
+
+    def write_result(self, result):
+        if result.proto == "icmp":
+            if result.status == "open":
+                self.stream.write(self._host(result.host, "icmp", ""))
+            return
+        reason = NMAP_REASONS.get((result.proto, result.status), "no-response")
+        self.stream.write(self._host(result.host, result.proto, f'<ports><port protocol="{result.proto}" portid="{result.port}">'
+                                     f'<state state="{result.status}" reason="{reason}" reason_ttl="0"/></port></ports>'))
+
+    def write_banner(self, banner):
+        service = ""
+        if banner.service is not None:
+            name, product, version = banner.service
+            service = f'<service name={quoteattr(name or "unknown")}'
+            service += f" product={quoteattr(product)}" if product else ""
+            service += f" version={quoteattr(version)}" if version else ""
+            service += ' method="probed" conf="10"/>'
+        self.stream.write(self._host(banner.host, banner.proto, f'<ports><port protocol="{banner.proto}" portid="{banner.port}">'
+                                     f'<state state="open" reason="{NMAP_REASONS.get((banner.proto, "open"), "response")}" reason_ttl="0"/>'
+                                     f'{service}<script id="banner" output={quoteattr(_printable(banner.banner))}/></port></ports>'))
+
+    def write_footer(self):
+        now = time.time()
+        self.stream.write(f'<runstats><finished time="{int(now)}" timestr={quoteattr(time.ctime(now))} elapsed="{now - self.started:.2f}" '
+                          f'summary="{self.records} results in {now - self.started:.2f} seconds" exit="success"/>'
+                          f'<hosts up="{self.records}" down="0" total="{self.records}"/></runstats>\n</nmaprun>\n')
+
+class GrepableExporter(ResultExporter):
+    """
+    Writes nmap grepable output, one "Host:" line per port.
+    """
+    format = "grepable"
+    extensions = (".gnmap", ".grep")
+    statuses = {"open", "open|filtered"}
+
+    def write_header(self):
+        self.stream.write(f"# Eater scan initiated {time.ctime(self.started)} as: {self.args}\n")
+
+    def write_result(self, result):
+        if result.proto == "icmp":
+            self.stream.write(f"Host: {result.host} ()\tStatus: {'Up' if result.status == 'open' else 'Down'}\n")
+        else:
+            self.stream.write(f"Host: {result.host} ()\tPorts: {result.port}/{result.status}/{result.proto}/////\n")
+
+    def write_banner(self, banner):
+        name, product, version = banner.service or ("", "", "")
+        info = " ".join(part for part in (product, version) if part) or (banner.banner.strip().splitlines() or [""])[0]
+        info = _printable(info).replace("/", "|").replace(",", " ").replace("\t", " ")
+        self.stream.write(f"Host: {banner.host} ()\tPorts: {banner.port}/open/{banner.proto}//{name or ''}//{info}/\n")
+
+    def write_footer(self):
+        now = time.time()
+        self.stream.write(f"# Eater done at {time.ctime(now)} -- {self.records} results in {now - self.started:.2f} seconds\n")
+
+EXPORTERS = {exporter.format: exporter for exporter in (JSONLExporter, CSVExporter, NmapXMLExporter, GrepableExporter)}
+
+def create_exporter(path, format=None, compression=None, **options):
+    """Create the exporter of a file.
+
+    Args:
+        path (str): The file to write (e.g. "scan.jsonl", "scan.xml.gz", "scan.csv.zst").
+        format (str): "jsonl", "csv", "xml" or "grepable". Picked from the file name if not given.
+        compression (str): "gzip", "zstd" or None. Picked from the file name (.gz, .zst) if not given.
+        **options: Passed to the exporter (statuses, scan_type, ports, args).
+
+    Returns:
+        ResultExporter: The open exporter.
+
+    Raises:
+        ValueError: If the format cannot be determined or is unknown, or the compression is unavailable.
+        OSError: If the file cannot be opened.
+    """
+    if format is None:
+        name = path.lower()
+        for suffix in COMPRESSIONS:
+            name = name[:-len(suffix)] if name.endswith(suffix) else name
+        format = next((exporter.format for exporter in EXPORTERS.values() if name.endswith(exporter.extensions)), None)
+        if format is None:
+            raise ValueError(f"Cannot tell the export format of '{path}'; name it .jsonl, .csv, .xml or .gnmap, or give a format.")
+    exporter = EXPORTERS.get(format.lower())
+    if exporter is None:
+        raise ValueError(f"Unknown export format '{format}' (available: {', '.join(EXPORTERS)}).")
+    return exporter(path, compression, **options)
@@ -1,8 +1,15 @@
+import os
 import logging
 
+_loggers = {}
+
 class CustomLogger:
     def __init__(self, log_file, log_level=1):
-        self.logger = logging.getLogger(__name__)
+        # One logger per log file, all named after this module; instantiating CustomLogger again must not add its handlers twice.
+        path = os.path.abspath(log_file)
+        self.logger = _loggers.get(path)
+        if self.logger is None:
+            self.logger = _loggers[path] = logging.Logger(__name__)
         
         if log_level == 0:
             self.logger.setLevel(logging.DEBUG)
@@ -13,9 +20,12 @@ class CustomLogger:
         elif log_level == 3:
             self.logger.setLevel(logging.CRITICAL)
 
+        if self.logger.handlers:
+            return
+
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-        file_handler = logging.FileHandler(log_file)
+        file_handler = logging.FileHandler(log_file, delay=True)
         file_handler.setFormatter(formatter)
         self.logger.addHandler(file_handler)
 
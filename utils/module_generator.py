@@ -21,18 +21,69 @@ Modules available:
 - 'wireless_eater': Wireless network password cracking module.
 
 The 'ModuleFactory' creates instances of these modules based on the module_type provided. 
+
+Module implementations (scanners, grabbers, payload servers, pathos, requests) are not imported with this file. Each module lists its implementation in 'implementation', which the factory imports when the module is selected ('use <module>'), so the CLI starts without loading them.
 """
 
+import importlib
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from termcolor import colored
-from modules.port_scanner import PortScannerFactory
-from modules.banner_grabber import BannerGrabberFactory
-from modules.wireless_eater import WirelessEaterFactory
-from modules.payloads import PayloadFactory
+from utils.plugin_registry import PluginRegistry
+
+BANNER_TYPES = {"syn": "tcp"}
+
+def open_exporter(path, scan_type, ports, args, prefix=""):
+    """
+    Opens a result exporter for a file (see utils/exporters.py), printing an error if it cannot be opened.
+
+    Args:
+        path (str): The export file; nothing is exported if empty.
+        scan_type (str): The scan type, recorded in the file header.
+        ports (str): The port specification, recorded in the file header.
+        args (str): A description of the scan, recorded in the file header.
+        prefix (str): Text printed before the error message (e.g. a job name).
+
+    Returns:
+        ResultExporter: The open exporter, or None if there is no path or the file cannot be opened.
+    """
+    if not path:
+        return None
+    from utils.exporters import create_exporter
+    try:
+        return create_exporter(path, scan_type=scan_type, ports=ports, args=args)
+    except (OSError, ValueError) as e:
+        print(f"{prefix}Error: {e}")
+        return None
+
+@contextmanager
+def progress_reporter(reporter=None, **labels):
+    """
+    Reports the progress of a scan, starting (and stopping) a ProgressReporter configured in config/eater.ini unless one is given.
+
+    Args:
+        reporter (ProgressReporter): A running progress reporter shared with other scans, used as is.
+        **labels: Labels added to the metrics of a new reporter (e.g. scan=scan_id).
+
+    Yields:
+        ProgressReporter: The reporter whose telemetry the scan updates.
+    """
+    if reporter is not None:
+        yield reporter
+        return
+    from utils.telemetry import ScanTelemetry, ProgressReporter, load_telemetry_settings
+    reporter = ProgressReporter(ScanTelemetry(labels=labels), **load_telemetry_settings())
+    reporter.start()
+    try:
+        yield reporter
+    finally:
+        reporter.stop()
+
 class ModuleBase(ABC):
     """
     Abstract base class for modules.
     """
+    implementation = ()
 
     @abstractmethod
     def run(self):
@@ -45,6 +96,8 @@ class ProtosearchModule(ModuleBase):
     """
     Port scanning module.
     """
+    implementation = ("modules.port_scanner", "modules.scan_planner", "modules.recon_pipeline", "modules.banner_grabber",
+                      "database.results_store", "utils.checkpoint")
     
     def run(self):
         """
@@ -53,18 +106,307 @@ class ProtosearchModule(ModuleBase):
         This method prompts the user for target information and initiates a port scan.
         """
         print("You've selected the 'protosearch' module.")
-        target = input("Enter the target (hostname or IP address): ")
+        target = input("Enter the targets (hostname, IP, CIDR, range or @file): ")
         port_range = input("Enter the port range (e.g., 80-100): ").strip()
-        scan_type = input("Enter the scan type (TCP/UDP/ICMP/SCTP, default is TCP): ").strip().upper() or "TCP"
+        scan_type = input("Enter the scan type (TCP/SYN/UDP/ICMP/SCTP, default is TCP): ").strip().upper() or "TCP"
+        discover = input("Only scan hosts that answer ping? (y/N): ").strip().lower() in ("y", "yes")
+        grab_banners = input("Grab banners from open ports while scanning? (y/N): ").strip().lower() in ("y", "yes")
+        database_path = input("Save results to database (path, leave empty to skip): ").strip()
+        export_path = input("Export results to file (.jsonl/.csv/.xml/.gnmap, optionally .gz/.zst; leave empty to skip): ").strip()
+
+        if discover:
+            target = self.discover(target)
+            if target is None:
+                return
 
-        port_scanner = PortScannerFactory.generate_port_scanner(scan_type)
-        port_scanner.scan_target(target, port_range)
+        from utils.checkpoint import ScanCheckpoint
+        checkpoint = ScanCheckpoint.create(scan_type, target, port_range)
+        checkpoint.database = database_path or None
+        checkpoint.grab_banners = grab_banners
         print(f"Performing port scanning on target: {target} with port range: {port_range} using {scan_type}...")
+        print(f"Scan id: {checkpoint.scan_id}")
+        exporter = open_exporter(export_path, scan_type, port_range, f"protosearch {target} {port_range}")
+        if export_path and exporter is None:
+            return
+        try:
+            self.execute(checkpoint, exporters=[exporter] if exporter else None)
+        finally:
+            if exporter is not None:
+                exporter.close()
+
+    def discover(self, target, prefix=""):
+        """
+        Narrows a target specification down to the hosts that answer ping.
+
+        Args:
+            target (str): The target specification.
+            prefix (str): Text printed before every output line (e.g. a job name).
+
+        Returns:
+            str: A target specification of the live hosts, or None if there are none or discovery failed.
+        """
+        from modules.port_scanner import PortScannerFactory
+        from modules.scan_planner import discover_live_hosts
+        try:
+            live_hosts = discover_live_hosts(target, PortScannerFactory.generate_port_scanner("icmp"))
+        except (ValueError, OSError) as e:
+            print(f"{prefix}Error: {e}")
+            return None
+        if not live_hosts:
+            print(f"{prefix}No live hosts found.")
+            return None
+        print(f"{prefix}Live hosts: {', '.join(live_hosts)}")
+        return ",".join(live_hosts)
+
+    def resume(self, scan_id):
+        """
+        Resumes an interrupted scan from its checkpoint.
+
+        Args:
+            scan_id (str): The id printed when the scan was started.
+
+        Returns:
+            dict: The number of results per status of the resumed run (empty if the scan had already finished),
+                or None if the checkpoint could not be loaded or the scan failed or was interrupted.
+        """
+        from utils.checkpoint import ScanCheckpoint
+        try:
+            checkpoint = ScanCheckpoint.load(scan_id)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not load scan '{scan_id}': {e}")
+            return None
+        if checkpoint.finished:
+            print(f"Scan '{scan_id}' already finished.")
+            return {}
+
+        print(f"Resuming scan {scan_id} on target: {checkpoint.targets} with port range: {checkpoint.ports} using {checkpoint.scan_type.upper()}...")
+        for host in checkpoint.store.hosts():
+            for port in checkpoint.store.host_map(host).ports("open"):
+                print(colored(f"{host}:{port}/{checkpoint.store.proto} open (previous run)", "green"))
+        return self.execute(checkpoint)
+
+    def execute(self, checkpoint, prefix="", stopped=None, results_store=None, reporter=None, exporters=None):
+        """
+        Runs a checkpointed scan, printing open ports as they are found.
+
+        With banner grabbing enabled, open ports are fed to banner grabbers through a bounded
+        queue while the scan is still running.
+
+        Args:
+            checkpoint (ScanCheckpoint): The scan to start or continue.
+            prefix (str): Text printed before every output line (e.g. a job name).
+            stopped (threading.Event): Interrupts the scan, like Ctrl-C, once set.
+            results_store (ResultsStore): An open store shared with other scans. By default the
+                scan opens (and closes) its own store on checkpoint.database.
+            reporter (ProgressReporter): A running progress reporter shared with other scans. By
+                default the scan reports its own progress as configured in config/eater.ini.
+            exporters (list): Open ResultExporters the results and banners are written to as they arrive.
+
+        Returns:
+            dict: The number of results per status, or None if the scan failed or was interrupted.
+        """
+        import sqlite3
+        from database.results_store import ResultsStore
+        from modules.port_scanner import PortScannerFactory
+        from modules.banner_grabber import BannerResult, describe_service
+        from utils.checkpoint import resumable_scan
+
+        own_store = results_store is None and checkpoint.database is not None
+        records = None
+        counts = {"open": 0, "closed": 0, "filtered": 0, "open|filtered": 0}
+        try:
+            with progress_reporter(reporter, scan=checkpoint.scan_id) as reporter:
+                telemetry = reporter.telemetry
+                planner = checkpoint.planner()
+                telemetry.total += checkpoint.remaining(planner)
+                port_scanner = PortScannerFactory.generate_port_scanner(checkpoint.scan_type, shards=checkpoint.shards)
+                port_scanner.telemetry = telemetry
+                if own_store:
+                    results_store = ResultsStore(checkpoint.database)
+                if results_store and checkpoint.database_scan_id is None:
+                    checkpoint.database_scan_id = results_store.start_scan(checkpoint.scan_type, checkpoint.targets, checkpoint.ports)
+                records = self._scan_records(resumable_scan(port_scanner, checkpoint, planner=planner), checkpoint.scan_type,
+                                             telemetry, results_store, checkpoint.database_scan_id, checkpoint.grab_banners,
+                                             exporters, stopped)
+
+                for record in records:
+                    if isinstance(record, BannerResult):
+                        if record.banner is not None:
+                            reporter.clear()
+                            print(colored(f"{prefix}{record.host}:{record.port}/{record.proto} -> {record.banner}{describe_service(record.service)}", "cyan"))
+                        continue
+                    counts[record.status] += 1
+                    if record.status == "open":
+                        reporter.clear()
+                        print(colored(f"{prefix}{record.host}:{record.port}/{record.proto} open", "green"))
+
+                if results_store:
+                    results_store.finish_scan(checkpoint.database_scan_id)
+                    print(f"{prefix}Results saved to {checkpoint.database} (scan id {checkpoint.database_scan_id}).")
+        except KeyboardInterrupt:
+            print(f"\n{prefix}Scan interrupted. Resume it with 'resume {checkpoint.scan_id}'.")
+            return None
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f"{prefix}Error: {e}")
+            return None
+        finally:
+            if records is not None:
+                records.close()
+            if own_store and results_store:
+                results_store.close()
+
+        summary = f"{prefix}Scan finished: {counts['open']} open, {counts['closed']} closed, {counts['filtered']} filtered"
+        if counts["open|filtered"]:
+            summary += f", {counts['open|filtered']} open|filtered"
+        print(summary + ".")
+        return counts
+
+    def delta(self, scan_type, targets, ports, results_store, sample=None, grab_banners=False, prefix="", stopped=None,
+              reporter=None, exporters=None, feed=None):
+        """
+        Runs an incremental rescan against the previous scan of the same targets and ports, printing
+        the changes it finds (see modules/delta_scan.py).
+
+        Known-open ports are re-verified first, then a rotating slice of the remaining probe space is
+        swept. The scan is stored in the results store and becomes the baseline of the next delta scan
+        once it finishes; an interrupted delta scan is not used as a baseline.
+
+        Args:
+            scan_type (str): The port scanner type.
+            targets (str): The target specification.
+            ports (str): The port specification.
+            results_store (ResultsStore): An open store holding the previous scans.
+            sample (float): Fraction of the remaining probe space swept per run. 0.1 if not given.
+            grab_banners (bool): Grab banners from open ports and report changed banners.
+            prefix (str): Text printed before every output line (e.g. a job name).
+            stopped (threading.Event): Interrupts the scan, like Ctrl-C, once set.
+            reporter (ProgressReporter): A running progress reporter shared with other scans. By
+                default the scan reports its own progress as configured in config/eater.ini.
+            exporters (list): Open ResultExporters the results and banners are written to as they arrive.
+            feed (file): An open text file the changes are written to, one JSON object per line.
+
+        Returns:
+            dict: The number of changes per kind ("opened", "closed", "banner_changed"), or None if the scan failed or was interrupted.
+        """
+        import json
+        import time
+        import sqlite3
+        from modules.delta_scan import DeltaScan, DEFAULT_SAMPLE, banner_key
+        from modules.port_scanner import PortScannerFactory
+
+        scan_type = scan_type.lower()
+        records = None
+        scan_id = None
+        changes = {"opened": 0, "closed": 0, "banner_changed": 0}
+        styles = {"opened": ("+", "green"), "closed": ("-", "red"), "banner_changed": ("~", "yellow")}
+        try:
+            delta = DeltaScan(results_store, scan_type, targets, ports, sample or DEFAULT_SAMPLE)
+            if delta.baseline is None:
+                print(f"{prefix}No previous scan of these targets and ports; running a full baseline scan.")
+            else:
+                print(f"{prefix}Delta scan against scan {delta.baseline}: re-verifying {len(delta.known)} open ports, "
+                      f"then sweeping slice {delta.slice + 1}/{delta.slices} of the rest.")
+            with progress_reporter(reporter) as reporter:
+                telemetry = reporter.telemetry
+                telemetry.total += len(delta)
+                port_scanner = PortScannerFactory.generate_port_scanner(scan_type)
+                port_scanner.telemetry = telemetry
+                scan_id = results_store.start_scan(scan_type, targets, ports)
+                records = self._scan_records(port_scanner.scan_iter(delta.probes()), scan_type, telemetry, results_store,
+                                             scan_id, grab_banners, exporters, stopped)
+
+                for record in records:
+                    change = delta.classify(record)
+                    if change is None:
+                        continue
+                    changes[change.kind] += 1
+                    symbol, color = styles[change.kind]
+                    if change.kind == "banner_changed":
+                        detail = f"banner changed: {banner_key(change.old)} -> {banner_key(change.new)}"
+                    else:
+                        detail = change.kind if change.kind == "opened" else f"closed (now {change.new})"
+                    reporter.clear()
+                    print(colored(f"{prefix}[{symbol}] {change.host}:{change.port}/{change.proto} {detail}", color))
+                    if feed is not None:
+                        feed.write(json.dumps(dict(change._asdict(), time=time.time())) + "\n")
+
+                results_store.record_banners(scan_id, delta.carried_banners())
+                results_store.finish_scan(scan_id)
+        except KeyboardInterrupt:
+            print(f"\n{prefix}Delta scan interrupted; it will not be used as a baseline.")
+            return None
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f"{prefix}Error: {e}")
+            return None
+        finally:
+            if records is not None:
+                records.close()
+
+        print(f"{prefix}Delta scan finished (scan id {scan_id}): {changes['opened']} opened, {changes['closed']} closed, "
+              f"{changes['banner_changed']} banners changed.")
+        return changes
+
+    def _scan_records(self, results, scan_type, telemetry, results_store=None, scan_id=None, grab_banners=False,
+                      exporters=None, stopped=None):
+        """
+        Runs a scan's result stream through the shared pipeline of execute() and delta(), yielding every record.
+
+        Results are stored under scan_id as they pass, open ports are fed to a banner grabber and
+        every record is written to the exporters. Grabbed banners are stored in batches, the last
+        one when the stream ends or is closed.
+
+        Args:
+            results (iterable): ScanResult records, e.g. from a scanner's scan_iter.
+            scan_type (str): The lower-case port scanner type, used to pick the banner grabber.
+            telemetry (ScanTelemetry): The telemetry of the scan; completed probes are counted on it.
+            results_store (ResultsStore): An open store the results and banners are saved to, if any.
+            scan_id (int): The results store scan the records belong to.
+            grab_banners (bool): Grab banners from open ports while the scan is running.
+            exporters (list): Open ResultExporters the results and banners are written to as they arrive.
+            stopped (threading.Event): Interrupts the scan, like Ctrl-C, once set.
+
+        Yields:
+            ScanResult or BannerResult: Each scan result, and each banner grab once banners are grabbed.
+
+        Raises:
+            KeyboardInterrupt: Once stopped is set.
+        """
+        from modules.recon_pipeline import scan_and_grab
+        from modules.banner_grabber import BannerGrabberFactory, BannerResult
+
+        banners = []
+        try:
+            if results_store:
+                results = results_store.tee(scan_id, results)
+            if grab_banners:
+                banner_grabber = BannerGrabberFactory.generate_banner_grabber(BANNER_TYPES.get(scan_type, scan_type))
+                banner_grabber.telemetry = telemetry
+                results = scan_and_grab(results, banner_grabber)
+            for exporter in exporters or ():
+                results = exporter.tee(results)
+
+            for record in results:
+                if stopped is not None and stopped.is_set():
+                    raise KeyboardInterrupt
+                if isinstance(record, BannerResult):
+                    if record.banner is not None:
+                        banners.append(record)
+                    if results_store and len(banners) >= results_store.batch_size:
+                        results_store.record_banners(scan_id, banners)
+                        banners = []
+                else:
+                    telemetry.incr("completed")
+                yield record
+        finally:
+            results.close()
+            if results_store and banners:
+                results_store.record_banners(scan_id, banners)
 
 class BannergrabberModule(ModuleBase):
     """
     Banner grabbing module.
     """
+    implementation = ("modules.banner_grabber", "modules.scan_planner")
     
     def run(self):
         """
@@ -73,18 +415,82 @@ class BannergrabberModule(ModuleBase):
         This method prompts the user for target information and initiates a banner grabbing operation.
         """
         print("You've selected the 'bannergrabber' module.")
-        target = input("Enter the target (hostname or IP address): ")
+        target = input("Enter the targets (hostname, IP, CIDR, range or @file): ")
         port_range = input("Enter the port range (e.g., 80-100): ").strip()
         scan_type = input("Enter the scan type (TCP/UDP/ICMP/SCTP, default is TCP): ").strip().upper() or "TCP"
+        export_path = input("Export banners to file (.jsonl/.csv/.xml/.gnmap, optionally .gz/.zst; leave empty to skip): ").strip()
 
-        banner_grabber = BannerGrabberFactory.generate_banner_grabber(scan_type)
-        banner_grabber.grab_banner(target, port_range)
+        exporter = open_exporter(export_path, scan_type, port_range, f"bannergrabber {target} {port_range}")
+        if export_path and exporter is None:
+            return
         print(f"Performing banner grabber on target: {target} with port range: {port_range} using {scan_type}...")
+        try:
+            self.grab(target, port_range, scan_type, exporters=[exporter] if exporter else None)
+        finally:
+            if exporter is not None:
+                exporter.close()
+
+    def grab(self, target, port_range, scan_type="TCP", prefix="", stopped=None, reporter=None, exporters=None):
+        """
+        Grabs banners from every port in a range on the targets, printing them as they arrive.
+
+        Args:
+            target (str): The target specification (hostname, IP, CIDR, range or @file).
+            port_range (str): The port specification.
+            scan_type (str): The banner grabber type (TCP/UDP/ICMP/SCTP).
+            prefix (str): Text printed before every output line (e.g. a job name).
+            stopped (threading.Event): Stops grabbing once set.
+            reporter (ProgressReporter): A running progress reporter shared with other jobs. By
+                default grabbing reports its own progress as configured in config/eater.ini.
+            exporters (list): Open ResultExporters the banners are written to as they arrive.
+
+        Returns:
+            int: The number of banners grabbed, or None if grabbing failed or was interrupted.
+        """
+        from modules.scan_planner import ScanPlanner
+        from modules.banner_grabber import BannerGrabberFactory, describe_service
+        from utils.telemetry import ScanTelemetry, ProgressReporter, load_telemetry_settings
+
+        grabbed = 0
+        results = None
+        own_reporter = reporter is None
+        try:
+            if own_reporter:
+                reporter = ProgressReporter(ScanTelemetry(), **load_telemetry_settings())
+                reporter.start()
+            banner_grabber = BannerGrabberFactory.generate_banner_grabber(scan_type)
+            banner_grabber.telemetry = reporter.telemetry
+            planner = ScanPlanner(target, port_range)
+            reporter.telemetry.total += len(planner)
+            results = banner_grabber.grab_iter(planner)
+            for exporter in exporters or ():
+                results = exporter.tee(results)
+            for result in results:
+                if stopped is not None and stopped.is_set():
+                    print(f"{prefix}Banner grabbing interrupted.")
+                    return None
+                reporter.telemetry.incr("completed")
+                if result.banner is not None:
+                    grabbed += 1
+                    reporter.clear()
+                    print(colored(f"{prefix}{result.host}:{result.port}/{result.proto} -> {result.banner}{describe_service(result.service)}", "green"))
+        except (ValueError, OSError) as e:
+            print(f"{prefix}Error: {e}")
+            return None
+        finally:
+            if results is not None:
+                results.close()
+            if own_reporter and reporter is not None:
+                reporter.stop()
+
+        print(f"{prefix}Banner grabbing finished: {grabbed} banners.")
+        return grabbed
 
 class WirelessEaterModule(ModuleBase):
     """
     Wireless network password cracking module.
     """
+    implementation = ("modules.wireless_eater",)
     
     def run(self):
         """
@@ -96,16 +502,20 @@ class WirelessEaterModule(ModuleBase):
         dictionary_path = input("Enter the dictionary path: ")
         network_type = input("Enter the network type (WEP/WPA/WPA2, default is WEP): ").strip().upper() or "WEP"
 
+        from modules.wireless_eater import WirelessEaterFactory
         wireless_eater = WirelessEaterFactory.generate_wireless_factory(network_type)
         wireless_eater.crack(dictionary_path)
         print(f"Performing password cracking with dictionary: {dictionary_path}, network type: {network_type}...")
 
 class PayloadModule(ModuleBase):
+    implementation = ("modules.payloads",)
+
     def run(self):
         """Execute the payload module.
 
         This method allows the user to select and execute various payload commands. Users can view available payload options or choose a specific payload to run. Supported commands include 'all' to display all available payloads and '-rev-shell' to initiate a reverse shell connection to the target machine.
         """
+        from modules.payloads import PayloadFactory
         command_list = ["-all", "-rev-shell", "-rev-tcp"]
         print(f"You've selected the 'payload' module.\nFor see all payloads -> all")
         payload_command = input("Payload Command:")
@@ -133,28 +543,34 @@ class ModuleFactory:
     """
     Factory class for generating modules.
     """
-    module_classes = {
-        "protosearch": ProtosearchModule(),
-        "bannergrabber": BannergrabberModule(),
-        "wireless-eater": WirelessEaterModule(),
-        "payload": PayloadModule(),
-    }
+    registry = PluginRegistry("modules")
+    registry.register("protosearch", "utils.module_generator:ProtosearchModule", "Port scanning module")
+    registry.register("bannergrabber", "utils.module_generator:BannergrabberModule", "Banner Grabber module")
+    registry.register("wireless-eater", "utils.module_generator:WirelessEaterModule", "Wireless Eater module")
+    registry.register("payload", "utils.module_generator:PayloadModule", "Generate Payload")
 
     @staticmethod
     def generate_module(module_type):
         """
         Factory method to generate a module instance based on the provided module_type.
 
+        The module's implementation is imported here, on first use. Modules come from a plugin
+        registry, so third-party modules can be added through the 'eater.modules' entry point
+        group or a plugins directory (see utils/plugin_registry.py).
+
         Args:
             module_type (str): The type of module to create ("protosearch" or "bannergrabber" or "wireless-eater").
 
         Returns:
-            ModuleBase: An instance of the specified module.
+            ModuleBase: An instance of the specified module, or None if it is unknown or cannot be loaded.
         """
-        if module_type in ModuleFactory.module_classes:
-            module_instance = ModuleFactory.module_classes.get(module_type)
-            if module_instance:
-                return module_instance
-            else:
-                print(f"Module type '{module_type}' is not recognized.")
-                return None
\ No newline at end of file
+        if module_type not in ModuleFactory.registry:
+            return None
+        try:
+            module_class = ModuleFactory.registry.load(module_type)
+            for implementation in getattr(module_class, "implementation", ()):
+                importlib.import_module(implementation)
+        except (ValueError, ImportError) as e:
+            print(f"Error: {e}")
+            return None
+        return module_class()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Plugin Registry
+
+This module keeps the catalogue of pluggable classes: CLI modules, port scanner engines and banner grabbers. A registry stores only each plugin's import path ("package.module:ClassName") and metadata, and imports the class the first time it is used, so listing plugins or starting the CLI costs the same however many are installed.
+
+Built-in plugins are registered by the factories. Third-party plugins are discovered from:
+- Entry points in the groups 'eater.modules', 'eater.port_scanners' and 'eater.banner_grabbers' of installed distributions.
+- INI manifests ('*.ini') in a plugins directory ('plugins/' next to eater.py, or '~/.eater/plugins'). Every section is one plugin:
+
+        [masscan]
+        group = port_scanners
+        target = masscan_engine:MasscanScanner
+        description = Port scanner driving an external masscan process
+
+  The manifest's directory is put on sys.path when the plugin is loaded, so its Python files can sit next to it.
+
+A plugin never replaces a built-in or an earlier plugin of the same name.
+
+Classes:
+- PluginSpec: Import path and metadata of one plugin.
+- PluginRegistry: The plugins of one group, loaded on first use.
+
+Usage:
+1. Create a 'PluginRegistry(group)' and 'register' the built-in classes by import path.
+2. List plugins with 'specs()' (no imports happen), and instantiate one with 'create(name, **options)'.
+"""
+
+import os
+import sys
+import importlib
+import configparser
+from collections import namedtuple
+
+PLUGIN_DIRS = (
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "plugins"),
+    os.path.join(os.path.expanduser("~"), ".eater", "plugins"),
+)
+ENTRY_POINT_PREFIX = "eater."
+
+PluginSpec = namedtuple("PluginSpec", ["name", "target", "description", "source", "path"])
+
+class PluginRegistry:
+    """
+    The plugins of one group (e.g. "port_scanners"), stored as import paths until first use.
+    """
+
+    def __init__(self, group, plugin_dirs=PLUGIN_DIRS):
+        """
+        Args:
+            group (str): The plugin group; entry points are read from 'eater.<group>'.
+            plugin_dirs (tuple): Directories searched for plugin manifests.
+        """
+        self.group = group
+        self.plugin_dirs = plugin_dirs
+        self.plugins = {}
+        self.loaded = {}
+        self.discovered = False
+
+    def register(self, name, target, description="", source="builtin", path=None):
+        """Register a plugin by import path. Registering an existing name has no effect.
+
+        Args:
+            name (str): The name the plugin is selected by (case-insensitive).
+            target (str): "package.module:ClassName".
+            description (str): One line shown when plugins are listed.
+            source (str): Where the plugin comes from (e.g. "builtin" or a distribution name).
+            path (str): Directory added to sys.path before the plugin is imported.
+        """
+        name = name.lower()
+        if name not in self.plugins:
+            self.plugins[name] = PluginSpec(name, target, description, source, path)
+
+    def discover(self):
+        """Register the group's entry points and plugin manifests, once."""
+        if self.discovered:
+            return
+        self.discovered = True
+        self._discover_entry_points()
+        for directory in self.plugin_dirs:
+            self._discover_directory(directory)
+
+    def _discover_entry_points(self):
+        """Register the entry points of installed distributions."""
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_PREFIX + self.group):
+            distribution = getattr(entry_point, "dist", None)
+            source = distribution.name if distribution is not None else "entry point"
+            self.register(entry_point.name, entry_point.value, f"Plugin from {source}", source)
+
+    def _discover_directory(self, directory):
+        """Register the plugins of this group listed in the manifests of a directory."""
+        if not os.path.isdir(directory):
+            return
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(".ini"):
+                continue
+            manifest = configparser.ConfigParser()
+            try:
+                manifest.read(os.path.join(directory, file_name))
+            except configparser.Error as e:
+                print(f"Skipping plugin manifest {file_name}: {e}")
+                continue
+            for name in manifest.sections():
+                section = manifest[name]
+                if section.get("group") == self.group and section.get("target"):
+                    self.register(name, section["target"], section.get("description", ""), file_name, directory)
+
+    def specs(self):
+        """Return the PluginSpec of every plugin, built-ins first. Nothing is imported."""
+        self.discover()
+        return list(self.plugins.values())
+
+    def __contains__(self, name):
+        self.discover()
+        return name.lower() in self.plugins
+
+    def load(self, name):
+        """Import a plugin and return its class.
+
+        Args:
+            name (str): The plugin name (case-insensitive).
+
+        Returns:
+            type: The plugin class.
+
+        Raises:
+            ValueError: If there is no such plugin or it cannot be imported.
+        """
+        name = name.lower()
+        plugin_class = self.loaded.get(name)
+        if plugin_class is not None:
+            return plugin_class
+        self.discover()
+        spec = self.plugins.get(name)
+        if spec is None:
+            raise ValueError(f"Unknown {self.group} plugin '{name}' (available: {', '.join(self.plugins)}).")
+
+        if spec.path and spec.path not in sys.path:
+            sys.path.append(spec.path)
+        module_name, _, attribute = spec.target.partition(":")
+        try:
+            plugin_class = importlib.import_module(module_name)
+            for part in attribute.split(".") if attribute else ():
+                plugin_class = getattr(plugin_class, part)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Cannot load {self.group} plugin '{name}' from {spec.target}: {e}")
+        self.loaded[name] = plugin_class
+        return plugin_class
+
+    def create(self, name, *args, **options):
+        """Load a plugin and return a new instance of it.
+
+        Args:
+            name (str): The plugin name (case-insensitive).
+            *args, **options: Passed to the plugin's constructor.
+
+        Raises:
+            ValueError: If there is no such plugin or it cannot be imported.
+        """
+        return self.load(name)(*args, **options)
@@ -0,0 +1,293 @@
+"""
+Port State Store
+
+This module keeps scan results as 2-bit port states instead of per-port Python objects. A host costs a fixed 16 KiB (65,536 ports × 2 bits) regardless of how many ports were probed, and set operations such as diffing two scans or finding every host with a port open are done with big-integer bit arithmetic over whole maps.
+
+States:
+- UNKNOWN (0): The port was not probed.
+- OPEN (1), CLOSED (2), FILTERED (3): The probe outcome, matching the scanners' status strings. Unanswered UDP probes ("open|filtered") are stored as FILTERED.
+
+Classes:
+- PortStateMap: 2-bit state per port for a single host, backed by a bytearray (or a writable memoryview).
+- PortStateStore: Per-host PortStateMaps for one protocol, with set operations and zero-copy persistence.
+
+Usage:
+1. Record ScanResult records into a 'PortStateStore' with 'record' (or use a scanner's 'scan_store').
+2. Query it with 'get', 'hosts_with', 'diff' and 'union'.
+3. Persist it with 'save' and map it back with 'PortStateStore.load'.
+"""
+
+import mmap
+import socket
+import struct
+
+UNKNOWN, OPEN, CLOSED, FILTERED = range(4)
+STATUS_CODES = {"open": OPEN, "closed": CLOSED, "filtered": FILTERED, "open|filtered": FILTERED}
+STATUS_NAMES = {UNKNOWN: None, OPEN: "open", CLOSED: "closed", FILTERED: "filtered"}
+
+PORT_COUNT = 65536
+MAP_SIZE = PORT_COUNT // 4
+LOW_BITS = int.from_bytes(b"\x55" * MAP_SIZE, "little")
+
+FILE_MAGIC = b"EATRPSM1"
+FILE_HEADER = struct.Struct("!8s8sI")
+
+def _state_code(state):
+    """Accept a state code or a status string and return the state code."""
+    return STATUS_CODES[state] if isinstance(state, str) else state
+
+def _iter_pairs(mask):
+    """Yield the port numbers whose 2-bit slot is flagged in a mask of low bits."""
+    while mask:
+        low = mask & -mask
+        yield (low.bit_length() - 1) >> 1
+        mask ^= low
+
+def _host_key(host):
+    """Pack a host address into 16 bytes (IPv4 addresses are IPv4-mapped)."""
+    try:
+        return b"\x00" * 10 + b"\xff\xff" + socket.inet_aton(host)
+    except OSError:
+        return socket.inet_pton(socket.AF_INET6, host)
+
+def _host_name(key):
+    """Unpack a 16-byte host key back into its textual address."""
+    if key[:12] == b"\x00" * 10 + b"\xff\xff":
+        return socket.inet_ntoa(key[12:])
+    return socket.inet_ntop(socket.AF_INET6, key)
+
+class PortStateMap:
+    """
+    2-bit state per port for a single host.
+    """
+    __slots__ = ("buffer",)
+
+    def __init__(self, buffer=None):
+        """
+        Args:
+            buffer (bytearray | memoryview): Existing MAP_SIZE-byte state buffer. A zeroed one is allocated if not given.
+        """
+        self.buffer = buffer if buffer is not None else bytearray(MAP_SIZE)
+
+    def set(self, port, state):
+        """Set the state of a port.
+
+        Args:
+            port (int): The port number.
+            state (int | str): A state code or a status string ("open", "closed", "filtered").
+        """
+        shift = (port & 3) << 1
+        index = port >> 2
+        self.buffer[index] = (self.buffer[index] & ~(3 << shift) & 0xFF) | (_state_code(state) << shift)
+
+    def get(self, port):
+        """Return the state code of a port."""
+        return (self.buffer[port >> 2] >> ((port & 3) << 1)) & 3
+
+    def as_int(self):
+        """Return the whole map as one integer with port p in bits 2p and 2p+1."""
+        return int.from_bytes(self.buffer, "little")
+
+    def mask(self, state):
+        """Return an integer flagging (in the low bit of each pair) every port in the given state.
+
+        Args:
+            state (int | str): A state code or a status string.
+
+        Returns:
+            int: Bit 2p is set for every port p in that state.
+        """
+        state = _state_code(state)
+        value = self.as_int()
+        low = value & LOW_BITS
+        high = (value >> 1) & LOW_BITS
+        low = low if state & 1 else ~low & LOW_BITS
+        high = high if state & 2 else ~high & LOW_BITS
+        return low & high
+
+    def ports(self, state):
+        """Yield the ports in the given state, in ascending order."""
+        return _iter_pairs(self.mask(state))
+
+    def count(self, state):
+        """Return the number of ports in the given state."""
+        return bin(self.mask(state)).count("1")
+
+    def diff(self, other):
+        """Yield the ports whose state differs between this map and another.
+
+        Args:
+            other (PortStateMap): The map to compare against.
+
+        Yields:
+            tuple: (port, state in this map, state in the other map).
+        """
+        changed = self.as_int() ^ other.as_int()
+        for port in _iter_pairs((changed | changed >> 1) & LOW_BITS):
+            yield port, self.get(port), other.get(port)
+
+    def update(self, other):
+        """Copy every known (non-UNKNOWN) state of another map into this one.
+
+        Args:
+            other (PortStateMap): The map whose known states take precedence.
+        """
+        value = other.as_int()
+        known = (value | value >> 1) & LOW_BITS
+        keep = ~(known | known << 1) & ((1 << (MAP_SIZE * 8)) - 1)
+        merged = (self.as_int() & keep) | value
+        self.buffer[:] = merged.to_bytes(MAP_SIZE, "little")
+
+class PortStateStore:
+    """
+    Per-host port state maps for one protocol.
+    """
+
+    def __init__(self, proto="tcp"):
+        """
+        Args:
+            proto (str): The protocol the states belong to (e.g. "tcp", "udp").
+        """
+        self.proto = proto
+        self.maps = {}
+        self._backing = None
+
+    def __len__(self):
+        """Number of hosts with at least one recorded state."""
+        return len(self.maps)
+
+    def __contains__(self, host):
+        return host in self.maps
+
+    def hosts(self):
+        """Return the hosts in the store."""
+        return list(self.maps)
+
+    def host_map(self, host):
+        """Return the PortStateMap of a host, creating it on first use."""
+        port_map = self.maps.get(host)
+        if port_map is None:
+            port_map = self.maps[host] = PortStateMap()
+        return port_map
+
+    def set(self, host, port, state):
+        """Set the state of a host's port (state code or status string)."""
+        self.host_map(host).set(port, state)
+
+    def get(self, host, port):
+        """Return the status string of a host's port, or None if it was not probed."""
+        port_map = self.maps.get(host)
+        return STATUS_NAMES[port_map.get(port)] if port_map is not None else None
+
+    def record(self, result):
+        """Record a ScanResult.
+
+        Args:
+            result (ScanResult): The probe outcome to store.
+        """
+        self.host_map(result.host).set(result.port, result.status)
+
+    def hosts_with(self, port, state="open"):
+        """Yield every host where a port is in the given state (e.g. all hosts with 443 open).
+
+        Args:
+            port (int): The port number.
+            state (int | str): A state code or a status string.
+        """
+        state = _state_code(state)
+        index = port >> 2
+        shift = (port & 3) << 1
+        for host, port_map in self.maps.items():
+            if (port_map.buffer[index] >> shift) & 3 == state:
+                yield host
+
+    def union(self, other):
+        """Return a new store holding both stores' states; states in `other` win where both are known.
+
+        Args:
+            other (PortStateStore): The store to merge in.
+
+        Returns:
+            PortStateStore: The merged store.
+        """
+        merged = PortStateStore(self.proto)
+        for source in (self, other):
+            for host, port_map in source.maps.items():
+                if host in merged.maps:
+                    merged.maps[host].update(port_map)
+                else:
+                    merged.maps[host] = PortStateMap(bytearray(port_map.buffer))
+        return merged
+
+    def diff(self, other):
+        """Yield every (host, port) whose state differs between this store and another (e.g. an earlier scan).
+
+        Args:
+            other (PortStateStore): The store to compare against.
+
+        Yields:
+            tuple: (host, port, status in this store, status in the other store); absent states are None.
+        """
+        empty = PortStateMap()
+        for host in self.maps.keys() | other.maps.keys():
+            mine = self.maps.get(host, empty)
+            theirs = other.maps.get(host, empty)
+            for port, old, new in mine.diff(theirs):
+                yield host, port, STATUS_NAMES[old], STATUS_NAMES[new]
+
+    def save(self, path):
+        """Write the store to disk without copying the state buffers.
+
+        Layout: a header (magic, protocol, host count), one 16-byte address per host, then one
+        MAP_SIZE-byte state buffer per host in the same order.
+
+        Args:
+            path (str): The file to write.
+        """
+        hosts = list(self.maps)
+        with open(path, "wb") as store_file:
+            store_file.write(FILE_HEADER.pack(FILE_MAGIC, self.proto.encode().ljust(8, b"\x00"), len(hosts)))
+            store_file.write(b"".join(_host_key(host) for host in hosts))
+            for host in hosts:
+                store_file.write(memoryview(self.maps[host].buffer))
+
+    @classmethod
+    def load(cls, path):
+        """Map a store written by 'save' back into memory.
+
+        The file is memory-mapped copy-on-write, so loading does not read or copy the state
+        buffers; pages are faulted in as hosts are queried and changes never reach the file.
+
+        Args:
+            path (str): The file to read.
+
+        Returns:
+            PortStateStore: The loaded store.
+
+        Raises:
+            ValueError: If the file is not a port state store or is truncated.
+        """
+        with open(path, "rb") as store_file:
+            if store_file.seek(0, 2) < FILE_HEADER.size:
+                raise ValueError(f"'{path}' is not a port state store.")
+            backing = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, proto, count = FILE_HEADER.unpack_from(backing)
+        if magic != FILE_MAGIC:
+            backing.close()
+            raise ValueError(f"'{path}' is not a port state store.")
+        size = FILE_HEADER.size + count * (16 + MAP_SIZE)
+        if len(backing) < size:
+            backing.close()
+            raise ValueError(f"'{path}' is truncated: {count} hosts need {size} bytes, it has {len(backing)}.")
+
+        store = cls(proto.rstrip(b"\x00").decode())
+        store._backing = backing
+        view = memoryview(backing)
+        offset = FILE_HEADER.size
+        maps_offset = offset + count * 16
+        for position in range(count):
+            host = _host_name(bytes(view[offset + position * 16:offset + (position + 1) * 16]))
+            start = maps_offset + position * MAP_SIZE
+            store.maps[host] = PortStateMap(view[start:start + MAP_SIZE])
+        return store
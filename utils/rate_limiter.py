@@ -0,0 +1,214 @@
+"""
+Rate Limiter
+
+This module provides the token-bucket limits every probe is drawn against. A ProbeScheduler combines a global packets-per-second bucket with per-target and per-subnet buckets, so a scan can run at the highest rate an engagement allows without overrunning a single host, a network segment or local connection tracking. All scanners and banner grabbers share one scheduler, configured in config/eater.ini, so the limit holds however many probe types run at once.
+
+Classes:
+- TokenBucket: Token bucket handing out send times instead of refusing requests.
+- ProbeScheduler: Global, per-target and per-subnet token buckets shared by every probe type.
+
+Functions:
+- load_rate_limits: Read the [rate_limit] section of the configuration file.
+- get_scheduler: The process-wide scheduler built from the configuration.
+
+Usage:
+1. Get the shared scheduler with 'get_scheduler()' (or build a 'ProbeScheduler' with explicit limits).
+2. Call 'acquire(target_ip)' (threads) or 'await acquire_async(target_ip)' (asyncio) before each probe, or use 'reserve' in engines with their own wait loop.
+"""
+
+import os
+import time
+import socket
+import struct
+import asyncio
+import threading
+import configparser
+from collections import OrderedDict
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "eater.ini")
+DEFAULT_BURST = 100
+DEFAULT_SUBNET_PREFIX = 24
+MAX_BUCKETS = 65536
+
+class TokenBucket:
+    """
+    Token bucket handing out send times.
+
+    Instead of refusing a request when empty, the bucket goes into debt and returns how long the
+    caller must wait, so concurrent callers are spaced out at exactly `rate` in arrival order.
+    Not thread-safe on its own; ProbeScheduler serializes access.
+    """
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst=DEFAULT_BURST):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            burst (int): Bucket capacity, i.e. how many probes may be sent at once after being idle.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def reserve(self, now):
+        """Take one token and return the seconds to wait until it is actually available.
+
+        Args:
+            now (float): The current time.monotonic() value.
+
+        Returns:
+            float: 0 if a token was available, otherwise the delay before sending.
+        """
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+class ProbeScheduler:
+    """
+    Global, per-target and per-subnet token buckets shared by every probe type.
+
+    A probe may only be sent once all three buckets allow it. A rate of 0 (or None) disables
+    that limit.
+    """
+
+    def __init__(self, global_rate=None, per_target_rate=None, per_subnet_rate=None,
+                 subnet_prefix=DEFAULT_SUBNET_PREFIX, burst=DEFAULT_BURST, max_buckets=MAX_BUCKETS):
+        """
+        Args:
+            global_rate (float): Probes per second across all targets.
+            per_target_rate (float): Probes per second to a single address.
+            per_subnet_rate (float): Probes per second to a single subnet.
+            subnet_prefix (int): Prefix length grouping addresses into subnets (e.g. 24 for /24).
+            burst (int): Capacity of every bucket.
+            max_buckets (int): Per-target and per-subnet buckets kept before the least recently used is dropped.
+        """
+        self.global_rate = global_rate or None
+        self.per_target_rate = per_target_rate or None
+        self.per_subnet_rate = per_subnet_rate or None
+        self.subnet_prefix = subnet_prefix
+        self.burst = burst
+        self.max_buckets = max_buckets
+        self.subnet_mask = (0xFFFFFFFF << (32 - subnet_prefix)) & 0xFFFFFFFF
+        self.global_bucket = TokenBucket(self.global_rate, burst) if self.global_rate else None
+        self.target_buckets = OrderedDict()
+        self.subnet_buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def unlimited(self):
+        """Whether no limit is configured at all."""
+        return not (self.global_rate or self.per_target_rate or self.per_subnet_rate)
+
+    def __getstate__(self):
+        """Pickle the limits only; worker processes start with fresh buckets."""
+        return {"global_rate": self.global_rate, "per_target_rate": self.per_target_rate, "per_subnet_rate": self.per_subnet_rate,
+                "subnet_prefix": self.subnet_prefix, "burst": self.burst, "max_buckets": self.max_buckets}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def split(self, parts):
+        """Return a scheduler granting 1/parts of every limit, for one of `parts` worker processes.
+
+        Args:
+            parts (int): Number of processes sharing the limits.
+
+        Returns:
+            ProbeScheduler: The per-process scheduler.
+        """
+        parts = max(1, parts)
+        share = lambda rate: rate / parts if rate else None
+        return ProbeScheduler(share(self.global_rate), share(self.per_target_rate), share(self.per_subnet_rate),
+                              self.subnet_prefix, max(1, self.burst // parts), self.max_buckets)
+
+    def _bucket(self, buckets, key, rate):
+        """Return the bucket for a key, creating it and evicting the least recently used if needed."""
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, self.burst)
+            if len(buckets) > self.max_buckets:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+        return bucket
+
+    def reserve(self, target_ip):
+        """Reserve a send slot for one probe to a target.
+
+        Args:
+            target_ip (str): The IPv4 address of the target.
+
+        Returns:
+            float: Seconds the caller must wait before sending the probe.
+        """
+        if self.unlimited:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            wait = self.global_bucket.reserve(now) if self.global_bucket else 0.0
+            if self.per_target_rate or self.per_subnet_rate:
+                try:
+                    address = struct.unpack("!I", socket.inet_aton(target_ip))[0]
+                except OSError:
+                    address = None
+                if self.per_target_rate:
+                    wait = max(wait, self._bucket(self.target_buckets, target_ip, self.per_target_rate).reserve(now))
+                if self.per_subnet_rate and address is not None:
+                    subnet = address & self.subnet_mask
+                    wait = max(wait, self._bucket(self.subnet_buckets, subnet, self.per_subnet_rate).reserve(now))
+            return wait
+
+    def acquire(self, target_ip):
+        """Block the calling thread until a probe to the target may be sent."""
+        wait = self.reserve(target_ip)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, target_ip):
+        """Wait, without blocking the event loop, until a probe to the target may be sent."""
+        wait = self.reserve(target_ip)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+def load_rate_limits(path=DEFAULT_CONFIG):
+    """Read the [rate_limit] section of the configuration file.
+
+    Args:
+        path (str): The INI file.
+
+    Returns:
+        dict: Keyword arguments for ProbeScheduler. Missing options keep their defaults.
+
+    Raises:
+        ValueError: If an option is not a number.
+    """
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if not parser.has_section("rate_limit"):
+        return {}
+    section = parser["rate_limit"]
+    limits = {}
+    try:
+        for option, argument in (("global_pps", "global_rate"), ("per_target_pps", "per_target_rate"), ("per_subnet_pps", "per_subnet_rate")):
+            if option in section:
+                limits[argument] = section.getfloat(option)
+        for option in ("subnet_prefix", "burst"):
+            if option in section:
+                limits[option] = section.getint(option)
+    except ValueError as e:
+        raise ValueError(f"Invalid [rate_limit] setting in {path}: {e}")
+    return limits
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Return the process-wide ProbeScheduler, built from config/eater.ini on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ProbeScheduler(**load_rate_limits())
+        return _scheduler
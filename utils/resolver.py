@@ -0,0 +1,584 @@
+"""
+DNS Resolver
+
+This module resolves hostnames for the scanners, banner grabbers and payloads. Instead of one blocking gethostbyname call per name, a Resolver sends DNS queries for many names at once over UDP from an event loop, with a bounded number of lookups in flight, so expanding a large asset list of hostnames takes about as long as its slowest few lookups. A and AAAA records are supported.
+
+Answers are cached for their TTL in an LRU cache shared by every user of the resolver. Names that do not exist (NXDOMAIN) or have no record of a type are cached as negative entries, for the SOA minimum TTL of the answer or 'negative_ttl', so a list full of dead names is not queried again on every scan. Names in /etc/hosts are answered from the file. Like the system resolver, names with fewer dots than 'ndots' are tried with each domain of the resolv.conf search list before being tried as given (and the other way round for longer names), and single-label names that DNS does not know are finally passed to the system resolver, which also consults the other name services of nsswitch.conf. Without a configured nameserver (none in config/eater.ini or /etc/resolv.conf), lookups fall back to the system resolver in a thread pool.
+
+Classes:
+- Resolution: Addresses of one name.
+- DNSCache: TTL-aware LRU cache of positive and negative answers.
+- Resolver: Concurrent A/AAAA resolver over UDP.
+
+Functions:
+- encode_name, read_name, build_query, parse_response: DNS wire format helpers.
+- parse_nameserver, system_nameservers, system_search, load_hosts: Nameserver, search list and hosts file parsing.
+- load_resolver_settings: Read the [dns] section of the configuration file.
+- get_resolver: The process-wide resolver built from the configuration.
+
+Usage:
+1. Get the shared resolver with 'get_resolver()' (or build a 'Resolver(nameservers=["10.0.0.2"])').
+2. Resolve many names at once with 'resolve_many(names)' (or 'await resolve_many_async(names)'); each gets a Resolution.
+3. Use 'gethostbyname(name)' (or 'await gethostbyname_async(name)') where one IPv4 address is needed; cached names cost a dictionary lookup.
+"""
+
+import os
+import time
+import random
+import socket
+import struct
+import asyncio
+import threading
+import ipaddress
+import configparser
+from collections import OrderedDict, namedtuple
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "eater.ini")
+RESOLV_CONF = "/etc/resolv.conf"
+HOSTS_FILE = "/etc/hosts"
+DNS_PORT = 53
+RECORD_TYPES = {"A": 1, "AAAA": 28}
+TYPE_SOA = 6
+CLASS_IN = 1
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_RETRIES = 2
+DEFAULT_CONCURRENCY = 256
+DEFAULT_CACHE_SIZE = 100000
+DEFAULT_NEGATIVE_TTL = 60
+DEFAULT_NDOTS = 1
+MAX_NDOTS = 15
+SYSTEM_TTL = 300
+MAX_TTL = 86400
+RECEIVE_BUFFER = 1 << 20
+
+Resolution = namedtuple("Resolution", ["name", "ipv4", "ipv6", "error"], defaults=((), (), None))
+Resolution.__doc__ = """Addresses of one name: tuples of IPv4 and IPv6 address strings, and the reason (e.g. "NXDOMAIN", "timeout") if there are none."""
+
+def encode_name(name):
+    """Encode a hostname in DNS label format.
+
+    Raises:
+        UnicodeError: If the name is not a valid (IDNA) hostname.
+    """
+    labels = name.rstrip(".").encode("idna").split(b".")
+    if any(not label or len(label) > 63 for label in labels):
+        raise UnicodeError(f"Invalid hostname '{name}'.")
+    return b"".join(bytes((len(label),)) + label for label in labels) + b"\0"
+
+def read_name(data, offset):
+    """Decode a (possibly compressed) name from a DNS message.
+
+    Returns:
+        tuple: The name in lower case and the offset after it.
+
+    Raises:
+        ValueError: If the name is truncated or its compression pointers loop.
+    """
+    labels = []
+    end = None
+    for _ in range(128):
+        if offset >= len(data):
+            raise ValueError("Truncated DNS name.")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise ValueError("Truncated DNS name.")
+            if end is None:
+                end = offset + 2
+            offset = (length & 0x3F) << 8 | data[offset + 1]
+        elif length == 0:
+            return b".".join(labels).decode("ascii", "replace").lower(), end if end is not None else offset + 1
+        else:
+            labels.append(data[offset + 1:offset + 1 + length])
+            offset += 1 + length
+    raise ValueError("DNS name compression loop.")
+
+def build_query(query_id, name, record_type):
+    """Build a recursive query for one record type ("A" or "AAAA") of a name."""
+    return struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + encode_name(name) + struct.pack("!HH", RECORD_TYPES[record_type], CLASS_IN)
+
+def parse_response(data, record_type):
+    """Parse a DNS response.
+
+    Args:
+        data (bytes): The response message.
+        record_type (str): The record type that was queried.
+
+    Returns:
+        tuple: (query id, rcode, addresses of the queried type, TTL). The TTL is the lowest TTL of
+            the answers, or for an empty answer the negative caching TTL from the SOA record (None without one).
+
+    Raises:
+        ValueError: If the message is malformed.
+    """
+    try:
+        query_id, flags, questions, answers, authorities, _ = struct.unpack_from("!HHHHHH", data)
+        offset = 12
+        for _ in range(questions):
+            offset = read_name(data, offset)[1] + 4
+        wanted = RECORD_TYPES[record_type]
+        family = socket.AF_INET if record_type == "A" else socket.AF_INET6
+        addresses = []
+        ttl = None
+        for index in range(answers + authorities):
+            offset = read_name(data, offset)[1]
+            rtype, _, record_ttl, length = struct.unpack_from("!HHIH", data, offset)
+            offset += 10
+            rdata = data[offset:offset + length]
+            offset += length
+            if len(rdata) != length:
+                raise ValueError("Truncated DNS record.")
+            if index < answers and rtype == wanted:
+                addresses.append(socket.inet_ntop(family, rdata))
+                ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+            elif index >= answers and rtype == TYPE_SOA and not addresses and length >= 20:
+                ttl = min(record_ttl, struct.unpack("!I", rdata[-4:])[0])
+    except (struct.error, OSError) as e:
+        raise ValueError(f"Malformed DNS response: {e}")
+    return query_id, flags & 0x000F, addresses, ttl
+
+def parse_nameserver(nameserver):
+    """Parse "10.0.0.2", "10.0.0.2:5353", "2001:db8::53" or "[2001:db8::53]:5353" into (address, port)."""
+    nameserver = nameserver.strip()
+    if nameserver.startswith("["):
+        address, _, port = nameserver[1:].partition("]")
+        port = port.lstrip(":")
+    elif nameserver.count(":") == 1:
+        address, port = nameserver.split(":")
+    else:
+        address, port = nameserver, ""
+    ipaddress.ip_address(address)
+    return address, int(port) if port else DNS_PORT
+
+def system_nameservers(path=RESOLV_CONF):
+    """Return the nameservers listed in resolv.conf."""
+    nameservers = []
+    try:
+        with open(path) as resolv_conf:
+            for line in resolv_conf:
+                fields = line.split("#", 1)[0].split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    nameservers.append(fields[1].split("%", 1)[0])
+    except OSError:
+        pass
+    return nameservers
+
+def system_search(path=RESOLV_CONF):
+    """Return the search domains and the ndots option of resolv.conf.
+
+    Returns:
+        tuple: (list of search domains, ndots). A "domain" or "search" line replaces the domains of earlier ones.
+    """
+    search = []
+    ndots = DEFAULT_NDOTS
+    try:
+        with open(path) as resolv_conf:
+            for line in resolv_conf:
+                fields = line.split("#", 1)[0].split()
+                if not fields:
+                    continue
+                if fields[0] in ("search", "domain"):
+                    search = [domain.strip(".").lower() for domain in fields[1:] if domain.strip(".")]
+                elif fields[0] == "options":
+                    for option in fields[1:]:
+                        if option.startswith("ndots:") and option[6:].isdigit():
+                            ndots = min(int(option[6:]), MAX_NDOTS)
+    except OSError:
+        pass
+    return search, ndots
+
+def load_hosts(path=HOSTS_FILE):
+    """Return {name: Resolution} for the entries of a hosts file."""
+    entries = {}
+    try:
+        with open(path) as hosts_file:
+            for line in hosts_file:
+                fields = line.split("#", 1)[0].split()
+                if len(fields) < 2:
+                    continue
+                try:
+                    version = ipaddress.ip_address(fields[0].split("%", 1)[0]).version
+                except ValueError:
+                    continue
+                for name in fields[1:]:
+                    name = name.lower()
+                    entry = entries.get(name, Resolution(name))
+                    if version == 4:
+                        entries[name] = entry._replace(ipv4=entry.ipv4 + (fields[0],))
+                    else:
+                        entries[name] = entry._replace(ipv6=entry.ipv6 + (fields[0],))
+    except OSError:
+        pass
+    return entries
+
+class DNSCache:
+    """
+    LRU cache of DNS answers keyed by (name, record type), each kept until its TTL expires.
+
+    A negative entry (NXDOMAIN, or no record of the type) is stored as an empty address tuple.
+    Thread-safe.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE, clock=time.monotonic):
+        """
+        Args:
+            max_entries (int): Answers kept; the least recently used one is evicted beyond this.
+            clock (callable): Returns the current time in seconds.
+        """
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, name, record_type):
+        """Return the cached addresses (empty for a negative entry), or None if not cached or expired."""
+        key = (name, record_type)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, name, record_type, addresses, ttl):
+        """Cache the addresses of a name for `ttl` seconds (nothing is cached for a TTL of 0)."""
+        if ttl <= 0:
+            return
+        key = (name, record_type)
+        with self.lock:
+            self.entries[key] = (self.clock() + min(ttl, MAX_TTL), tuple(addresses))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    """Hands each response to the lookup waiting for its query id, if it came from the queried server."""
+
+    def __init__(self, pending):
+        self.pending = pending
+
+    def datagram_received(self, data, address):
+        if len(data) < 12:
+            return
+        waiter = self.pending.get(struct.unpack_from("!H", data)[0])
+        if waiter is None:
+            return
+        future, server, question = waiter
+        if future.done() or tuple(address[:2]) != server or data[12:12 + len(question)].lower() != question:
+            return
+        future.set_result(data)
+
+    def error_received(self, exc):
+        pass
+
+class Resolver:
+    """
+    Concurrent A/AAAA resolver over UDP with a shared TTL cache.
+    """
+
+    def __init__(self, nameservers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, concurrency=DEFAULT_CONCURRENCY,
+                 cache_size=DEFAULT_CACHE_SIZE, negative_ttl=DEFAULT_NEGATIVE_TTL, hosts_file=HOSTS_FILE, search=None, ndots=None):
+        """
+        Args:
+            nameservers (list): Nameservers ("10.0.0.2", "10.0.0.2:5353", "[::1]:53"); those of /etc/resolv.conf if not
+                given. With none, the system resolver is used in a thread pool.
+            timeout (float): Seconds to wait for each query.
+            retries (int): Additional attempts per query, rotating through the nameservers.
+            concurrency (int): Maximum number of names resolved at once.
+            cache_size (int): Answers kept in the LRU cache.
+            negative_ttl (float): Seconds a missing name is cached when the answer carries no SOA TTL.
+            hosts_file (str): Hosts file answered before DNS; None to skip it.
+            search (list): Domains appended to names with fewer than `ndots` dots, like the resolv.conf search list;
+                those of /etc/resolv.conf if not given.
+            ndots (int): Dots a name needs to be tried as given before the search domains; that of /etc/resolv.conf
+                if not given.
+        """
+        if nameservers is None:
+            nameservers = system_nameservers()
+        if search is None or ndots is None:
+            system_domains, system_ndots = system_search()
+            search = system_domains if search is None else search
+            ndots = system_ndots if ndots is None else ndots
+        self.nameservers = [parse_nameserver(nameserver) for nameserver in nameservers]
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = concurrency
+        self.negative_ttl = negative_ttl
+        self.search = [domain.strip(".").lower() for domain in search if domain.strip(".")]
+        self.ndots = ndots
+        self.cache = DNSCache(cache_size)
+        self.hosts = load_hosts(hosts_file) if hosts_file else {}
+        self.inflight = {}
+        self.queries = 0
+
+    def _cached(self, name, record_types):
+        """Return the Resolution of a name from the hosts file or cache, or None if a record type is not cached."""
+        entry = self.hosts.get(name)
+        if entry is not None:
+            return entry
+        found = {}
+        for record_type in record_types:
+            addresses = self.cache.get(name, record_type)
+            if addresses is None:
+                return None
+            found[record_type] = addresses
+        resolution = Resolution(name, found.get("A", ()), found.get("AAAA", ()))
+        return resolution if resolution.ipv4 or resolution.ipv6 else resolution._replace(error="NXDOMAIN")
+
+    async def resolve_many_async(self, names, record_types=("A", "AAAA")):
+        """Resolve names concurrently, with at most `concurrency` names in flight.
+
+        Args:
+            names (iterable): Hostnames; IP address literals resolve to themselves.
+            record_types (tuple): "A", "AAAA" or both.
+
+        Returns:
+            dict: {name: Resolution} for every distinct name.
+        """
+        results = {}
+        pending = {}
+        endpoints = {}
+        name_iter = iter(names)
+
+        async def worker():
+            for name in name_iter:
+                if name not in results:
+                    results[name] = None
+                    results[name] = await self._resolve(name, record_types, pending, endpoints)
+
+        workers = min(self.concurrency, len(names)) if hasattr(names, "__len__") else self.concurrency
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+        finally:
+            for transport in endpoints.values():
+                transport.close()
+        return results
+
+    async def _resolve(self, name, record_types, pending, endpoints):
+        """Resolve one name from a literal, the hosts file, the cache or the network."""
+        try:
+            address = ipaddress.ip_address(name)
+        except ValueError:
+            pass
+        else:
+            return Resolution(name, (name,) if address.version == 4 else (), (name,) if address.version == 6 else ())
+
+        key = name.rstrip(".").lower()
+        cached = self._search_cached(name, record_types)
+        if cached is not None:
+            return cached._replace(name=name)
+        if not self.nameservers:
+            return await self._resolve_system(name, key, record_types)
+
+        for candidate in self._candidates(name):
+            resolution = self._cached(candidate, record_types) or await self._resolve_dns(candidate, record_types, pending, endpoints)
+            if resolution.error != "NXDOMAIN":
+                return resolution._replace(name=name)
+        if "." not in key:
+            # Single-label names may be known to other name services (mDNS, LDAP, WINS) configured in nsswitch.conf.
+            return await self._resolve_system(name, key, record_types)
+        return resolution._replace(name=name)
+
+    def _candidates(self, name):
+        """Return the names to query for a name, in order, following the search list and ndots like the system resolver."""
+        key = name.rstrip(".").lower()
+        if name.endswith(".") or not self.search or not self.nameservers:
+            return [key]
+        searched = [f"{key}.{domain}" for domain in self.search]
+        return [key] + searched if key.count(".") >= self.ndots else searched + [key]
+
+    def _search_cached(self, name, record_types):
+        """Return the Resolution of a name from the hosts file or cache following the search list, or None if a query is needed."""
+        entry = self.hosts.get(name.rstrip(".").lower())
+        if entry is not None:
+            return entry
+        for candidate in self._candidates(name):
+            cached = self._cached(candidate, record_types)
+            if cached is None or cached.error != "NXDOMAIN":
+                return cached
+        return cached
+
+    async def _resolve_dns(self, key, record_types, pending, endpoints):
+        """Query the record types of one fully qualified name."""
+        answers = await asyncio.gather(*(self._lookup(key, record_type, pending, endpoints) for record_type in record_types))
+        found = dict(zip(record_types, (addresses for addresses, _ in answers)))
+        errors = [error for _, error in answers if error]
+        resolution = Resolution(key, found.get("A", ()), found.get("AAAA", ()))
+        if not resolution.ipv4 and not resolution.ipv6:
+            resolution = resolution._replace(error=errors[0] if errors else "NXDOMAIN")
+        return resolution
+
+    async def _lookup(self, name, record_type, pending, endpoints):
+        """Query one record type of a name, sharing the lookup with concurrent callers on the same loop."""
+        loop = asyncio.get_running_loop()
+        key = (loop, name, record_type)
+        shared = self.inflight.get(key)
+        if shared is not None:
+            return await asyncio.shield(shared)
+        task = self.inflight[key] = loop.create_task(self._query(name, record_type, pending, endpoints))
+        task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _query(self, name, record_type, pending, endpoints):
+        """Send a query until a server answers, and cache the answer.
+
+        Returns:
+            tuple: The addresses (empty if there are none) and an error ("NXDOMAIN", "SERVFAIL", "timeout", ...) or None.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            build_query(0, name, record_type)
+        except UnicodeError:
+            return (), "invalid name"
+        error = "timeout"
+        first = random.randrange(len(self.nameservers))
+        for attempt in range(self.retries + 1):
+            server = self.nameservers[(first + attempt) % len(self.nameservers)]
+            family = socket.AF_INET6 if ":" in server[0] else socket.AF_INET
+            transport = endpoints.get(family)
+            if transport is None:
+                transport, _ = await loop.create_datagram_endpoint(lambda: _DNSProtocol(pending), family=family)
+                transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+                endpoints[family] = transport
+            query_id = random.randrange(65536)
+            while query_id in pending:
+                query_id = random.randrange(65536)
+            query = build_query(query_id, name, record_type)
+            future = loop.create_future()
+            pending[query_id] = (future, server, query[12:])
+            try:
+                transport.sendto(query, server)
+                self.queries += 1
+                data = await asyncio.wait_for(future, self.timeout)
+                _, rcode, addresses, ttl = parse_response(data, record_type)
+            except asyncio.TimeoutError:
+                continue
+            except (OSError, ValueError) as e:
+                error = str(e) or "network error"
+                continue
+            finally:
+                pending.pop(query_id, None)
+
+            if rcode == RCODE_NXDOMAIN or (rcode == RCODE_NOERROR and not addresses):
+                self.cache.put(name, record_type, (), ttl if ttl is not None else self.negative_ttl)
+                return (), "NXDOMAIN" if rcode == RCODE_NXDOMAIN else None
+            if rcode == RCODE_NOERROR:
+                self.cache.put(name, record_type, addresses, ttl)
+                return tuple(addresses), None
+            error = {2: "SERVFAIL", 5: "REFUSED"}.get(rcode, f"rcode {rcode}")
+        return (), error
+
+    async def _resolve_system(self, name, key, record_types):
+        """Resolve a name with the system resolver, caching the answer for SYSTEM_TTL."""
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(key, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError) as e:
+            if isinstance(e, socket.gaierror) and e.errno == socket.EAI_NONAME:
+                for record_type in record_types:
+                    self.cache.put(key, record_type, (), self.negative_ttl)
+            return Resolution(name, error="NXDOMAIN")
+        found = {"A": [], "AAAA": []}
+        for family, _, _, _, address in infos:
+            addresses = found["A" if family == socket.AF_INET else "AAAA"]
+            if address[0] not in addresses:
+                addresses.append(address[0])
+        for record_type in record_types:
+            self.cache.put(key, record_type, found[record_type], SYSTEM_TTL)
+        return Resolution(name, tuple(found["A"]) if "A" in record_types else (), tuple(found["AAAA"]) if "AAAA" in record_types else ())
+
+    def resolve_many(self, names, record_types=("A", "AAAA")):
+        """Resolve names concurrently (see resolve_many_async). Must not be called from a running event loop."""
+        return asyncio.run(self.resolve_many_async(names, record_types))
+
+    def resolve(self, name, record_types=("A", "AAAA")):
+        """Return the Resolution of one name."""
+        cached = self._search_cached(name, record_types)
+        if cached is not None:
+            return cached._replace(name=name)
+        return self.resolve_many([name], record_types)[name]
+
+    def gethostbyname(self, name):
+        """Return an IPv4 address of a name, like socket.gethostbyname but cached.
+
+        Raises:
+            socket.gaierror: If the name has no IPv4 address.
+        """
+        resolution = self.resolve(name, ("A",))
+        if not resolution.ipv4:
+            raise socket.gaierror(socket.EAI_NONAME, f"Could not resolve {name}: {resolution.error or 'no IPv4 address'}")
+        return resolution.ipv4[0]
+
+    async def gethostbyname_async(self, name):
+        """Same as gethostbyname without blocking the event loop."""
+        pending = {}
+        endpoints = {}
+        try:
+            resolution = await self._resolve(name, ("A",), pending, endpoints)
+        finally:
+            for transport in endpoints.values():
+                transport.close()
+        if not resolution.ipv4:
+            raise socket.gaierror(socket.EAI_NONAME, f"Could not resolve {name}: {resolution.error or 'no IPv4 address'}")
+        return resolution.ipv4[0]
+
+def load_resolver_settings(path=DEFAULT_CONFIG):
+    """Read the [dns] section of the configuration file.
+
+    Args:
+        path (str): The INI file.
+
+    Returns:
+        dict: Keyword arguments for Resolver. Missing options keep their defaults.
+
+    Raises:
+        ValueError: If an option has an invalid value.
+    """
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if not parser.has_section("dns"):
+        return {}
+    section = parser["dns"]
+    settings = {}
+    try:
+        if section.get("nameservers", "").strip():
+            settings["nameservers"] = section["nameservers"].replace(",", " ").split()
+            for nameserver in settings["nameservers"]:
+                parse_nameserver(nameserver)
+        for option in ("timeout", "negative_ttl"):
+            if option in section:
+                settings[option] = section.getfloat(option)
+        for option in ("retries", "concurrency", "cache_size", "ndots"):
+            if option in section:
+                settings[option] = section.getint(option)
+        if section.get("search", "").strip():
+            settings["search"] = section["search"].replace(",", " ").split()
+    except ValueError as e:
+        raise ValueError(f"Invalid [dns] setting in {path}: {e}")
+    return settings
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_resolver():
+    """Return the process-wide Resolver, built from config/eater.ini on first use."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = Resolver(**load_resolver_settings())
+        return _resolver
@@ -0,0 +1,418 @@
+"""
+Scan Telemetry
+
+This module instruments running scans. Scan engines and banner grabbers count what every stage does (probes sent, replies, timeouts, retransmits, results per status, banners), keep gauges for in-flight probes and queue depths and record an RTT histogram, so a slow run shows which stage is the bottleneck. A reporter thread renders a live progress line with an ETA and periodically exports the counters as JSON or as a Prometheus textfile (for node_exporter's textfile collector).
+
+Classes:
+- Histogram: Fixed-bucket histogram with Prometheus-style cumulative buckets.
+- ScanTelemetry: Thread-safe counters, gauges and histograms of one scan (or of several scans sharing it).
+- ProgressReporter: Background thread rendering the progress line and exporting metrics.
+
+Functions:
+- load_telemetry_settings: Read the [telemetry] section of the configuration file.
+
+Usage:
+1. Every scanner and banner grabber has a 'telemetry' attribute; assign one ScanTelemetry to all stages of a scan and set its 'total' to the number of probes. Modules count finished probes with incr("completed").
+2. Run 'with ProgressReporter(telemetry, metrics_file="scan.prom"):' around the scan.
+3. Read 'telemetry.snapshot()', or export with 'write_json' / 'write_prometheus'.
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+import configparser
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "eater.ini")
+RTT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = "eater_"
+DEFAULT_INTERVAL = 1.0
+PIPE_INTERVAL = 10.0
+
+DESCRIPTIONS = {
+    "probes_sent": "Probes sent, including retransmissions.",
+    "retransmits": "Probes sent again after an unanswered attempt.",
+    "replies": "Probes answered by the target (SYN/ACK, RST, UDP reply, ICMP error, connect result).",
+    "timeouts": "Probes that stayed unanswered after every retransmission.",
+    "results": "Scan results, by status.",
+    "completed": "Probes finished as seen by the module consuming them (scan results and standalone banner grabs).",
+    "banner_probes": "Payloads sent by banner grabbers.",
+    "banners": "Banner grabs, by outcome.",
+    "in_flight": "Probes waiting for a reply.",
+    "queue_depth": "Items waiting between two pipeline stages, by stage.",
+    "total_probes": "Probes the scan is expected to send (0 if unknown).",
+    "elapsed_seconds": "Seconds since the scan started.",
+    "rtt_seconds": "Round-trip time of answered first attempts.",
+}
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Not thread-safe on its own; ScanTelemetry serializes access.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=RTT_BUCKETS):
+        """
+        Args:
+            buckets (tuple): Ascending upper bounds; values above the last one go to +Inf.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction):
+        """Return the upper bound of the bucket holding the given quantile, or None if empty."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def merge(self, other):
+        """Add the values of a histogram with the same buckets."""
+        self.counts = [count + added for count, added in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self):
+        """Return (upper bound, count of values <= bound) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+class ScanTelemetry:
+    """
+    Counters, gauges and histograms of a scan, safe to update from engine threads and event loops.
+
+    Metrics may carry labels, e.g. incr("results", status="open"). Gauges are either adjusted by the
+    engines or sampled from a callable (e.g. a queue's qsize) when a snapshot is taken.
+    """
+
+    def __init__(self, total=0, labels=None):
+        """
+        Args:
+            total (int): Probes the scan is expected to send, for progress and ETA; 0 if unknown.
+            labels (dict): Labels added to every exported metric (e.g. {"scan": scan_id}).
+        """
+        self.total = total
+        self.labels = dict(labels or {})
+        self.started = time.monotonic()
+        self.counters = {}
+        self.gauges = {}
+        self.sampled = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        """Worker processes get an empty telemetry; their results are counted by the parent."""
+        return {"total": self.total, "labels": self.labels}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+    def incr(self, name, amount=1, **labels):
+        """Add to a counter."""
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def add_gauge(self, name, delta, **labels):
+        """Add to (or, with a negative delta, subtract from) a gauge."""
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def sample_gauge(self, name, sample, **labels):
+        """Sample a gauge from a callable whenever a snapshot is taken, e.g. sample_gauge("queue_depth", queue.qsize, stage="results")."""
+        with self.lock:
+            self.sampled[self._key(name, labels)] = sample
+
+    def remove_gauge(self, name, **labels):
+        """Forget a gauge, e.g. when the queue it samples is gone."""
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges.pop(key, None)
+            self.sampled.pop(key, None)
+
+    def observe(self, name, value, buckets=RTT_BUCKETS):
+        """Record a value in a histogram."""
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def merge(self, counters, histograms):
+        """Add counters and histograms of another telemetry, e.g. one collected in a worker process.
+
+        Args:
+            counters (dict): The other telemetry's 'counters'.
+            histograms (dict): The other telemetry's 'histograms'.
+        """
+        with self.lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, other in histograms.items():
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram(other.buckets)
+                histogram.merge(other)
+
+    def count(self, name, **labels):
+        """Return a counter's value; without labels, the sum over every label set of the name."""
+        with self.lock:
+            if labels:
+                return self.counters.get(self._key(name, labels), 0)
+            return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    def gauge(self, name):
+        """Return the sum of a gauge over every label set."""
+        with self.lock:
+            value = sum(gauge for (gauge_name, _), gauge in self.gauges.items() if gauge_name == name)
+            samplers = [sample for (gauge_name, _), sample in self.sampled.items() if gauge_name == name]
+        return value + sum(sample() for sample in samplers)
+
+    def snapshot(self):
+        """Return every metric as a JSON-serializable dict."""
+        def label(key):
+            name, labels = key
+            return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+        with self.lock:
+            counters = {label(key): value for key, value in self.counters.items()}
+            gauges = {label(key): value for key, value in self.gauges.items()}
+            samplers = dict(self.sampled)
+            histograms = {name: {"count": histogram.count, "sum": round(histogram.sum, 6),
+                                 "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99),
+                                 "buckets": [[bound if bound != float("inf") else "+Inf", count] for bound, count in histogram.cumulative()]}
+                          for name, histogram in self.histograms.items()}
+        for key, sample in samplers.items():
+            gauges[label(key)] = sample()
+        return {"labels": self.labels, "total_probes": self.total, "elapsed_seconds": round(time.monotonic() - self.started, 3),
+                "counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def progress(self):
+        """Return (done, total, rate per second, ETA in seconds or None).
+
+        Done counts 'completed' when a module reports it, and the engines' results otherwise.
+        """
+        done = self.count("completed") or self.count("results")
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        rate = done / elapsed
+        eta = (self.total - done) / rate if self.total and rate > 0 and done < self.total else None
+        return done, self.total, rate, eta
+
+    def progress_line(self):
+        """Render the one-line progress view."""
+        done, total, rate, eta = self.progress()
+        parts = []
+        if total:
+            fraction = min(1.0, done / total)
+            filled = int(fraction * 20)
+            parts.append(f"[{'#' * filled}{'.' * (20 - filled)}] {fraction * 100:5.1f}% {done}/{total}")
+        else:
+            parts.append(f"{done} results")
+        parts.append(f"{rate:,.0f}/s")
+        parts.append(f"open {self.count('results', status='open')}")
+        parts.append(f"in-flight {self.gauge('in_flight')}")
+        parts.append(f"sent {self.count('probes_sent')} retx {self.count('retransmits')} timeouts {self.count('timeouts')}")
+        with self.lock:
+            rtt = self.histograms.get("rtt_seconds")
+            p50 = rtt.quantile(0.5) if rtt else None
+        if p50 is not None:
+            parts.append(f"rtt p50 <{p50 * 1000:g}ms")
+        queued = self.gauge("queue_depth")
+        if queued:
+            parts.append(f"queued {queued}")
+        if eta is not None:
+            parts.append(f"ETA {int(eta) // 3600}:{int(eta) % 3600 // 60:02d}:{int(eta) % 60:02d}")
+        return "  ".join(parts)
+
+    def write_json(self, path):
+        """Write a snapshot as JSON, atomically."""
+        self._write(path, json.dumps(self.snapshot(), indent=2) + "\n")
+
+    def write_prometheus(self, path):
+        """Write the metrics in the Prometheus text exposition format, atomically."""
+        self._write(path, self.prometheus())
+
+    def prometheus(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        def labels(*pairs):
+            merged = dict(self.labels)
+            for extra in pairs:
+                merged.update(extra)
+            if not merged:
+                return ""
+            escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in merged.values())
+            return "{" + ",".join(f'{name}="{value}"' for name, value in zip(merged, escaped)) + "}"
+
+        def header(name, kind):
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {DESCRIPTIONS.get(name.replace('_total', ''), name)}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            samplers = dict(self.sampled)
+            histograms = {name: (histogram.cumulative(), histogram.sum, histogram.count) for name, histogram in self.histograms.items()}
+        for key, sample in samplers.items():
+            gauges[key] = sample()
+        gauges[("total_probes", ())] = self.total
+        gauges[("elapsed_seconds", ())] = round(time.monotonic() - self.started, 3)
+
+        lines = []
+        for metrics, kind, suffix in ((counters, "counter", "_total"), (gauges, "gauge", "")):
+            for name in sorted({name for name, _ in metrics}):
+                header(name + suffix, kind)
+                for (metric, pairs), value in sorted(metrics.items()):
+                    if metric == name:
+                        lines.append(f"{METRIC_PREFIX}{name}{suffix}{labels(dict(pairs))} {value}")
+        for name, (cumulative, total, count) in sorted(histograms.items()):
+            header(name, "histogram")
+            for bound, value in cumulative:
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{labels({'le': '+Inf' if bound == float('inf') else repr(bound)})} {value}")
+            lines.append(f"{METRIC_PREFIX}{name}_sum{labels()} {total}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{labels()} {count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _write(path, text):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path + ".tmp", "w") as metrics_file:
+            metrics_file.write(text)
+        os.replace(path + ".tmp", path)
+
+    def export(self, path):
+        """Write the metrics to a file: Prometheus text for '.prom', JSON otherwise."""
+        if path.endswith(".prom"):
+            self.write_prometheus(path)
+        else:
+            self.write_json(path)
+
+class ProgressReporter:
+    """
+    Background thread rendering the progress line of a ScanTelemetry and exporting its metrics.
+
+    On a terminal the line is redrawn in place every `interval` seconds; otherwise (pipes, logs)
+    a line is printed every PIPE_INTERVAL seconds.
+    """
+
+    def __init__(self, telemetry, interval=DEFAULT_INTERVAL, stream=None, show=True, metrics_file=None):
+        """
+        Args:
+            telemetry (ScanTelemetry): The metrics to render.
+            interval (float): Seconds between redraws and exports.
+            stream (file): Where the progress line goes; sys.stderr if not given.
+            show (bool): Render the progress line (exports still happen when False).
+            metrics_file (str): Export the metrics to this file (see ScanTelemetry.export).
+        """
+        self.telemetry = telemetry
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty() if hasattr(self.stream, "isatty") else False
+        self.interval = interval if self.tty else max(interval, PIPE_INTERVAL)
+        self.show = show
+        self.metrics_file = metrics_file
+        self.stopped = threading.Event()
+        self.thread = None
+        self.drawn = False
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the thread, export once more and leave the final progress line on screen."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.update(final=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.update()
+
+    def update(self, final=False):
+        """Redraw the progress line and export the metrics."""
+        if self.metrics_file:
+            try:
+                self.telemetry.export(self.metrics_file)
+            except OSError as e:
+                print(f"Could not write metrics to {self.metrics_file}: {e}", file=self.stream)
+                self.metrics_file = None
+        if not self.show:
+            return
+        line = self.telemetry.progress_line()
+        with self.lock:
+            if self.tty:
+                self.stream.write("\r\033[K" + line + ("\n" if final else ""))
+                self.drawn = not final
+            else:
+                self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def clear(self):
+        """Erase the progress line so other output can be printed; it is redrawn on the next update."""
+        if self.tty and self.drawn:
+            with self.lock:
+                self.stream.write("\r\033[K")
+                self.stream.flush()
+                self.drawn = False
+
+def load_telemetry_settings(path=DEFAULT_CONFIG):
+    """Read the [telemetry] section of the configuration file.
+
+    Args:
+        path (str): The INI file.
+
+    Returns:
+        dict: Keyword arguments for ProgressReporter (show, interval, metrics_file). Missing options keep their defaults.
+
+    Raises:
+        ValueError: If an option has an invalid value.
+    """
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if not parser.has_section("telemetry"):
+        return {}
+    section = parser["telemetry"]
+    settings = {}
+    try:
+        if "progress" in section:
+            settings["show"] = section.getboolean("progress")
+        if "interval" in section:
+            settings["interval"] = section.getfloat("interval")
+    except ValueError as e:
+        raise ValueError(f"Invalid [telemetry] setting in {path}: {e}")
+    if section.get("metrics_file"):
+        settings["metrics_file"] = os.path.expanduser(section["metrics_file"])
+    return settings